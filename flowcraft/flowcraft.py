@@ -15,6 +15,7 @@ try:
     from __init__ import __version__, __build__
     from generator.engine import NextflowGenerator, process_map
     from generator.inspect import NextflowInspector
+    from generator.multi_inspect import MultiInspector
     from generator.recipe import brew_recipe
     from generator.pipeline_parser import parse_pipeline, SanityError
     from generator.process_details import proc_collector, colored_print
@@ -23,6 +24,7 @@ except ImportError:
     from flowcraft import __version__, __build__
     from flowcraft.generator.engine import NextflowGenerator, process_map
     from flowcraft.generator.inspect import NextflowInspector
+    from flowcraft.generator.multi_inspect import MultiInspector
     from flowcraft.generator.recipe import brew_recipe
     from flowcraft.generator.pipeline_parser import parse_pipeline, \
         SanityError
@@ -95,22 +97,88 @@ def get_args(args=None):
         help="Specify the nextflow trace file."
     )
     inspect_parser.add_argument(
-        "-r", dest="refresh_rate", default=0.02,
-        help="Set the refresh frequency for the continuous inspect functions"
+        "-d", "--directories", dest="directories", nargs="+",
+        help="Inspect the pipelines running in these project directories "
+             "from a single process. The trace file path is relative to "
+             "each directory."
+    )
+    inspect_parser.add_argument(
+        "-r", dest="refresh_rate", default=0.02, type=float,
+        help="Set the minimum interval (in seconds) between checks of the "
+             "nextflow files, when they have to be polled for changes"
     )
     inspect_parser.add_argument(
         "-m", "--mode", dest="mode", default="overview",
-        choices=["overview", "broadcast"],
+        choices=["overview", "broadcast", "serve", "metrics", "stream"],
         help="Specify the inspection run mode."
     )
     inspect_parser.add_argument(
         "-u", "--url", dest="url", default="http://192.92.149.169:80/",
         help="Specify the URL to where the data should be broadcast"
     )
+    inspect_parser.add_argument(
+        "--host", dest="host", default="127.0.0.1",
+        help="Host where the status server listens, in the serve and "
+             "metrics modes."
+    )
+    inspect_parser.add_argument(
+        "--port", dest="port", default=8000, type=int,
+        help="Port where the status server listens, in the serve and "
+             "metrics modes."
+    )
+    inspect_parser.add_argument(
+        "-o", "--output", dest="output", default="-",
+        help="File (e.g.: a named pipe) where the events are written in the "
+             "stream mode, or where the status is written with --once. By "
+             "default, they are written to the standard output."
+    )
+    inspect_parser.add_argument(
+        "--once", dest="once", action="store_true",
+        help="Parse the nextflow files a single time, write the status of "
+             "the pipeline as JSON to the output (see -o) and exit. The run "
+             "mode is ignored."
+    )
     inspect_parser.add_argument(
         "--pretty", dest="pretty", action="store_const", const=True,
         help="Pretty inspection mode that removes usual reporting processes."
     )
+    inspect_parser.add_argument(
+        "--delta", dest="delta", action="store_const", const=True,
+        help="Broadcast only the changes since the last status acknowledged "
+             "by the server. Requires a server that supports delta payloads."
+    )
+    inspect_parser.add_argument(
+        "--straggler-factor", dest="straggler_factor", default=3, type=float,
+        help="Flag the running tags of a process whose time since submission "
+             "exceeds this multiple of the 90th percentile of the duration "
+             "of its completed tasks."
+    )
+    inspect_parser.add_argument(
+        "--capacity", dest="capacity", type=int,
+        help="Number of cpus available to the executor, used to compute the "
+             "cpu utilization of the pipeline."
+    )
+    inspect_parser.add_argument(
+        "--gantt", dest="gantt", action="store_true",
+        help="Include the execution interval of each task in the timeline "
+             "of the pipeline."
+    )
+    inspect_parser.add_argument(
+        "--retry-alarm", dest="retry_alarm", default=0.25, type=float,
+        help="Raise an alarm for the processes whose fraction of failed "
+             "attempts is above this value."
+    )
+    inspect_parser.add_argument(
+        "--disk-rate", dest="disk_rate", default=20, type=float,
+        help="Maximum number of task work directories sized per second to "
+             "measure the disk usage of the work directory. Set to 0 to "
+             "disable the measurement."
+    )
+    inspect_parser.add_argument(
+        "--no-checkpoint", dest="checkpoint", action="store_false",
+        help="Do not store the inspection state next to the trace file, "
+             "which is used to resume the inspection when it is restarted."
+    )
 
     if len(sys.argv) == 1:
         parser.print_help()
@@ -244,19 +312,51 @@ def build(args):
 
 def inspect(args):
 
+    if args.directories and not args.once and \
+            args.mode in ["serve", "metrics", "stream"]:
+        logger.error(colored_print(
+            "ERROR: The {} mode can only inspect a single pipeline".format(
+                args.mode), "red_bold"))
+        sys.exit(1)
+
     try:
-        nf_inspect = NextflowInspector(args.trace_file, args.refresh_rate,
-                                       args.pretty, args.url)
+        if args.directories:
+            nf_inspect = MultiInspector(args.directories, args.trace_file,
+                                        args.refresh_rate, args.pretty,
+                                        args.url, args.delta, args.checkpoint,
+                                        args.straggler_factor, args.capacity,
+                                        args.gantt, args.retry_alarm,
+                                        args.disk_rate)
+        else:
+            nf_inspect = NextflowInspector(
+                args.trace_file, args.refresh_rate, args.pretty, args.url,
+                args.delta, args.checkpoint,
+                straggler_factor=args.straggler_factor,
+                capacity=args.capacity, gantt=args.gantt,
+                retry_alarm=args.retry_alarm, disk_rate=args.disk_rate)
     except eh.InspectionError as e:
         logger.error(colored_print(e.value, "red_bold"))
         sys.exit(1)
 
+    if args.once:
+        nf_inspect.inspect_once(args.output)
+        return
+
     if args.mode == "overview":
         nf_inspect.display_overview()
 
     if args.mode == "broadcast":
         nf_inspect.broadcast_status()
 
+    if args.mode == "serve":
+        nf_inspect.serve_status(args.host, args.port)
+
+    if args.mode == "metrics":
+        nf_inspect.serve_status(args.host, args.port, status=False)
+
+    if args.mode == "stream":
+        nf_inspect.stream_events(args.output)
+
 
 def main():
 
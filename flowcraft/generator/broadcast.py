@@ -0,0 +1,753 @@
+import copy
+import gzip
+import json
+import zlib
+import logging
+import requests
+import threading
+
+from time import monotonic
+from collections import OrderedDict, deque
+
+try:
+    from generator.process_details import colored_print
+except ImportError:
+    from flowcraft.generator.process_details import colored_print
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class StatusDeltaEncoder:
+    """Encodes the status of an inspection as versioned deltas.
+
+    Each payload carries a version number. A delta payload only contains
+    the processes and tags that changed since the last version that was
+    acknowledged by the receiver (the ``baseVersion``), while a full
+    payload contains the complete status. A full payload is sent when there
+    is no acknowledged version, when processes were removed and
+    periodically, every ``full_interval`` payloads, to allow the receiver to
+    resync.
+
+    Parameters
+    ----------
+    full_interval : int
+        Number of delta payloads between two full payloads.
+    """
+
+    SECTIONS = ["generalOverview", "generalDetails", "tableMappings",
+                "runStatus", "timeStart", "timeStop", "processes", "progress",
+                "scheduling", "stragglers", "timeline", "waste",
+                "diskUsage"]
+    """
+    list: Keys of the status that are sent as a whole when they change.
+    """
+
+    def __init__(self, full_interval=50):
+
+        self.full_interval = full_interval
+        """
+        int: Number of delta payloads between two full payloads.
+        """
+
+        self.version = 0
+        """
+        int: Version of the last encoded payload.
+        """
+
+        self.acked_version = None
+        """
+        int: Last version acknowledged by the receiver.
+        """
+
+        self.acked_state = None
+        """
+        dict: Status of the last acknowledged version, as returned by
+        :func:`_get_state`.
+        """
+
+        self.pending = OrderedDict()
+        """
+        dict: Maps the versions that were encoded but not yet acknowledged
+        to their status. Only the versions since the last full payload are
+        kept.
+        """
+
+        self.deltas_since_full = 0
+        """
+        int: Number of delta payloads since the last full payload.
+        """
+
+    @classmethod
+    def _get_state(cls, status_json):
+        """Indexes the status by process and tag, copying the dictionaries
+        that may be modified by the inspector after encoding.
+        """
+
+        return {
+            "sections": dict((k, status_json[k]) for k in cls.SECTIONS
+                             if k in status_json),
+            "tableData": dict((x["process"], x)
+                              for x in status_json["tableData"]),
+            "processInfo": dict(status_json["processInfo"]),
+            "processTags": dict(
+                (p, dict((t, dict(v)) for t, v in tags.items()))
+                for p, tags in status_json["processTags"].items())
+        }
+
+    @staticmethod
+    def _diff_dict(base, new):
+        """Returns the entries of ``new`` that are not equal in ``base``.
+        """
+
+        return dict((k, v) for k, v in new.items()
+                    if k not in base or base[k] != v)
+
+    def _get_changes(self, state):
+        """Returns the changes of ``state`` in relation to the acknowledged
+        state, or None when a full payload is required.
+        """
+
+        base = self.acked_state
+
+        # Removed processes are only handled by full payloads
+        if set(base["tableData"]) - set(state["tableData"]):
+            return None
+
+        changes = {
+            "sections": self._diff_dict(base["sections"],
+                                        state["sections"]),
+            "tableData": self._diff_dict(base["tableData"],
+                                         state["tableData"]),
+            "processInfo": self._diff_dict(base["processInfo"],
+                                           state["processInfo"]),
+            "processTags": {}
+        }
+
+        for process, tags in state["processTags"].items():
+            base_tags = base["processTags"].get(process, {})
+            tag_changes = self._diff_dict(base_tags, tags)
+            # Removed tags are sent with a None value
+            for tag in base_tags:
+                if tag not in tags:
+                    tag_changes[tag] = None
+            if tag_changes:
+                changes["processTags"][process] = tag_changes
+
+        return changes
+
+    def encode(self, status_json):
+        """Encodes the status into a full or a delta payload.
+
+        Parameters
+        ----------
+        status_json : dict
+            The complete status of the inspection.
+
+        Returns
+        -------
+        dict
+            The payload, with the "version" key and either the
+            "status_json" key (full payload) or the "status_delta" and
+            "baseVersion" keys (delta payload).
+        """
+
+        state = self._get_state(status_json)
+        self.version += 1
+
+        changes = None
+        if self.acked_state is not None and \
+                self.deltas_since_full < self.full_interval:
+            changes = self._get_changes(state)
+
+        if changes is None:
+            payload = {
+                "version": self.version,
+                "status_json": status_json
+            }
+            self.deltas_since_full = 0
+            # Older versions are not needed once the receiver acknowledges
+            # this one, so a receiver that never acknowledges does not make
+            # the pending versions grow
+            self.pending.clear()
+        else:
+            payload = {
+                "version": self.version,
+                "baseVersion": self.acked_version,
+                "status_delta": changes
+            }
+            self.deltas_since_full += 1
+
+        self.pending[self.version] = state
+
+        return payload
+
+    def ack(self, version):
+        """Marks a version as acknowledged by the receiver. The following
+        deltas will be computed against this version.
+
+        Parameters
+        ----------
+        version : int
+            Acknowledged version.
+        """
+
+        if version not in self.pending:
+            return
+
+        self.acked_version = version
+        self.acked_state = self.pending[version]
+
+        for v in [x for x in self.pending if x <= version]:
+            del self.pending[v]
+
+    def discard(self, version):
+        """Forgets a version that was not received (e.g.: the request
+        failed or was rejected), so that it can no longer be acknowledged.
+
+        Parameters
+        ----------
+        version : int
+            Rejected version.
+        """
+
+        self.pending.pop(version, None)
+
+    def reset(self):
+        """Forgets the acknowledged version, so that the next payload is
+        a full payload. Used when the receiver requests a resync.
+        """
+
+        self.acked_version = None
+        self.acked_state = None
+        self.pending = OrderedDict()
+
+
+class StatusDeltaReceiver:
+    """Reference implementation of the receiving end of the payloads
+    produced by :py:class:`StatusDeltaEncoder`.
+
+    It rebuilds the complete status from full and delta payloads, and
+    rejects deltas that are not based on its current version.
+    """
+
+    def __init__(self):
+
+        self.version = None
+        """
+        int: Version of the current status.
+        """
+
+        self.status_json = None
+        """
+        dict: The rebuilt status of the inspection.
+        """
+
+    def apply(self, payload):
+        """Applies a full or delta payload to the current status.
+
+        Parameters
+        ----------
+        payload : dict
+            Payload returned by :func:`StatusDeltaEncoder.encode`.
+
+        Returns
+        -------
+        bool
+            True if the payload was applied and can be acknowledged. False
+            when the delta is not based on the current version, in which
+            case a full payload is required.
+        """
+
+        if "status_json" in payload:
+            self.status_json = copy.deepcopy(payload["status_json"])
+            self.version = payload["version"]
+            return True
+
+        if self.status_json is None or \
+                payload["baseVersion"] != self.version:
+            return False
+
+        changes = copy.deepcopy(payload["status_delta"])
+        status = self.status_json
+
+        status.update(changes["sections"])
+        status["processInfo"].update(changes["processInfo"])
+
+        for process, tags in changes["processTags"].items():
+            current = status["processTags"].setdefault(process, {})
+            for tag, info in tags.items():
+                if info is None:
+                    current.pop(tag, None)
+                else:
+                    current[tag] = info
+
+        rows = dict((x["process"], x) for x in status["tableData"])
+        rows.update(changes["tableData"])
+        status["tableData"] = [rows[p] for p in status["processes"]
+                               if p in rows]
+
+        self.version = payload["version"]
+
+        return True
+
+
+class BroadcastSender(threading.Thread):
+    """Background sender of the inspection status to the flowcraft web app.
+
+    The sender holds a persistent HTTP session (with keep-alive), so that
+    the same connection is reused between requests, and sends the status
+    from a bounded queue. The inspector only has to call :func:`submit`,
+    which never blocks. When the server is slow, the queued status are
+    coalesced and only the latest one is sent. Failed requests are retried
+    with exponential backoff, instead of stopping the inspection.
+
+    The first request registers the run in the server (POST) and the last
+    one removes it (DELETE), when :func:`close` is called.
+
+    The request bodies are sent uncompressed until the server advertises the
+    encodings it accepts with the ``Accept-Encoding`` header of a response.
+    From then on, the bodies are compressed with gzip or deflate. If the
+    server answers with 415 (Unsupported Media Type), the encoding is
+    negotiated again from that response and the request is sent again.
+
+    Parameters
+    ----------
+    address : str
+        Address of the REST api where the information will be sent.
+    run_id : str
+        Identifier of the run in the server.
+    init_payload : dict
+        Additional data of the first request (e.g., the dag and the
+        pipeline files).
+    encoder : StatusDeltaEncoder, optional
+        When provided, the status are sent as versioned deltas.
+    max_queue : int
+        Maximum number of status waiting to be sent. The oldest ones are
+        discarded when the queue is full.
+    timeout : float
+        Timeout in seconds of each request.
+    min_backoff : float
+        Time in seconds before the first retry of a failed request.
+    max_backoff : float
+        Maximum time in seconds between retries.
+    compress_level : int
+        Compression level of the request bodies, from 1 (fastest) to 9.
+    session : requests.Session, optional
+        Session shared with other senders, so that their connections are
+        taken from the same pool. If not provided, the sender creates and
+        closes its own session.
+    """
+
+    ENCODINGS = ["gzip", "deflate"]
+    """
+    list: Supported encodings of the request bodies, by order of preference.
+    """
+
+    def __init__(self, address, run_id, init_payload, encoder=None,
+                 max_queue=8, timeout=30, min_backoff=1, max_backoff=60,
+                 compress_level=6, session=None):
+
+        threading.Thread.__init__(self, daemon=True)
+
+        self.address = address
+        """
+        str: Address of the REST api where the information will be sent.
+        """
+
+        self.run_id = run_id
+        """
+        str: Identifier of the run in the server.
+        """
+
+        self.init_payload = init_payload
+        """
+        dict: Additional data of the first request.
+        """
+
+        self.encoder = encoder
+        """
+        StatusDeltaEncoder: Encoder of delta payloads. If None, the
+        complete status is always sent.
+        """
+
+        self.timeout = timeout
+        """
+        float: Timeout in seconds of each request.
+        """
+
+        self.min_backoff = min_backoff
+        """
+        float: Time in seconds before the first retry of a failed request.
+        """
+
+        self.max_backoff = max_backoff
+        """
+        float: Maximum time in seconds between retries.
+        """
+
+        self.backoff = min_backoff
+        """
+        float: Time in seconds before the next retry.
+        """
+
+        self.session = session or requests.Session()
+        """
+        requests.Session: Persistent HTTP session, which keeps the
+        connection with the server alive between requests.
+        """
+
+        self.own_session = session is None
+        """
+        boolean: True if the :attr:`session` was created by the sender and
+        must be closed when it stops.
+        """
+
+        self.queue = deque(maxlen=max_queue)
+        """
+        deque: Bounded queue with the status waiting to be sent.
+        """
+
+        self.cond = threading.Condition()
+        """
+        threading.Condition: Guards the :attr:`queue` and wakes the sender
+        when a new status is submitted or when it is closed.
+        """
+
+        self.registered = False
+        """
+        boolean: True after the run was registered in the server.
+        """
+
+        self.closing = False
+        """
+        boolean: Set by :func:`close` to send the pending status and stop
+        the sender.
+        """
+
+        self.error = None
+        """
+        str: Reason why the server refused the run. When set, the sender
+        stops.
+        """
+
+        self.compress_level = compress_level
+        """
+        int: Compression level of the request bodies.
+        """
+
+        self.content_encoding = None
+        """
+        str: Encoding of the request bodies, as negotiated with the server.
+        If None, the bodies are sent uncompressed.
+        """
+
+        self.sent = 0
+        """
+        int: Number of status sent to the server.
+        """
+
+        self.bytes_raw = 0
+        """
+        int: Size in bytes of the JSON bodies of the requests, before
+        compression.
+        """
+
+        self.bytes_sent = 0
+        """
+        int: Size in bytes of the request bodies actually sent.
+        """
+
+        self.dropped = 0
+        """
+        int: Number of status that were discarded in favour of a newer one.
+        """
+
+    def submit(self, status_json):
+        """Adds a status to the queue. This method never blocks.
+
+        The status must not be modified after being submitted, since it is
+        sent from the sender thread.
+
+        Parameters
+        ----------
+        status_json : dict
+            The complete status of the inspection.
+        """
+
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(status_json)
+            self.cond.notify()
+
+    def close(self, timeout=None):
+        """Sends the pending status, removes the run from the server and
+        stops the sender.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time in seconds to wait for the sender to finish.
+        """
+
+        with self.cond:
+            self.closing = True
+            self.cond.notify()
+
+        if self.is_alive():
+            self.join(timeout)
+
+    def _take(self):
+        """Waits for a new status and returns the latest one, discarding
+        the older ones. Returns None when the sender is closing and there
+        is nothing left to send.
+        """
+
+        with self.cond:
+            while not self.queue and not self.closing:
+                self.cond.wait()
+
+            if not self.queue:
+                return None
+
+            status_json = self.queue.pop()
+            self.dropped += len(self.queue)
+            self.queue.clear()
+
+            return status_json
+
+    def _requeue(self, status_json):
+        """Puts back a status that failed to be sent, unless a newer one is
+        already waiting.
+        """
+
+        with self.cond:
+            if not self.queue:
+                self.queue.append(status_json)
+
+    def _sleep_backoff(self):
+        """Waits before retrying a failed request, doubling the waiting time
+        up to :attr:`max_backoff`. The wait is interrupted when the sender
+        is closed, in which case it returns False.
+        """
+
+        logger.warning(colored_print(
+            "WARNING: Could not send data to the server. Retrying in {} "
+            "seconds".format(self.backoff), "red_bold"))
+
+        deadline = monotonic() + self.backoff
+        self.backoff = min(self.backoff * 2, self.max_backoff)
+
+        with self.cond:
+            while not self.closing:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return True
+                self.cond.wait(remaining)
+
+        return False
+
+    @property
+    def compression_ratio(self):
+        """float: Ratio between the size of the request bodies before and
+        after compression.
+        """
+
+        if not self.bytes_sent:
+            return 1.0
+
+        return self.bytes_raw / self.bytes_sent
+
+    def _negotiate_encoding(self, r):
+        """Sets the :attr:`content_encoding` from the ``Accept-Encoding``
+        header of a response of the server.
+        """
+
+        accepted = r.headers.get("Accept-Encoding")
+
+        if accepted is None:
+            # The server does not accept the current encoding and does not
+            # say which ones it does
+            if r.status_code == 415:
+                self.content_encoding = None
+            return
+
+        accepted = [x.split(";")[0].strip().lower()
+                    for x in accepted.split(",")]
+        self.content_encoding = next(
+            (x for x in self.ENCODINGS if x in accepted), None)
+
+    def _encode_body(self, data):
+        """Compresses the body of a request with the negotiated encoding.
+
+        Parameters
+        ----------
+        data : bytes
+            The JSON body of the request.
+
+        Returns
+        -------
+        tuple
+            The encoded body and the headers of the request.
+        """
+
+        headers = {"Content-Type": "application/json"}
+
+        if self.content_encoding == "gzip":
+            data = gzip.compress(data, self.compress_level)
+        elif self.content_encoding == "deflate":
+            data = zlib.compress(data, self.compress_level)
+
+        if self.content_encoding:
+            headers["Content-Encoding"] = self.content_encoding
+
+        return data, headers
+
+    def _request(self, method, payload):
+        """Sends a request to the server.
+
+        Returns
+        -------
+        requests.Response or None
+            The response of the server, or None when the server could not
+            be reached or failed with a server error, in which case the
+            request should be retried.
+        """
+
+        # The payload is serialized only once, and its size is taken from
+        # the buffer that is actually sent
+        data = json.dumps(dict(run_id=self.run_id, **payload)).encode("utf8")
+
+        while True:
+            encoding = self.content_encoding
+            body, headers = self._encode_body(data)
+
+            try:
+                r = self.session.request(
+                    method, self.address, timeout=self.timeout, data=body,
+                    headers=headers)
+            except requests.exceptions.RequestException as e:
+                logger.debug("Request failed: {}".format(e))
+                return None
+
+            self.bytes_raw += len(data)
+            self.bytes_sent += len(body)
+
+            self._negotiate_encoding(r)
+
+            # Send again with the encoding accepted by the server
+            if r.status_code == 415 and encoding and \
+                    self.content_encoding != encoding:
+                continue
+
+            break
+
+        logger.debug("{} request sent with size: {} ({} uncompressed)".format(
+            method.upper(), len(body), len(data)))
+
+        if r.status_code >= 500:
+            logger.debug("Server error: {} {}".format(r.status_code,
+                                                       r.reason))
+            return None
+
+        self.backoff = self.min_backoff
+
+        return r
+
+    def _register(self):
+        """Registers the run in the server, retrying until it succeeds.
+        Returns False if the sender should stop.
+        """
+
+        while True:
+            r = self._request("post", self.init_payload)
+            if r is not None:
+                break
+            if not self._sleep_backoff():
+                return False
+
+        if r.status_code != 201:
+            self.error = r.reason
+            logger.error(colored_print(
+                "ERROR: There was a problem sending data to the server "
+                "with reason: {}".format(r.reason), "red_bold"))
+            return False
+
+        self.registered = True
+
+        return True
+
+    def _send_status(self, status_json):
+        """Sends a status to the server. Returns False when it could not be
+        sent and should be retried.
+        """
+
+        while True:
+            # With delta broadcast, only the changes since the last
+            # acknowledged version are sent
+            if self.encoder:
+                payload = self.encoder.encode(status_json)
+            else:
+                payload = {"status_json": status_json}
+
+            r = self._request("put", payload)
+            if r is None:
+                if self.encoder:
+                    self.encoder.discard(payload["version"])
+                return False
+
+            # The server requests a full payload to resync
+            if self.encoder and r.status_code == 409 and \
+                    "status_delta" in payload:
+                self.encoder.reset()
+                continue
+
+            break
+
+        self.sent += 1
+
+        if 200 <= r.status_code < 300:
+            if self.encoder:
+                self.encoder.ack(payload["version"])
+        else:
+            if self.encoder:
+                self.encoder.discard(payload["version"])
+            logger.error(colored_print(
+                "ERROR: There was a problem sending data to the server "
+                "with reason: {}".format(r.reason), "red_bold"))
+
+        return True
+
+    def run(self):
+
+        try:
+            if not self._register():
+                return
+
+            while True:
+                status_json = self._take()
+                if status_json is None:
+                    break
+
+                if self._send_status(status_json):
+                    continue
+
+                # Only one attempt is made to send the last status while
+                # closing
+                if self.closing:
+                    break
+                self._sleep_backoff()
+                self._requeue(status_json)
+
+            # Only one attempt is made to remove the run while closing
+            r = self._request("delete", {})
+            if r is None or r.status_code != 202:
+                logger.error(colored_print(
+                    "ERROR: There was a problem removing the run from the "
+                    "server", "red_bold"))
+        finally:
+            if self.own_session:
+                self.session.close()
+            logger.debug("Sent {} status with {} bytes (compression ratio: "
+                         "{:.2f})".format(self.sent, self.bytes_sent,
+                                          self.compression_ratio))
@@ -0,0 +1,324 @@
+import os
+import logging
+import threading
+
+from time import sleep
+from collections import deque, OrderedDict
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+def dir_size(path):
+    """Returns the size in bytes of the files in a directory and its
+    subdirectories, listed with :py:func:`os.scandir`.
+
+    Symbolic links are ignored, so that the input files that nextflow
+    stages into the work directory of a task are not counted again.
+
+    Parameters
+    ----------
+    path : str
+        Path to the directory.
+
+    Returns
+    -------
+    int
+    """
+
+    total = 0
+    stack = [path]
+
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+        for entry in entries:
+            try:
+                if entry.is_symlink():
+                    continue
+                elif entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+
+    return total
+
+
+def format_size(size):
+    """Formats a size in bytes with the largest suitable unit (e.g.:
+    "1.5GB"), or "-" when it is unknown.
+    """
+
+    if size is None:
+        return "-"
+
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(size) < 1024:
+            return "{}{}".format(round(size, 1), unit)
+        size /= 1024
+
+    return "{}TB".format(round(size, 1))
+
+
+class DiskUsageTracker:
+    """Measures the disk usage of the work directory of each task, in a
+    background thread.
+
+    The work directory of a task is sized once, after its trace entry is
+    parsed. The sizes are only kept as aggregates by process and by sample
+    (tag). At most ``rate`` directories
+    are sized per second, so that large work directories on shared file
+    systems are not scanned in bursts. When the directory of a task is not
+    in the listing of its bucket, only that bucket is listed again, and at
+    most once for all the tasks queued before the new listing.
+
+    The growth of the work directory is estimated from the sizes of the
+    latest tasks and the time they completed, rather than the time they
+    were sized, so that it does not depend on how fast the backlog of
+    directories is sized.
+
+    Parameters
+    ----------
+    resolver : WorkdirResolver
+        Resolves the task hashes into their work directories. It is only
+        used by the thread that sizes the directories.
+    """
+
+    def __init__(self, resolver):
+
+        self.resolver = resolver
+        """
+        :py:class:`WorkdirResolver`: Resolves the task hashes into their work
+        directories.
+        """
+
+        self.tasks = 0
+        """
+        int: Number of sized work directories.
+        """
+
+        self.processes = {}
+        """
+        dict: Maps the processes to the total size of the work directories
+        of their tasks.
+        """
+
+        self.samples = {}
+        """
+        dict: Maps the samples (tags) to the total size of the work
+        directories of their tasks.
+        """
+
+        self.history = deque(maxlen=60)
+        """
+        deque: (completion time, size) tuples of the latest sized tasks,
+        used to estimate the growth of the work directory.
+        """
+
+        self.pending = deque()
+        """
+        deque: (process, tag, hash, completion time) tuples of the tasks
+        waiting to be sized.
+        """
+
+        self.queued = set()
+        """
+        set: Hashes of the :attr:`pending` tasks.
+        """
+
+        self.listed = set()
+        """
+        set: Buckets of the work directory (e.g.: ab) listed by the
+        :attr:`resolver` since the last task was queued. Their listings
+        include the directories of all the :attr:`pending` tasks, so they
+        are not listed again when a directory is not found.
+        """
+
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.stay_alive = True
+
+    def get_state(self):
+        """Returns the aggregated sizes and the pending tasks, to be restored
+        with :func:`restore`. The listings cached by the :attr:`resolver`
+        are not included.
+
+        Returns
+        -------
+        dict
+        """
+
+        with self.lock:
+            return {
+                "tasks": self.tasks,
+                "processes": dict(self.processes),
+                "samples": dict(self.samples),
+                "history": [list(x) for x in self.history],
+                "pending": [list(x) for x in self.pending]
+            }
+
+    def restore(self, state):
+        """Restores the state returned by :func:`get_state`. Must be
+        called before the background thread is started.
+
+        Parameters
+        ----------
+        state : dict
+        """
+
+        self.tasks = state["tasks"]
+        self.processes = dict(state["processes"])
+        self.samples = dict(state["samples"])
+        self.history = deque((tuple(x) for x in state["history"]),
+                             maxlen=self.history.maxlen)
+        self.pending = deque(tuple(x) for x in state["pending"])
+        self.queued = set(x[2] for x in self.pending)
+        self.listed = set()
+
+    def add(self, process, tag, task_hash, end=None):
+        """Queues the work directory of a task to be sized, unless it is
+        already queued.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        tag : str
+            Tag of the task.
+        task_hash : str
+            Hash of the task (e.g.: "ab/123456").
+        end : float, optional
+            Time the task completed, in seconds since the epoch. Tasks
+            without it (e.g.: cached tasks) are not used to estimate the
+            growth.
+        """
+
+        with self.lock:
+            if task_hash in self.queued:
+                return
+            self.pending.append((process, tag, task_hash, end))
+            self.queued.add(task_hash)
+            self.listed.clear()
+
+        self.wake.set()
+
+    def _size_next(self):
+        """Sizes the work directory of the next pending task.
+
+        Returns
+        -------
+        bool
+            False when there are no pending tasks.
+        """
+
+        with self.lock:
+            if not self.pending:
+                return False
+            process, tag, task_hash, end = self.pending.popleft()
+            bucket = task_hash.split("/")[0]
+            # The first lookup of a bucket lists it
+            listed = bucket in self.listed or \
+                bucket not in self.resolver.buckets
+            self.listed.add(bucket)
+
+        path = self.resolver.resolve(task_hash)
+        if path is None and not listed:
+            # The bucket may have been listed before the directory existed
+            self.resolver.clear_bucket(bucket)
+            path = self.resolver.resolve(task_hash)
+        # Each directory is only sized once, so its path is not kept
+        self.resolver.cache.pop(task_hash, None)
+
+        size = dir_size(path) if path else 0
+
+        with self.lock:
+            self.queued.discard(task_hash)
+            self.tasks += 1
+            self.processes[process] = self.processes.get(process, 0) + size
+            self.samples[tag] = self.samples.get(tag, 0) + size
+            if end is not None:
+                self.history.append((end, size))
+
+        return True
+
+    def drain(self):
+        """Sizes all the pending tasks in the current thread.
+        """
+
+        while self._size_next():
+            pass
+
+    def start(self, rate=20):
+        """Starts sizing the pending tasks in a background thread.
+
+        Parameters
+        ----------
+        rate : float
+            Maximum number of directories sized per second.
+        """
+
+        if self.thread is not None:
+            return
+
+        self.thread = threading.Thread(target=self._run, args=(rate,),
+                                       daemon=True)
+        self.thread.start()
+
+    def _run(self, rate):
+
+        while self.stay_alive:
+            if self._size_next():
+                sleep(1 / rate)
+            else:
+                self.wake.wait(1)
+                self.wake.clear()
+
+    def close(self):
+        """Stops the background thread.
+        """
+
+        self.stay_alive = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def summary(self):
+        """Returns the disk usage of the work directories.
+
+        Returns
+        -------
+        dict
+            Dictionary with the "total" size in bytes, the number of sized
+            "tasks" and of "pending" tasks, the "growth" of the total size
+            in bytes per hour of the latest completed tasks (or None) and
+            the sizes by process ("processes") and by sample ("samples"),
+            largest first.
+        """
+
+        with self.lock:
+            processes = sorted(self.processes.items(), key=lambda x: -x[1])
+            samples = sorted(self.samples.items(), key=lambda x: -x[1])
+            pending = len(self.pending)
+            tasks = self.tasks
+            history = sorted(self.history)
+
+        # The directory of the earliest task was written before the period
+        growth = None
+        if len(history) > 1 and history[-1][0] - history[0][0] >= 1:
+            growth = sum(x[1] for x in history[1:]) / \
+                (history[-1][0] - history[0][0]) * 3600
+
+        return {
+            "total": sum(x[1] for x in processes),
+            "tasks": tasks,
+            "pending": pending,
+            "growth": round(growth) if growth is not None else None,
+            "processes": OrderedDict(processes),
+            "samples": OrderedDict(samples)
+        }
@@ -6,27 +6,85 @@ import signal
 import locale
 import socket
 import logging
+import select
+import asyncio
+import struct
+import copy
+import gzip
 import hashlib
-import requests
 import json
+import ctypes
+import ctypes.util
+import threading
 
-from pympler import asizeof
-from os.path import join, abspath
-from time import gmtime, strftime, sleep
-from collections import defaultdict, OrderedDict
+from os.path import join
+from time import gmtime, strftime, sleep, monotonic, time
+from collections import defaultdict, OrderedDict, namedtuple
 
 try:
     import generator.error_handling as eh
     from generator.process_details import colored_print
+    from generator.broadcast import StatusDeltaEncoder, BroadcastSender
+    from generator.status_server import StatusServer
+    from generator.metrics import format_metrics
+    from generator.progress import ProgressEstimator, parse_log_time, \
+        parse_trace_time, format_duration
+    from generator.scheduling import SchedulingStats
+    from generator.stragglers import StragglerDetector
+    from generator.timeline import ConcurrencyTimeline
+    from generator.waste import WasteAccounting
+    from generator.disk_usage import DiskUsageTracker, format_size
 except ImportError:
     import flowcraft.generator.error_handling as eh
     from flowcraft.generator.process_details import colored_print
+    from flowcraft.generator.broadcast import StatusDeltaEncoder, \
+        BroadcastSender
+    from flowcraft.generator.status_server import StatusServer
+    from flowcraft.generator.metrics import format_metrics
+    from flowcraft.generator.progress import ProgressEstimator, \
+        parse_log_time, parse_trace_time, format_duration
+    from flowcraft.generator.scheduling import SchedulingStats
+    from flowcraft.generator.stragglers import StragglerDetector
+    from flowcraft.generator.timeline import ConcurrencyTimeline
+    from flowcraft.generator.waste import WasteAccounting
+    from flowcraft.generator.disk_usage import DiskUsageTracker, \
+        format_size
 
 locale.setlocale(locale.LC_ALL, '')
 code = locale.getpreferredencoding()
 
 logger = logging.getLogger("main.{}".format(__name__))
 
+# inotify is only available on linux. On other systems, the FileWatcher
+# falls back to polling the watched files.
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _inotify_init1 = _libc.inotify_init1
+    _inotify_add_watch = _libc.inotify_add_watch
+    _inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                   ctypes.c_uint32]
+except (OSError, AttributeError, TypeError):
+    _inotify_init1 = None
+    _inotify_add_watch = None
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+
+OverviewSnapshot = namedtuple(
+    "OverviewSnapshot",
+    ["pipeline_tag", "run_status", "totals", "rows", "progress", "waste",
+     "disk_usage"])
+"""
+Immutable view of the inspection state that is rendered by the curses
+overview. It is built by :func:`NextflowInspector._overview_snapshot`.
+"""
+
 
 def signal_handler(screen):
     """This function is bound to the SIGINT signal (like ctrl+c) to graciously
@@ -46,44 +104,1116 @@ def signal_handler(screen):
     sys.exit(0)
 
 
+def write_json(data, output="-"):
+    """Writes an object as a single line of JSON.
+
+    Parameters
+    ----------
+    data : dict
+        Object to write.
+    output : str
+        Path to the output file, or "-" for the standard output.
+    """
+
+    if output == "-":
+        sys.stdout.write(json.dumps(data) + "\n")
+        sys.stdout.flush()
+        return
+
+    with open(output, "w") as fh:
+        fh.write(json.dumps(data) + "\n")
+
+
+def read_tail(path, n=None, max_bytes=None, block_size=65536):
+    """Returns the last lines of a file, reading it backwards in blocks.
+
+    Only the end of the file is read, so that the memory usage does not
+    depend on the size of the file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    n : int, optional
+        Maximum number of lines to return.
+    max_bytes : int, optional
+        Maximum number of bytes to read from the end of the file. A line
+        that is cut by this limit is not returned.
+    block_size : int
+        Size in bytes of each block read from the file.
+
+    Returns
+    -------
+    list
+        The last lines of the file, with their line terminators.
+    """
+
+    chunks = []
+    newlines = 0
+
+    with open(path, "rb") as fh:
+        pos = fh.seek(0, os.SEEK_END)
+        limit = 0 if max_bytes is None else max(pos - max_bytes, 0)
+
+        # Reading stops when there are enough line terminators to have
+        # n complete lines
+        while pos > limit and (n is None or newlines <= n):
+            size = min(block_size, pos - limit)
+            pos -= size
+            fh.seek(pos)
+            chunk = fh.read(size)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+
+        # Checks if the first line read is complete
+        partial = False
+        if pos > 0:
+            fh.seek(pos - 1)
+            partial = fh.read(1) != b"\n"
+
+    lines = b"".join(reversed(chunks)).decode(
+        "utf8", errors="replace").splitlines(True)
+
+    if partial:
+        lines = lines[1:]
+
+    if n is not None:
+        lines = lines[-n:] if n else []
+
+    return lines
+
+
+def draw_frame(pad, frame, lines):
+    """Draws the provided lines on a curses pad, re-drawing only the lines
+    that differ from the ones currently drawn. The text is clipped to the
+    width of the pad, so that it does not wrap over the next line.
+
+    Parameters
+    ----------
+    pad : curses pad
+        The pad where the lines are drawn.
+    frame : dict
+        Maps the line numbers to the lines currently drawn on the pad. It
+        is updated with the new lines.
+    lines : list
+        Each line is a list of (column, text, attribute) segments.
+
+    Returns
+    -------
+    bool
+        True if any line of the pad was changed.
+    """
+
+    changed = False
+    # Writing the last cell of the last line of the pad fails
+    width = pad.getmaxyx()[1] - 1
+
+    for i, line in enumerate(lines):
+        if frame.get(i) == line:
+            continue
+        pad.move(i, 0)
+        pad.clrtoeol()
+        for col, text, attr in line:
+            if col < width:
+                pad.addstr(i, col, text[:width - col], attr)
+        frame[i] = line
+        changed = True
+
+    # Clear lines that are no longer displayed
+    for i in [x for x in frame if x >= len(lines)]:
+        pad.move(i, 0)
+        pad.clrtoeol()
+        del frame[i]
+        changed = True
+
+    return changed
+
+
+class FileTailer:
+    """Incremental reader of a growing text file.
+
+    The tailer remembers the byte offset of the last complete line that was
+    consumed and the inode of the file, so that each call to
+    :func:`read_lines` only returns the lines appended since the previous
+    call. When the file is truncated or replaced (e.g., when nextflow is
+    re-executed with ``-resume``), the offset is reset and the file is read
+    from the beginning.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file that will be tailed.
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        """
+        str: Path to the tailed file.
+        """
+
+        self.offset = 0
+        """
+        int: Byte offset right after the last complete line that was consumed.
+        """
+
+        self.inode = None
+        """
+        int: Inode of the file when it was last read. A different inode means
+        the file was replaced.
+        """
+
+        self.reset = False
+        """
+        boolean: Set to True by :func:`changed` when the file was truncated or
+        replaced since the last read, and the offset was moved back to zero.
+        """
+
+    def changed(self):
+        """Checks whether the file has new content since the last read.
+
+        This method also detects truncation or replacement of the file, in
+        which case the :attr:`offset` is set to zero and the :attr:`reset`
+        attribute is set to True.
+
+        Returns
+        -------
+        bool
+            True if there are bytes beyond the current offset.
+
+        Raises
+        ------
+        FileNotFoundError
+            When the file does not exist.
+        """
+
+        st = os.stat(self.path)
+
+        self.reset = False
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.reset = self.inode is not None or self.offset != 0
+            self.inode = st.st_ino
+            self.offset = 0
+
+        return st.st_size > self.offset
+
+    def read_lines(self):
+        """Generator of the complete lines appended since the last read.
+
+        A trailing line without a newline character is considered to be still
+        under writing and is left for the next read. The :attr:`offset` is
+        advanced as each line is yielded.
+
+        Yields
+        ------
+        str
+            Decoded line, including the newline character.
+        """
+
+        with open(self.path, "rb") as fh:
+            fh.seek(self.offset)
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                yield line.decode("utf8", errors="replace")
+
+    def _digest(self):
+        """Returns the md5 digest of the bytes that precede the current
+        offset (up to 4 KB), which identify the content already read.
+        """
+
+        start = max(self.offset - 4096, 0)
+
+        with open(self.path, "rb") as fh:
+            fh.seek(start)
+            return hashlib.md5(fh.read(self.offset - start)).hexdigest()
+
+    def get_state(self):
+        """Returns the reading position of the tailer, to be restored
+        with :func:`restore`.
+
+        Returns
+        -------
+        dict
+        """
+
+        return {"offset": self.offset, "inode": self.inode,
+                "digest": self._digest()}
+
+    def restore(self, state):
+        """Restores a reading position returned by :func:`get_state`,
+        provided that the file was not replaced and that the content
+        before the position did not change.
+
+        Parameters
+        ----------
+        state : dict
+            Reading position of the tailer.
+
+        Returns
+        -------
+        bool
+            True if the position was restored.
+        """
+
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+
+        if st.st_ino != state["inode"] or st.st_size < state["offset"]:
+            return False
+
+        offset, inode = self.offset, self.inode
+        self.offset, self.inode = state["offset"], state["inode"]
+
+        if self._digest() != state["digest"]:
+            self.offset, self.inode = offset, inode
+            return False
+
+        return True
+
+
+class FileWatcher:
+    """Waits for changes in a set of files.
+
+    On linux, the parent directories of the files are watched with inotify,
+    so that the waiting process wakes up as soon as one of the files is
+    modified, created, replaced or removed. On other systems, or when inotify
+    is not available, the files are polled with :py:func:`os.stat`, with an
+    interval that starts at ``min_interval`` and doubles, up to
+    ``max_interval``, each time nothing changes. Since inotify does not
+    report the writes made from other hosts of a network file system (e.g.:
+    NFS, Lustre), the files are also polled every ``max_interval`` when
+    inotify is used.
+
+    Parameters
+    ----------
+    paths : list
+        Paths of the files to watch.
+    min_interval : float
+        Minimum polling interval, in seconds.
+    max_interval : float
+        Maximum polling interval, in seconds.
+    """
+
+    EVENT_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | \
+        IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, paths, min_interval=0.02, max_interval=2.0):
+
+        self.paths = [os.path.abspath(x) for x in paths]
+        """
+        list: Absolute paths of the watched files.
+        """
+
+        self.min_interval = min_interval
+        """
+        float: Minimum polling interval, in seconds.
+        """
+
+        self.max_interval = max(min_interval, max_interval)
+        """
+        float: Maximum polling interval, in seconds.
+        """
+
+        self.interval = min_interval
+        """
+        float: Current polling interval, in seconds.
+        """
+
+        self.watches = {}
+        """
+        dict: Maps the inotify watch descriptors to the names of the watched
+        files in that directory.
+        """
+
+        self.fd = self._init_inotify()
+        """
+        int: File descriptor of the inotify instance, or None when the files
+        are polled.
+        """
+
+        self.stamps = self._get_stamps()
+        """
+        dict: Size, modification time and inode of each file, used to
+        detect changes when polling.
+        """
+
+        self.next_poll = monotonic() + self.max_interval
+        """
+        float: Monotonic time of the next poll of the files, when inotify
+        is used.
+        """
+
+    def _init_inotify(self):
+
+        if _inotify_init1 is None:
+            return None
+
+        fd = _inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+
+        dirs = defaultdict(set)
+        for path in self.paths:
+            dirs[os.path.dirname(path)].add(os.path.basename(path))
+
+        for d, names in dirs.items():
+            wd = _inotify_add_watch(fd, d.encode("utf8"), self.EVENT_MASK)
+            if wd < 0:
+                os.close(fd)
+                self.watches = {}
+                return None
+            self.watches[wd] = names
+
+        return fd
+
+    def _get_stamps(self):
+
+        stamps = {}
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                stamps[path] = (st.st_size, st.st_mtime, st.st_ino)
+            except FileNotFoundError:
+                stamps[path] = None
+
+        return stamps
+
+    def _read_events(self):
+        """Reads the pending inotify events and checks whether any of them
+        refers to one of the watched files.
+        """
+
+        changed = False
+
+        while True:
+            try:
+                buf = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+
+            pos = 0
+            while pos + 16 <= len(buf):
+                wd, mask, _, length = struct.unpack_from("iIII", buf, pos)
+                name = buf[pos + 16:pos + 16 + length].rstrip(b"\0")
+                pos += 16 + length
+
+                if mask & IN_Q_OVERFLOW or \
+                        name.decode("utf8", errors="replace") in \
+                        self.watches.get(wd, ()):
+                    changed = True
+
+        return changed
+
+    def _reset_stamps(self):
+        """Stores the current stamps of the files after a change reported
+        by inotify, so that the same change is not reported again by
+        :func:`_poll`.
+        """
+
+        self.stamps = self._get_stamps()
+        self.interval = self.min_interval
+        self.next_poll = monotonic() + self.max_interval
+
+    def _poll(self):
+
+        self.next_poll = monotonic() + self.max_interval
+
+        stamps = self._get_stamps()
+        if stamps != self.stamps:
+            self.stamps = stamps
+            self.interval = self.min_interval
+            return True
+
+        self.interval = min(self.interval * 2, self.max_interval)
+        return False
+
+    def wait(self, timeout=None, fds=()):
+        """Blocks until one of the watched files changes, one of the
+        provided file descriptors is ready for reading, or the timeout
+        expires.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Maximum time to wait, in seconds. When None, waits until there
+            is a change.
+        fds : list
+            Additional file descriptors (e.g.: stdin) that should interrupt
+            the wait when ready for reading.
+
+        Returns
+        -------
+        bool
+            True if one of the watched files changed.
+        """
+
+        deadline = None if timeout is None else monotonic() + timeout
+
+        while True:
+
+            remaining = None if deadline is None else \
+                max(0, deadline - monotonic())
+
+            if self.fd is not None:
+                wait_time = max(0, self.next_poll - monotonic())
+                if remaining is not None:
+                    wait_time = min(wait_time, remaining)
+                ready = select.select([self.fd] + list(fds), [], [],
+                                      wait_time)[0]
+                if self.fd in ready and self._read_events():
+                    self._reset_stamps()
+                    return True
+                if any(x != self.fd for x in ready):
+                    return False
+                # Writes from other hosts are only detected by polling
+                if monotonic() >= self.next_poll and self._poll():
+                    return True
+            else:
+                wait_time = self.interval if remaining is None else \
+                    min(self.interval, remaining)
+                if fds:
+                    ready = select.select(list(fds), [], [], wait_time)[0]
+                else:
+                    sleep(wait_time)
+                    ready = []
+                if self._poll():
+                    return True
+                if ready:
+                    return False
+
+            if deadline is not None and monotonic() >= deadline:
+                return False
+
+    async def wait_async(self, timeout=None):
+        """Coroutine version of :func:`wait`, that waits until one of the
+        watched files changes without blocking the event loop.
+
+        The inotify file descriptor is registered as a reader of the event
+        loop, so that many watchers can be awaited from a single thread.
+        The files are also polled when no event arrives for
+        ``max_interval`` seconds. Without inotify, the coroutine sleeps
+        between checks.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Maximum time to wait, in seconds. When None, waits until there
+            is a change.
+
+        Returns
+        -------
+        bool
+            True if one of the watched files changed.
+        """
+
+        loop = asyncio.get_event_loop()
+        deadline = None if timeout is None else monotonic() + timeout
+
+        while True:
+
+            remaining = None if deadline is None else \
+                max(0, deadline - monotonic())
+
+            if self.fd is not None:
+                wait_time = max(0, self.next_poll - monotonic())
+                if remaining is not None:
+                    wait_time = min(wait_time, remaining)
+                ready = loop.create_future()
+                loop.add_reader(self.fd, lambda: ready.done() or
+                                ready.set_result(None))
+                try:
+                    await asyncio.wait_for(ready, wait_time)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    loop.remove_reader(self.fd)
+                if self._read_events():
+                    self._reset_stamps()
+                    return True
+                # Writes from other hosts are only detected by polling
+                if monotonic() >= self.next_poll and self._poll():
+                    return True
+            else:
+                await asyncio.sleep(self.interval if remaining is None
+                                    else min(self.interval, remaining))
+                if self._poll():
+                    return True
+
+            if deadline is not None and monotonic() >= deadline:
+                return False
+
+    def close(self):
+        """Closes the inotify file descriptor.
+        """
+
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ParserThread(threading.Thread):
+    """Background thread that updates the inspection whenever the nextflow
+    files change and publishes a snapshot of the inspection state. A new
+    snapshot is also published every ``clock_rate`` seconds of the
+    inspector, so that the values that depend on the current time (e.g.:
+    the stragglers) are updated while the files do not change.
+
+    Each new snapshot is stored in the :attr:`snapshot` attribute and
+    signalled by writing to the :attr:`read_fd` pipe, so that the consumer
+    (e.g.: the curses interface) can wait on it with :py:func:`select.select`
+    while remaining responsive to other events.
+
+    Parameters
+    ----------
+    inspector : NextflowInspector
+        The inspector whose attributes are updated.
+    snapshot_func : function
+        Function called after each update that returns the snapshot to
+        publish.
+    """
+
+    def __init__(self, inspector, snapshot_func):
+
+        super().__init__(daemon=True)
+
+        self.inspector = inspector
+        self.snapshot_func = snapshot_func
+
+        self.snapshot = None
+        """
+        object: The latest published snapshot.
+        """
+
+        self.error = None
+        """
+        Exception: Exception raised while updating the inspection. The
+        thread stops when this attribute is set.
+        """
+
+        self.stop_event = threading.Event()
+
+        self.read_fd, self.write_fd = os.pipe()
+        os.set_blocking(self.read_fd, False)
+
+        self.watcher = FileWatcher(
+            [inspector.log_file, inspector.trace_file],
+            inspector.refresh_rate)
+
+    def run(self):
+
+        changed = True
+        next_snapshot = 0
+
+        try:
+            while not self.stop_event.is_set():
+                if changed:
+                    self.inspector.update_inspection()
+                if changed or monotonic() >= next_snapshot:
+                    self.snapshot = self.snapshot_func()
+                    os.write(self.write_fd, b"s")
+                    next_snapshot = monotonic() + self.inspector.clock_rate
+                # Wake up periodically to check the stop event
+                changed = self.watcher.wait(0.5)
+        except Exception as e:
+            self.error = e
+            os.write(self.write_fd, b"e")
+
+    def consume(self):
+        """Clears the pending notifications of the pipe and returns the
+        latest snapshot.
+
+        Raises
+        ------
+        Exception
+            The exception raised in the thread while updating the
+            inspection, if any.
+        """
+
+        try:
+            os.read(self.read_fd, 4096)
+        except BlockingIOError:
+            pass
+
+        if self.error:
+            raise self.error
+
+        return self.snapshot
+
+    def stop(self):
+        """Stops the thread and releases its file descriptors.
+        """
+
+        self.stop_event.set()
+        self.join(timeout=5)
+        self.watcher.close()
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+class WorkdirResolver:
+    """Resolves nextflow hash strings (e.g.: ae/1dasjdm) into the full path
+    of the task work directory.
+
+    Resolved paths are cached, and the listing of each two character bucket
+    of the work directory is performed with :py:func:`os.scandir` at most
+    once between calls to :func:`clear_buckets`. This avoids listing large
+    work directories on shared file systems for every task.
+
+    Parameters
+    ----------
+    work_path : str
+        Path to the nextflow work directory.
+    """
+
+    def __init__(self, work_path):
+
+        self.work_path = work_path
+        """
+        str: Path to the nextflow work directory.
+        """
+
+        self.cache = {}
+        """
+        dict: Maps the hash strings to the full path of their work directory.
+        """
+
+        self.buckets = {}
+        """
+        dict: Maps the first part of the hash strings (e.g.: ae) to the list
+        of directory names in that bucket.
+        """
+
+    def clear_buckets(self):
+        """Clears the bucket listings, so that each bucket is listed again
+        on the next unresolved lookup. The cache of resolved paths is kept.
+        """
+
+        self.buckets = {}
+
+    def clear_bucket(self, bucket):
+        """Clears the listing of a single bucket (e.g.: ae), so that it is
+        listed again on its next unresolved lookup.
+
+        Parameters
+        ----------
+        bucket : str
+            First part of the hash strings of the bucket.
+        """
+
+        self.buckets.pop(bucket, None)
+
+    def _list_bucket(self, bucket):
+
+        try:
+            self.buckets[bucket] = [x.name for x in
+                                    os.scandir(join(self.work_path, bucket))]
+        except (FileNotFoundError, NotADirectoryError):
+            self.buckets[bucket] = []
+
+        return self.buckets[bucket]
+
+    def resolve(self, hash_str):
+        """Returns the full path of the work directory of a hash string.
+
+        Parameters
+        ----------
+        hash_str : str
+            Nextflow process hash with the beggining of the work directory
+
+        Returns
+        -------
+        str or None
+            Path to working directory of the hash string, or None if it could
+            not be found.
+        """
+
+        try:
+            return self.cache[hash_str]
+        except KeyError:
+            pass
+
+        try:
+            first_hash, second_hash = hash_str.split("/")
+        except ValueError:
+            return None
+
+        try:
+            entries = self.buckets[first_hash]
+        except KeyError:
+            entries = self._list_bucket(first_hash)
+
+        for l in entries:
+            if l.startswith(second_hash):
+                path = join(self.work_path, first_hash, l)
+                self.cache[hash_str] = path
+                return path
+
+
+class TraceEntry:
+    """Compact record of a single line of the nextflow trace file.
+
+    Strings with a limited set of values (process, tag, status, etc.) are
+    interned, and numeric columns are converted once when the line is
+    parsed: the start in seconds since the epoch, times in seconds, sizes
+    in megabytes and the cpu load in percentage. Columns without a value
+    ("-") or that are not present in the trace file are stored as None.
+    """
+
+    COLUMNS = OrderedDict([
+        ("task_id", "task_id"),
+        ("hash", "hash"),
+        ("process", "process"),
+        ("tag", "tag"),
+        ("status", "status"),
+        ("exit", "exit"),
+        ("start", "start"),
+        ("queue", "queue"),
+        ("cpus", "cpus"),
+        ("memory", "memory"),
+        ("duration", "duration"),
+        ("realtime", "realtime"),
+        ("%cpu", "pcpu"),
+        ("rss", "rss"),
+        ("rchar", "rchar"),
+        ("wchar", "wchar")
+    ])
+    """
+    dict: Maps the trace columns that are stored to the attribute names.
+    Other trace columns are ignored.
+    """
+
+    __slots__ = list(COLUMNS.values())
+
+    def __init__(self, **kwargs):
+
+        for attr in self.__slots__:
+            setattr(self, attr, kwargs.get(attr))
+
+
+class ProcessAccumulator:
+    """Running aggregates of the trace entries of a single process.
+
+    Trace entries are added once, when they are parsed, and removed when
+    they are discarded (e.g., entries of failed attempts), so that the
+    process statistics can be derived without iterating over all entries.
+    The values of each entry are provided as the numeric metrics returned
+    by :func:`NextflowInspector._trace_metrics`.
+    """
+
+    def __init__(self):
+
+        self.count = 0
+        """
+        int: Number of trace entries.
+        """
+
+        self.completed = 0
+        """
+        int: Number of trace entries with a successful status.
+        """
+
+        self.parsed = 0
+        """
+        int: Number of trace entries that were added, including the ones
+        that were removed afterwards.
+        """
+
+        self.sums = defaultdict(float)
+        """
+        dict: Sum of the values of each metric.
+        """
+
+        self.counts = defaultdict(int)
+        """
+        dict: Number of entries with a value for each metric.
+        """
+
+        self.missing = set()
+        """
+        set: Metrics whose trace columns are not present in the trace file.
+        """
+
+        self.max_rss = None
+        """
+        float: Maximum rss of the trace entries, in MB.
+        """
+
+        self.max_rss_stale = False
+        """
+        boolean: Set to True when the entry with the maximum rss is removed.
+        The maximum must then be recomputed with :func:`rebuild_max_rss`.
+        """
+
+        self.completed_max_rss = None
+        """
+        float: Maximum rss of the entries with a successful status, in MB.
+        These entries are never removed, so the maximum is kept when their
+        trace entries are not stored in the checkpoint.
+        """
+
+        self.cpu_warnings = {}
+        """
+        dict: Cpu load warnings for each tag.
+        """
+
+        self.mem_warnings = {}
+        """
+        dict: Memory usage warnings for each tag.
+        """
+
+    def get_state(self):
+        """Returns the aggregates, to be restored with :func:`restore`.
+
+        Returns
+        -------
+        dict
+        """
+
+        return {
+            "count": self.count,
+            "completed": self.completed,
+            "parsed": self.parsed,
+            "sums": dict(self.sums),
+            "counts": dict(self.counts),
+            "missing": sorted(self.missing),
+            "max_rss": self.max_rss,
+            "max_rss_stale": self.max_rss_stale,
+            "completed_max_rss": self.completed_max_rss,
+            "cpu_warnings": self.cpu_warnings,
+            "mem_warnings": self.mem_warnings
+        }
+
+    def restore(self, state):
+        """Restores the aggregates returned by :func:`get_state`.
+
+        Parameters
+        ----------
+        state : dict
+        """
+
+        for attr in ["count", "completed", "parsed", "max_rss",
+                     "max_rss_stale", "completed_max_rss"]:
+            setattr(self, attr, state[attr])
+
+        self.sums = defaultdict(float, state["sums"])
+        self.counts = defaultdict(int, state["counts"])
+        self.missing = set(state["missing"])
+        self.cpu_warnings = dict(state["cpu_warnings"])
+        self.mem_warnings = dict(state["mem_warnings"])
+
+    def add(self, metrics):
+        """Adds the metrics of a trace entry to the aggregates.
+
+        Parameters
+        ----------
+        metrics : dict
+            Numeric metrics of the trace entry. Metrics with a None value
+            have no value for this entry, while metrics in the "missing" set
+            are not present in the trace file.
+        """
+
+        self.count += 1
+        self.parsed += 1
+        if metrics["completed"]:
+            self.completed += 1
+
+        self.missing = set(metrics["missing"])
+
+        for m in ["realtime", "cpuhour", "rss", "rchar", "wchar"]:
+            if metrics[m] is not None:
+                self.sums[m] += metrics[m]
+                self.counts[m] += 1
+
+        if metrics["rss"] is not None and \
+                (self.max_rss is None or metrics["rss"] > self.max_rss):
+            self.max_rss = metrics["rss"]
+
+        if metrics["completed"] and metrics["rss"] is not None and \
+                (self.completed_max_rss is None or
+                 metrics["rss"] > self.completed_max_rss):
+            self.completed_max_rss = metrics["rss"]
+
+    def remove(self, metrics):
+        """Removes the metrics of a trace entry from the aggregates.
+
+        Parameters
+        ----------
+        metrics : dict
+            Numeric metrics of the trace entry, as provided to :func:`add`.
+        """
+
+        self.count -= 1
+        if metrics["completed"]:
+            self.completed -= 1
+
+        for m in ["realtime", "cpuhour", "rss", "rchar", "wchar"]:
+            if metrics[m] is not None:
+                self.sums[m] -= metrics[m]
+                self.counts[m] -= 1
+
+        if metrics["rss"] is not None and metrics["rss"] == self.max_rss:
+            self.max_rss_stale = True
+
+    def rebuild_max_rss(self, metrics_list):
+        """Recomputes the maximum rss from the metrics of the remaining
+        trace entries and the maximum of the successful entries.
+
+        Parameters
+        ----------
+        metrics_list : list
+            Metrics of the remaining trace entries of the process. The
+            entries with a successful status may be omitted.
+        """
+
+        rss_values = [x["rss"] for x in metrics_list if x["rss"] is not None]
+        if self.completed_max_rss is not None:
+            rss_values.append(self.completed_max_rss)
+        self.max_rss = max(rss_values) if rss_values else None
+        self.max_rss_stale = False
+
+    def mean(self, metric):
+        """Returns the mean value of a metric, or None when no entry has
+        a value for it.
+        """
+
+        if not self.counts[metric]:
+            return None
+
+        return self.sums[metric] / self.counts[metric]
+
+
 class NextflowInspector:
 
     MAX_RETRIES = 1000
 
-    def __init__(self, trace_file, refresh_rate, pretty=False, ip_addr=None):
+    CHECKPOINT_VERSION = 12
+    """
+    int: Version of the checkpoint format. Checkpoints with a different
+    version are ignored.
+    """
+
+    CHECKPOINT_ATTRS = [
+        "trace_header", "process_stats", "process_tags", "pipeline_tag",
+        "pipeline_name", "time_start", "time_stop", "execution_command",
+        "nextflow_version", "run_status", "abort_cause", "content_lines",
+        "_expect_version"
+    ]
+    """
+    list: Attributes derived from the parsing of the nextflow files that are
+    stored as they are in the checkpoint. The remaining attributes are
+    converted by :func:`_get_checkpoint_state`.
+    """
+
+    CHECKPOINT_SETS = ["trace_missing", "samples"]
+    """
+    list: Set attributes that are stored as lists in the checkpoint.
+    """
 
-        self.trace_file = trace_file
+    CHECKPOINT_HELPERS = ["progress", "scheduling", "stragglers", "timeline",
+                          "waste", "disk_usage"]
+    """
+    list: Attributes whose state is stored with their ``get_state`` method
+    and restored with their ``restore`` method.
+    """
+
+    def __init__(self, trace_file, refresh_rate, pretty=False, ip_addr=None,
+                 delta=False, checkpoint=True, workdir=None,
+                 straggler_factor=3, capacity=None, gantt=False,
+                 retry_alarm=0.25, disk_rate=20):
+
+        self.workdir = os.path.abspath(workdir) if workdir else os.getcwd()
+        """
+        str: Path to the pipeline work directory
+        """
+
+        self.trace_file = join(self.workdir, trace_file)
         """
         str: Path to nextflow trace file.
         """
 
-        self.trace_sizestamp = None
+        self.trace_tail = FileTailer(self.trace_file)
+        """
+        :py:class:`FileTailer`: Keeps the byte offset and inode of the trace
+        file, so that only the newly appended lines are parsed.
+        """
+
+        self.trace_header = None
+        """
+        dict: Mapping of the trace file columns to their position, as
+        returned by :func:`_header_mapping`. It is None until the header line
+        has been read.
+        """
+
+        self.trace_missing = set()
         """
-        str: Stores the sizestamp of the last modification of the trace file.
-        This is used to parse the file only when it has changed.
+        set: Columns of :py:attr:`TraceEntry.COLUMNS` that are not present
+        in the header of the trace file.
         """
 
-        self.refresh_rate = refresh_rate
+        self.refresh_rate = float(refresh_rate)
         """
-        float: Frequency (in seconds) that the curses screen will be refreshed.
+        float: Minimum interval (in seconds) between checks of the trace and
+        log files, when they have to be polled for changes.
         """
 
-        self.stored_ids = []
+        self.clock_rate = 1
         """
-        list: Stores the task_ids that have already been parsed. It is used
+        float: Interval (in seconds) between updates of the clock in the
+        curses header, independently of changes in the files.
+        """
+
+        self.publish_rate = 10
+        """
+        float: Maximum interval (in seconds) between the publications of the
+        status in the broadcast and server modes, so that the values that
+        depend on the current time (e.g.: the stragglers, the estimated time
+        left and the work directories sized in the background) are updated
+        while the files do not change.
+        """
+
+        self.next_publish = 0
+        """
+        float: Time (see :py:func:`time.monotonic`) when the status must be
+        published again, even if the inspection did not change.
+        """
+
+        self.stored_ids = set()
+        """
+        set: Stores the task hashes that have already been parsed. It is used
         to skip them when parsing the trace files multiple times.
         """
 
-        self.stored_log_ids = []
+        self.stored_log_ids = set()
         """
-        list: Stores the time stamps of the log file lines that were already
+        set: Stores the time stamps of the log file lines that were already
         parsed. It is used to skip parsing the log files multilpe times
         """
 
-        self.trace_info = defaultdict(list)
+        self.trace_info = defaultdict(OrderedDict)
         """
         dict: Main object that stores the status information for each process
-        name in the trace file.
+        name in the trace file. For each process, the
+        :py:class:`TraceEntry` of each task is stored with the task hash as
+        key.
+        """
+
+        self.trace_tag_index = defaultdict(list)
+        """
+        dict: Index of the task hashes in :attr:`trace_info` for each
+        (process, tag) tuple. It is used to retrieve the trace entries of a
+        given tag without iterating over all entries of the process.
+        """
+
+        self.trace_new_entries = defaultdict(list)
+        """
+        dict: Trace entries of each process that were parsed since the last
+        update of the tag status in :func:`_update_process_stats`.
         """
 
         self.process_stats = {}
@@ -91,13 +1221,65 @@ class NextflowInspector:
         dict: Contains some statistics for each process.
         """
 
+        self.process_accumulators = defaultdict(ProcessAccumulator)
+        """
+        dict: Maps each process to a :py:class:`ProcessAccumulator` with the
+        running aggregates of its trace entries. The :attr:`process_stats`
+        are derived from these aggregates.
+        """
+
+        self.progress = ProgressEstimator()
+        """
+        :py:class:`ProgressEstimator`: Submission and completion times of
+        the processes, used to estimate their throughput and remaining time.
+        """
+
+        self.scheduling = SchedulingStats()
+        """
+        :py:class:`SchedulingStats`: Queue wait and overhead of the tasks of
+        each process and executor queue.
+        """
+
+        self.stragglers = StragglerDetector()
+        """
+        :py:class:`StragglerDetector`: Streaming quantiles of the duration
+        of the completed tasks of each process.
+        """
+
+        self.timeline = ConcurrencyTimeline(gantt=gantt)
+        """
+        :py:class:`ConcurrencyTimeline`: Step function of the cpus in use
+        by the tasks.
+        """
+
+        self.waste = WasteAccounting()
+        """
+        :py:class:`WasteAccounting`: Compute spent on the failed attempts of
+        each process and tag.
+        """
+
+        # The tracker sizes the directories in its own thread, so it has its
+        # own resolver
+        self.disk_usage = DiskUsageTracker(
+            WorkdirResolver(join(self.workdir, "work")))
+        """
+        :py:class:`DiskUsageTracker`: Size of the work directory of each
+        task, aggregated by process and by sample.
+        """
+
+        self.stats_pending = set()
+        """
+        set: Processes whose aggregates changed since the last update of
+        :attr:`process_stats`.
+        """
+
         self.processes = OrderedDict()
         """
         dict: Dictionary of processes from the pipeline with the status of the
-        channel as the value. This information is retrieved from the 
-        .nextflow.log file in the :func:`_parser_pipeline_processes` method
-        and updated in the :func:`_update_barrier_status` and 
-        :func:`_update_process_stats` and :func:`_update_submission_status`.
+        channel as the value. This information is retrieved from the
+        .nextflow.log file in the :func:`_log_process_creation` method
+        and updated in the :func:`_log_barrier`, :func:`_log_submission`
+        and :func:`_update_tag_status` methods.
         """
 
         self.process_tags = {}
@@ -106,9 +1288,30 @@ class NextflowInspector:
         it processes
         """
 
-        self.samples = []
+        self.samples = set()
+        """
+        set: Samples inferred from the pipeline.
+        """
+
+        self.failed_logs = {}
+        """
+        dict: Maps the (process, tag) tuples of failed tags to the path of
+        their ``.command.log`` file. The end of the file is only read when
+        the status is broadcast (see :func:`_get_failed_log`).
+        """
+
+        self.failed_log_tails = {}
+        """
+        dict: Maps the (process, tag) tuples of failed tags to the last
+        lines of their log file, after they were read.
+        """
+
+        self.events = None
         """
-        list: List of samples inferred from the pipeline.
+        list: State changes of the inspection since they were last consumed
+        (e.g.: tag submitted or completed), as dictionaries with the "event"
+        key. Events are only recorded when this attribute is a list (see
+        :func:`stream_events`).
         """
 
         self.skip_processes = ["status", "compile_status", "report",
@@ -119,15 +1322,21 @@ class NextflowInspector:
         purposes.
         """
 
-        self.log_file = ".nextflow.log"
+        self.log_file = join(self.workdir, ".nextflow.log")
+        """
+        str: Path to the nextflow log file.
+        """
+
+        self.log_tail = FileTailer(self.log_file)
         """
-        str: Name of the nextflow log file.
+        :py:class:`FileTailer`: Keeps the byte offset and inode of the nextflow
+        log file, so that each line of the log is classified only once.
         """
 
-        self.log_sizestamp = None
+        self._expect_version = False
         """
-        str: Stores the sizestamp of the last modification of the nextflow 
-        log file. This is used to parse the file only when it has changed.
+        boolean: Set to True when the nextflow.cli.CmdRun line is found, so
+        that the following log line is parsed for the nextflow version.
         """
 
         self.pipeline_tag = ""
@@ -165,9 +1374,11 @@ class NextflowInspector:
         attribute is only set when the pipeline is not running.
         """
 
-        self.workdir = os.getcwd()
+        self.workdir_resolver = WorkdirResolver(join(self.workdir, "work"))
         """
-        str: Path to the pipeline work directory
+        :py:class:`WorkdirResolver`: Caches the expansion of the task hashes
+        into their work directories. Hashes are only expanded when the work
+        directory is actually needed.
         """
 
         self.execution_command = None
@@ -208,17 +1419,52 @@ class NextflowInspector:
         str: Address of the REST api where the information will be sent
         """
 
-        self._c = 0
-        """
-        Counter of payloads sent, for debug purposes
-        """
-
         self.send = True
         """
         boolean: This attribute will be set to False after sending a request
         and set to True when there is a change in the inspection attributes.
         """
 
+        self.delta_broadcast = delta
+        """
+        boolean: When True, the broadcast payloads only contain the changes
+        since the last version acknowledged by the server, using a
+        :py:class:`StatusDeltaEncoder`.
+        """
+
+        self.straggler_factor = straggler_factor
+        """
+        float: Running tags whose time since submission exceeds this multiple
+        of the 90th percentile of the duration of their process are flagged
+        as stragglers.
+        """
+
+        self.capacity = capacity
+        """
+        int: Number of cpus available to the executor, used to compute the
+        utilization of the :attr:`timeline`. If None, the utilization is not
+        computed.
+        """
+
+        self.gantt = gantt
+        """
+        boolean: If True, the intervals of each task are included in the
+        summary of the :attr:`timeline`.
+        """
+
+        self.retry_alarm = retry_alarm
+        """
+        float: Fraction of failed attempts of a process above which it
+        raises a retry alarm.
+        """
+
+        self.disk_rate = disk_rate
+        """
+        float: Maximum number of task work directories sized per second by
+        the :attr:`disk_usage` tracker. If 0, the work directories are not
+        sized.
+        """
+
         # Skip these process names (they are check with the startswith()
         # method) when using the --pretty option
         if pretty:
@@ -240,22 +1486,65 @@ class NextflowInspector:
         self.screen_lines = None
         self.max_width = 0
         self.content_lines = 0
+        # Pad reused between refreshes and the lines that are currently
+        # drawn on it, so that only changed lines are re-drawn
+        self.pad = None
+        self.pad_size = None
+        self.frame = {}
+        self.frame_padding = None
+        # Cache of the process lines for the last rendered snapshot
+        self.frame_key = None
+        self.frame_rows = []
+
+        self.checkpoint_file = join(
+            os.path.dirname(self.trace_file),
+            ".{}.checkpoint".format(os.path.basename(self.trace_file))) \
+            if checkpoint else None
+        """
+        str: Path to the dotfile where the inspection state is stored, next
+        to the trace file. If None, the state is not stored.
+        """
+
+        self.checkpoint_interval = 60
+        """
+        int: Minimum time in seconds between two checkpoints.
+        """
+
+        self.last_checkpoint = None
+        """
+        float: Time of the last checkpoint, or None if no checkpoint was
+        written yet.
+        """
+
+        self.checkpoint_positions = None
+        """
+        tuple: Reading positions of the nextflow files at the last
+        checkpoint.
+        """
 
         # Checks if nextflow log and trace files are available
         self._check_required_files()
-        # Gathers the complete list of processes from the nextflow log
-        self._get_pipeline_processes()
-        # Fetches the pipeline status from the nextflow log
-        self._update_pipeline_status()
-
-        # Bind SIGINT to singal_handler function. This makes a clean exit
-        # from the curses interface when exiting through ctrl+c.
-        signal.signal(signal.SIGINT, lambda *x: signal_handler(self.screen))
+        # Resumes the inspection from the last checkpoint, when the nextflow
+        # files have not been replaced since then
+        if self.checkpoint_file:
+            self.load_checkpoint()
+        # Gathers the list of processes and the pipeline status from the
+        # nextflow log
+        self.log_parser()
 
     #################
     # UTILITY METHODS
     #################
 
+    def _bind_signal_handler(self):
+        """Binds SIGINT to the :func:`signal_handler` function. This makes
+        a clean exit from the curses interface when exiting through ctrl+c.
+        It is only bound by the modes that run until interrupted, so that
+        one-shot inspections do not print to the standard output.
+        """
+
+        signal.signal(signal.SIGINT, lambda *x: signal_handler(self.screen))
+
     def _check_required_files(self):
         """Checks whetner the trace and log files are available
         """
@@ -290,10 +1579,44 @@ class NextflowInspector:
         )
 
     @staticmethod
-    def _expand_path(hash_str):
+    def _get_end_time(info):
+        """Returns the time a task completed, in seconds since the epoch,
+        from the ``start`` and ``realtime`` (or ``duration``) of its trace
+        entry. Returns None for cached tasks or when the entry lacks these
+        columns.
+
+        Parameters
+        ----------
+        info : TraceEntry
+            Trace entry of the task.
+
+        Returns
+        -------
+        float
+        """
+
+        elapsed = info.realtime if info.realtime is not None \
+            else info.duration
+        if info.status == "CACHED" or info.start is None or elapsed is None:
+            return None
+
+        return info.start + elapsed
+
+    def _start_disk_usage(self):
+        """Starts sizing the work directories of the tasks in the background
+        (see :py:class:`DiskUsageTracker`), unless :attr:`disk_rate` is 0.
+        """
+
+        if self.disk_rate:
+            self.disk_usage.start(self.disk_rate)
+
+    def _expand_path(self, hash_str):
         """Expands the hash string of a process (ae/1dasjdm) into a full
         working directory
 
+        The expansion is delegated to the :attr:`workdir_resolver`, which
+        caches the result.
+
         Parameters
         ----------
         hash_str : str
@@ -305,15 +1628,7 @@ class NextflowInspector:
             Path to working directory of the hash string
         """
 
-        try:
-            first_hash, second_hash = hash_str.split("/")
-            first_hash_path = join(abspath("work"), first_hash)
-
-            for l in os.listdir(first_hash_path):
-                if l.startswith(second_hash):
-                    return join(first_hash_path, l)
-        except FileNotFoundError:
-            return None
+        return self.workdir_resolver.resolve(hash_str)
 
     @staticmethod
     def _hms(s):
@@ -322,7 +1637,8 @@ class NextflowInspector:
         Parameters
         ----------
         s : str
-            The hms string can be something like '20s', '1m30s' or '300ms'.
+            The hms string can be something like '20s', '1m30s', '2m' or
+            '300ms'.
 
         Returns
         -------
@@ -337,13 +1653,14 @@ class NextflowInspector:
         if s.endswith("ms"):
             return float(s.rstrip("ms")) / 1000
 
-        fields = list(map(float, re.split("[hms]", s)[:-1]))
-        if len(fields) == 3:
-            return fields[0] * 3600 + fields[1] * 60 + fields[2]
-        elif len(fields) == 2:
-            return fields[0] * 60 + fields[1]
-        else:
-            return fields[0]
+        # Each value is converted according to its unit, since any of them
+        # may be omitted (e.g.: '2m' or '1d 5s')
+        units = {"d": 86400, "h": 3600, "m": 60, "s": 1}
+        fields = re.findall(r"([\d.]+)\s*([dhms])", s)
+        if not fields:
+            raise ValueError("Invalid time string: {}".format(s))
+
+        return sum(float(val) * units[unit] for val, unit in fields)
 
     @staticmethod
     def _size_coverter(s):
@@ -386,138 +1703,223 @@ class NextflowInspector:
         else:
             return "{}MB".format(s)
 
-    #########################
-    # AUXILIARY PARSE METHODS
-    #########################
+    #########################
+    # AUXILIARY PARSE METHODS
+    #########################
+
+    def _log_process_creation(self, line):
+        """Retrieves a process name from the .nextflow.log file and adds it
+        to the :attr:`processes` attribute.
+
+        This method parses lines with the following signature::
+
+             Apr-19 19:07:32.660 [main] DEBUG nextflow.processor
+             TaskProcessor - Creating operator > report_corrupt_1_1 --
+             maxForks: 4
+
+        Parameters
+        ----------
+        line : str
+            Line of the nextflow log with the .*Creating operator.* signature
+        """
+
+        # Retrieves the process name from the string
+        match = re.match(r".*Creating operator > (.*) --", line)
+        if not match:
+            return
+
+        process = match.group(1)
 
-    def _get_pipeline_processes(self):
-        """Parses the .nextflow.log file and retrieves the complete list
-        of processes
+        if any([process.startswith(x) for x in self._blacklist]):
+            return
 
-        This method searches for specific signatures at the beginning of the
-        .nextflow.log file::
+        if process not in self.skip_processes:
+            self.processes[process] = {
+                "barrier": "W",
+                "submitted": set(),
+                "finished": set(),
+                "failed": set(),
+                "retry": set(),
+                "cpus": None,
+                "memory": None
+            }
+            self.process_tags[process] = {}
+            self.content_lines = len(self.processes)
 
-             Apr-19 19:07:32.660 [main] DEBUG nextflow.processor
-             TaskProcessor - Creating operator > report_corrupt_1_1 --
-             maxForks: 4
+    def _log_pipeline_launch(self, line):
+        """Retrieves the pipeline name and tag from the launching line of the
+        .nextflow.log file.
 
-        When a line with the .*Creating operator.* signature is found, the
-        process name is retrieved and populates the :attr:`processes` attribute
+        Parameters
+        ----------
+        line : str
+            Line of the nextflow log with the .*Launching.* signature
         """
 
-        with open(self.log_file) as fh:
-
-            for line in fh:
-                if re.match(".*Creating operator.*", line):
-                    # Retrieves the process name from the string
-                    match = re.match(".*Creating operator > (.*) --", line)
-                    process = match.group(1)
-
-                    if any([process.startswith(x) for x in self._blacklist]):
-                        continue
-
-                    if process not in self.skip_processes:
-                        self.processes[match.group(1)] = {
-                            "barrier": "W",
-                            "submitted": set(),
-                            "finished": set(),
-                            "failed": set(),
-                            "retry": set(),
-                            "cpus": None,
-                            "memory": None
-                        }
-                        self.process_tags[process] = {}
-
-                # Retrieves the pipeline name from the string
-                if re.match(".*Launching `.*` \[.*\] ", line):
-                    tag_match = re.match(".*Launching `.*` \[(.*)\] ", line)
-                    self.pipeline_tag = tag_match.group(1) if tag_match else \
-                        "?"
-                    name_match = re.match(".*Launching `(.*)` \[.*\] ", line)
-                    self.pipeline_name = name_match.group(1) if name_match \
-                        else "?"
-
-        self.content_lines = len(self.processes)
+        if re.match(r".*Launching `.*` \[.*\] ", line):
+            tag_match = re.match(r".*Launching `.*` \[(.*)\] ", line)
+            self.pipeline_tag = tag_match.group(1) if tag_match else \
+                "?"
+            name_match = re.match(r".*Launching `(.*)` \[.*\] ", line)
+            self.pipeline_name = name_match.group(1) if name_match \
+                else "?"
 
     def _clear_inspect(self):
         """Clears inspect attributes when re-executing a pipeline"""
 
-        self.trace_info = defaultdict(list)
+        self.trace_info = defaultdict(OrderedDict)
+        self.trace_tag_index = defaultdict(list)
+        self.trace_new_entries = defaultdict(list)
         self.process_tags = {}
         self.process_stats = {}
-        self.samples = []
-        self.stored_ids = []
-        self.stored_log_ids = []
+        self.process_accumulators = defaultdict(ProcessAccumulator)
+        self.progress = ProgressEstimator()
+        self.scheduling = SchedulingStats()
+        self.stragglers = StragglerDetector()
+        self.timeline = ConcurrencyTimeline(gantt=self.gantt)
+        self.waste = WasteAccounting()
+        # The work directories of the new execution are sized by a new
+        # tracker
+        restart = self.disk_usage.thread is not None
+        self.disk_usage.close()
+        self.disk_usage = DiskUsageTracker(
+            WorkdirResolver(join(self.workdir, "work")))
+        if restart:
+            self._start_disk_usage()
+        self.stats_pending = set()
+        self.samples = set()
+        self.stored_ids = set()
+        self.stored_log_ids = set()
+        self.failed_logs = {}
+        self.failed_log_tails = {}
         self.time_start = None
         self.time_stop = None
         self.execution_command = None
         self.nextflow_version = None
         self.abort_cause = None
-        self._c = 0
+        self._expect_version = False
         # Clean up of tag running status
         for p in self.processes.values():
             p["barrier"] = "W"
             for i in ["submitted", "finished", "failed", "retry"]:
                 p[i] = set()
 
-    def _update_pipeline_status(self):
-        """Parses the .nextflow.log file for signatures of pipeline status.
-        It sets the :attr:`status_info` attribute.
+    def _emit(self, event, **fields):
+        """Records a state change of the inspection in :attr:`events`, when
+        events are being recorded.
+
+        Parameters
+        ----------
+        event : str
+            Type of the event.
+        fields : dict
+            Fields of the event.
+        """
+
+        if self.events is not None:
+            self.events.append(dict(event=event, **fields))
+
+    def _log_run_start(self, line):
+        """Parses the first line of the .nextflow.log file for the starting
+        time and the execution command of the pipeline.
+
+        Parameters
+        ----------
+        line : str
+            First line of the nextflow log
         """
 
-        with open(self.log_file) as fh:
+        time_str = " ".join(line.split()[:2])
+        self.time_start = time_str
 
-            first_line = next(fh)
-            time_str = " ".join(first_line.split()[:2])
-            self.time_start = time_str
+        if not self.execution_command:
+            try:
+                self.execution_command = re.match(
+                    ".*nextflow run (.*)", line).group(1)
+            except AttributeError:
+                self.execution_command = "Unknown"
 
-            if not self.execution_command:
-                try:
-                    self.execution_command = re.match(
-                        ".*nextflow run (.*)", first_line).group(1)
-                except AttributeError:
-                    self.execution_command = "Unknown"
+    def _log_nextflow_version(self, line):
+        """Parses the line following the nextflow.cli.CmdRun signature of the
+        .nextflow.log file for the nextflow version.
 
-            for line in fh:
+        Parameters
+        ----------
+        line : str
+            Line of the nextflow log with the version string
+        """
 
-                if "DEBUG nextflow.cli.CmdRun" in line:
-                    if not self.nextflow_version:
-                        try:
-                            vline = next(fh)
-                            self.nextflow_version = re.match(
-                                ".*Version: (.*)", vline).group(1)
-                        except AttributeError:
-                            self.nextflow_version = "Unknown"
-
-                if "Session aborted" in line:
-                    self.run_status = "aborted"
-                    # Get abort cause
-                    try:
-                        self.abort_cause = re.match(
-                            ".*Cause: (.*)", line).group(1)
-                    except AttributeError:
-                        self.abort_cause = "Unknown"
-                    # Get time of pipeline stop
-                    time_str = " ".join(line.split()[:2])
-                    self.time_stop = time_str
-                    self.send = True
-                    return
-                if "Execution complete -- Goodbye" in line:
-                    self.run_status = "complete"
-                    # Get time of pipeline stop
-                    time_str = " ".join(line.split()[:2])
-                    self.time_stop = time_str
-                    self.send = True
-                    return
-
-        if self.run_status not in ["running", ""]:
-            self._clear_inspect()
-            # Take a break to allow nextflow to restart before refreshing
-            # pipeine processes
-            sleep(5)
-            self._get_pipeline_processes()
+        self._expect_version = False
 
-        self.run_status = "running"
+        if not self.nextflow_version:
+            try:
+                self.nextflow_version = re.match(
+                    ".*Version: (.*)", line).group(1)
+            except AttributeError:
+                self.nextflow_version = "Unknown"
+
+    def _log_run_end(self, line):
+        """Parses the signatures of pipeline termination in the
+        .nextflow.log file and sets the :attr:`run_status` attribute.
+
+        Parameters
+        ----------
+        line : str
+            Line of the nextflow log with either the .*Session aborted.* or
+            the .*Execution complete -- Goodbye.* signatures
+        """
+
+        if "Session aborted" in line:
+            self.run_status = "aborted"
+            # Get abort cause
+            try:
+                self.abort_cause = re.match(
+                    ".*Cause: (.*)", line).group(1)
+            except AttributeError:
+                self.abort_cause = "Unknown"
+        else:
+            self.run_status = "complete"
+
+        # Get time of pipeline stop
+        time_str = " ".join(line.split()[:2])
+        self.time_stop = time_str
+        self.send = True
+
+    def _remove_unsuccessful_entries(self, process, tag):
+        """Removes the trace entries of a process/tag combination that do
+        not have a successful status.
+
+        This is used to discard the entries of failed attempts once the
+        tag has been submitted again or has successfully finished.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        tag : str
+            Tag of the process.
+        """
+
+        good_status = ["COMPLETED", "CACHED"]
+
+        key = (process, tag)
+        if key not in self.trace_tag_index:
+            return
+
+        proc_info = self.trace_info[process]
+        hashes = []
+        for h in self.trace_tag_index[key]:
+            if proc_info[h].status in good_status:
+                hashes.append(h)
+            else:
+                self._remove_entry_stats(process, proc_info[h])
+                del proc_info[h]
+
+        if len(hashes) != len(self.trace_tag_index[key]):
+            self._update_tag_warnings(process, tag, [proc_info[h]
+                                                     for h in hashes])
+
+        self.trace_tag_index[key] = hashes
 
     def _update_tag_status(self, process, vals):
         """ Updates the 'submitted', 'finished', 'failed' and 'retry' status
@@ -536,89 +1938,184 @@ class NextflowInspector:
         process : str
             Name of the current process. Must be present in attr:`processes`
         vals : list
-            List of tags for this process that have been gathered in the
-            trace file.
+            List of trace entries for this process that have been gathered
+            in the trace file since the last update.
         """
 
         good_status = ["COMPLETED", "CACHED"]
 
+        p = self.processes[process]
+
         # Update status of each process
-        for v in list(vals)[::-1]:
-            p = self.processes[process]
-            tag = v["tag"]
+        for v in vals[::-1]:
+            tag = v.tag
 
             # If the process/tag is in the submitted list, move it to the
             # complete or failed list
             if tag in p["submitted"]:
                 p["submitted"].remove(tag)
-                if v["status"] in good_status:
+                if v.status in good_status:
                     p["finished"].add(tag)
-                elif v["status"] == "FAILED":
-                    self.process_tags[process][tag]["log"] = \
-                        self._retrieve_log(join(v["work_dir"], ".command.log"))
+                    self.progress.completed(process, v)
+                    self._emit("completed", process=process, tag=tag,
+                               status=v.status, hash=v.hash)
+                elif v.status == "FAILED":
+                    work_dir = self._expand_path(v.hash or "")
+                    # The log is only read when it is broadcast
+                    self.process_tags[process][tag]["log"] = None
+                    self.failed_logs[(process, tag)] = \
+                        join(work_dir, ".command.log") if work_dir else None
+                    self.failed_log_tails.pop((process, tag), None)
                     p["failed"].add(tag)
+                    self._emit("failed", process=process, tag=tag,
+                               exit=v.exit, hash=v.hash)
 
             # It the process/tag is in the retry list and it completed
-            # successfully, remove it from the retry and fail lists. Otherwise
-            # maintain it in the retry/failed lists
+            # successfully, move it from the retry and fail lists to the
+            # complete list. Otherwise maintain it in the retry/failed lists
             elif tag in p["retry"]:
-                if v["status"] in good_status:
+                if v.status in good_status:
                     p["retry"].remove(tag)
                     p["failed"].remove(tag)
+                    p["finished"].add(tag)
                     del self.process_tags[process][tag]["log"]
-                elif self.run_status == "aborted":
-                    p["retry"].remove(tag)
+                    self.failed_logs.pop((process, tag), None)
+                    self.failed_log_tails.pop((process, tag), None)
+                    self.progress.completed(process, v)
+                    self._emit("completed", process=process, tag=tag,
+                               status=v.status, hash=v.hash)
 
-            elif v["status"] in good_status:
+            elif v.status in good_status and tag not in p["finished"]:
                 p["finished"].add(tag)
+                self.progress.completed(process, v)
+                self._emit("completed", process=process, tag=tag,
+                           status=v.status, hash=v.hash)
 
-            # Filter tags without a successfull status.
-            if v["status"] not in good_status:
-                if v["tag"] in list(p["submitted"]) + list(p["finished"]):
-                    vals.remove(v)
-
-        return vals
-
-    def _update_barrier_status(self):
-        """Checks whether the channels to each process have been closed.
-        """
+        # Filter entries of tags without a successful status.
+        for tag in set(v.tag for v in vals):
+            if tag in p["submitted"] or tag in p["finished"]:
+                self._remove_unsuccessful_entries(process, tag)
 
-        with open(self.log_file) as fh:
+        # Retries will not be executed after the pipeline was aborted
+        if self.run_status == "aborted":
+            p["retry"].clear()
 
-            for line in fh:
+    def _log_barrier(self, line):
+        """Sets the channel of a process as closed when a
+        .*<<< barrier arrive.* signature is found in the nextflow log.
 
-                # Exit barrier update after session abort signal
-                if "Session aborted" in line:
-                    return
+        Parameters
+        ----------
+        line : str
+            Line of the nextflow log with the barrier signature
+        """
 
-                if "<<< barrier arrive" in line:
-                    # Retrieve process name from string
-                    process_m = re.match(".*process: (.*)\)", line)
-                    if process_m:
-                        process = process_m.group(1)
-                        # Updates process channel to complete
-                        if process in self.processes:
-                            self.processes[process]["barrier"] = "C"
+        # Retrieve process name from string
+        process_m = re.match(r".*process: (.*)\)", line)
+        if process_m:
+            process = process_m.group(1)
+            # Updates process channel to complete
+            if process in self.processes and \
+                    self.processes[process]["barrier"] != "C":
+                self.processes[process]["barrier"] = "C"
+                self._emit("barrier_closed", process=process)
 
     @staticmethod
-    def _retrieve_log(path):
-        """Method used to retrieve the contents of a log file into a list.
+    def _retrieve_log(path, n=300, max_bytes=65536):
+        """Method used to retrieve the end of a log file into a list.
 
         Parameters
         ----------
-        path
+        path : str
+            Path to the log file.
+        n : int
+            Maximum number of lines retrieved.
+        max_bytes : int
+            Maximum number of bytes read from the end of the file.
 
         Returns
         -------
         list or None
-            Contents of the provided file, each line as a list entry
+            Last lines of the provided file, each line as a list entry
         """
 
         if not os.path.exists(path):
             return None
 
-        with open(path) as fh:
-            return fh.readlines()
+        return read_tail(path, n, max_bytes)
+
+    def _get_failed_log(self, process, tag):
+        """Returns the end of the log file of a failed tag. The log file is
+        only read the first time.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        tag : str
+            Tag of the failed task.
+
+        Returns
+        -------
+        list or None
+            Last lines of the log file, or None if it is not available.
+        """
+
+        key = (process, tag)
+
+        if key not in self.failed_log_tails:
+            path = self.failed_logs.get(key)
+            self.failed_log_tails[key] = \
+                self._retrieve_log(path) if path else None
+
+        return self.failed_log_tails[key]
+
+    def _build_trace_entry(self, fields, hm):
+        """Builds a :py:class:`TraceEntry` from the fields of a trace line,
+        converting the numeric columns.
+
+        Parameters
+        ----------
+        fields : list
+            List of the tab-seperated elements of the trace line
+        hm : dict
+            Maps the column IDs to their position in the fields argument.
+
+        Returns
+        -------
+        TraceEntry
+        """
+
+        values = {}
+        for column, attr in TraceEntry.COLUMNS.items():
+            try:
+                val = fields[hm[column]]
+            except (KeyError, IndexError):
+                continue
+            if val != "-":
+                values[attr] = val
+
+        converters = [
+            (["start"], parse_trace_time),
+            (["cpus"], int),
+            (["memory", "rss", "rchar", "wchar"], self._size_coverter),
+            (["duration", "realtime"], self._hms),
+            (["pcpu"],
+             lambda x: float(x.replace(",", ".").replace("%", "")))
+        ]
+        for attrs, func in converters:
+            for attr in attrs:
+                if attr in values:
+                    try:
+                        values[attr] = func(values[attr])
+                    except ValueError:
+                        del values[attr]
+
+        for attr in ["process", "tag", "status", "exit", "queue"]:
+            if attr in values:
+                values[attr] = sys.intern(values[attr])
+
+        return TraceEntry(**values)
 
     def _update_trace_info(self, fields, hm):
         """Parses a trace line and updates the :attr:`status_info` attribute.
@@ -638,80 +2135,76 @@ class NextflowInspector:
             return
 
         # Get information from a single line of trace file
-        info = dict((column, fields[pos]) for column, pos in hm.items())
+        info = self._build_trace_entry(fields, hm)
+        tag = fields[hm["tag"]]
 
-        # The headers that will be used to populate the process
+        # The headers that will be used to populate the process. The tags
+        # that finished before the checkpoint are not stored anymore
         process_tag_headers = ["realtime", "rss", "rchar", "wchar"]
+        tag_info = self.process_tags[process].get(tag)
         for h in process_tag_headers:
-            if h in info and info["tag"] != "-":
-                if h != "realtime" and info[h] != "-":
-                    self.process_tags[process][info["tag"]][h] = \
-                        round(self._size_coverter(info[h]), 2)
+            if h in hm and tag != "-" and tag_info is not None:
+                value = getattr(info, h)
+                if h != "realtime" and value is not None:
+                    tag_info[h] = round(value, 2)
                 else:
-                    self.process_tags[process][info["tag"]][h] = info[h]
+                    # The original time string is kept for the realtime
+                    tag_info[h] = fields[hm[h]]
 
         # Set allocated cpu and memory information to process
-        if "cpus" in info and not self.processes[process]["cpus"]:
-            self.processes[process]["cpus"] = info["cpus"]
-        if "memory" in info and not self.processes[process]["memory"]:
-            self.processes[process]["memory"] = self._size_coverter(
-                info["memory"])
+        if "cpus" in hm and not self.processes[process]["cpus"]:
+            self.processes[process]["cpus"] = fields[hm["cpus"]]
+        if info.memory is not None and not self.processes[process]["memory"]:
+            self.processes[process]["memory"] = info.memory
 
-        if info["hash"] in self.stored_ids:
+        if info.hash in self.stored_ids:
             return
 
-        # If the task hash code is provided, expand it to the work directory
-        # and add a new entry
-        if "hash" in info:
-            hs = info["hash"]
-            info["work_dir"] = self._expand_path(hs)
-
-        if "tag" in info:
-            tag = info["tag"]
-            if tag != "-" and tag not in self.samples and \
-                    tag.split()[0] not in self.samples:
-                self.samples.append(tag)
-
-        self.trace_info[process].append(info)
-        self.stored_ids.append(info["hash"])
+        if tag != "-" and tag not in self.samples and \
+                tag.split()[0] not in self.samples:
+            self.samples.add(info.tag)
+
+        self.trace_info[process][info.hash] = info
+        self.trace_tag_index[(process, info.tag)].append(info.hash)
+        self.trace_new_entries[process].append(info)
+        self.stored_ids.add(info.hash)
+
+        self.scheduling.add(process, info)
+        self.timeline.add(process, info)
+        self.waste.add(process, info)
+        if info.hash:
+            self.disk_usage.add(process, info.tag, info.hash,
+                                self._get_end_time(info))
+        if info.status == "COMPLETED":
+            duration = info.duration if info.duration is not None \
+                else info.realtime
+            if duration is not None:
+                self.stragglers.add(process, duration)
+
+        self._add_entry_stats(process, info)
 
-    def _update_process_resources(self, process, vals):
-        """Updates the resources info in :attr:`processes` dictionary.
-        """
-
-        resources = ["cpus"]
-
-        for r in resources:
-            if not self.processes[process][r]:
-                try:
-                    self.processes[process][r] = vals[0]["cpus"]
-                # When the trace column is not present
-                except KeyError:
-                    pass
-
-    def _cpu_load_parser(self, cpus, cpu_per, t):
+    @staticmethod
+    def _cpu_load_parser(cpus, cpu_per, t):
         """Parses the cpu load from the number of cpus and its usage
         percentage and returnsde cpu/hour measure
 
         Parameters
         ----------
-        cpus : str
+        cpus : int
             Number of cpus allocated.
-        cpu_per : str
-            Percentage of cpu load measured (e.g.: 200,5%).
-        t : str
-            The time string can be something like '20s', '1m30s' or '300ms'.
+        cpu_per : float
+            Percentage of cpu load measured (e.g.: 200.5).
+        t : float
+            Time in seconds.
         """
 
-        try:
-            _cpus = float(cpus)
-            _cpu_per = float(cpu_per.replace(",", ".").replace("%", ""))
-            hours = self._hms(t) / 60 / 24
+        if not cpus or cpu_per is None or t is None:
+            return 0
 
-            return ((_cpu_per / (100 * _cpus)) * _cpus) * hours
+        _cpus = float(cpus)
+        hours = t / 60 / 24
 
-        except ValueError:
-            return 0
+        return ((cpu_per / (100 * _cpus)) * _cpus) * hours
 
     def _assess_resource_warnings(self, process, vals):
         """Assess whether the cpu load or memory usage is above the allocation
@@ -720,8 +2213,8 @@ class NextflowInspector:
         ----------
         process : str
             Process name
-        vals : vals
-            List of trace information for each tag of that process
+        vals : list
+            List of :py:class:`TraceEntry` for each tag of that process
 
         Returns
         -------
@@ -735,226 +2228,581 @@ class NextflowInspector:
         mem_warnings = {}
 
         for i in vals:
-            try:
-                expected_load = float(i["cpus"]) * 100
-                cpu_load = float(i["%cpu"].replace(",", ".").replace("%", ""))
+            if i.cpus is not None and i.pcpu is not None:
+                expected_load = float(i.cpus) * 100
+                cpu_load = i.pcpu
 
                 if expected_load * 0.9 > cpu_load > expected_load * 1.10:
-                    cpu_warnings[i["tag"]] = {
+                    cpu_warnings[i.tag] = {
                         "expected":  expected_load,
                         "value": cpu_load
                     }
-            except (ValueError, KeyError):
-                pass
 
-            try:
-                rss = self._size_coverter(i["rss"])
-                mem_allocated = self._size_coverter(i["memory"])
+            if i.rss is not None and i.memory is not None:
+                rss = i.rss
+                mem_allocated = i.memory
 
                 if rss > mem_allocated * 1.10:
-                    mem_warnings[i["tag"]] = {
+                    mem_warnings[i.tag] = {
                         "expected": mem_allocated,
                         "value": rss
                     }
-            except (ValueError, KeyError):
-                pass
 
         return cpu_warnings, mem_warnings
 
+    def _trace_metrics(self, info):
+        """Returns the numeric metrics of a trace entry used by the
+        :py:class:`ProcessAccumulator`.
+
+        Parameters
+        ----------
+        info : TraceEntry
+            Trace information of a single task.
+
+        Returns
+        -------
+        dict
+            With the realtime (seconds), cpuhour, rss, rchar and wchar (MB)
+            values, or None when the entry has no value. The "missing" key
+            contains the metrics whose trace columns are not present.
+        """
+
+        good_status = ["COMPLETED", "CACHED"]
+
+        metrics = {
+            "completed": info.status in good_status,
+            "missing": set()
+        }
+
+        # An empty realtime ("-") is counted as 0 in the average time
+        if "realtime" in self.trace_missing:
+            metrics["realtime"] = None
+            metrics["missing"].add("realtime")
+        else:
+            metrics["realtime"] = info.realtime or 0
+
+        if self.trace_missing.intersection(["cpus", "%cpu", "realtime"]):
+            metrics["cpuhour"] = None
+            metrics["missing"].add("cpuhour")
+        else:
+            metrics["cpuhour"] = self._cpu_load_parser(
+                info.cpus, info.pcpu, info.realtime)
+
+        for h in ["rss", "rchar", "wchar"]:
+            metrics[h] = getattr(info, h)
+            if h in self.trace_missing:
+                metrics["missing"].add(h)
+
+        return metrics
+
+    def _add_entry_stats(self, process, info):
+        """Adds a new trace entry to the aggregates of its process.
+        """
+
+        acc = self.process_accumulators[process]
+        acc.add(self._trace_metrics(info))
+
+        cpu_warnings, mem_warnings = self._assess_resource_warnings(
+            process, [info])
+        acc.cpu_warnings.update(cpu_warnings)
+        acc.mem_warnings.update(mem_warnings)
+
+        self.stats_pending.add(process)
+
+    def _remove_entry_stats(self, process, info):
+        """Removes a discarded trace entry from the aggregates of its
+        process.
+        """
+
+        self.process_accumulators[process].remove(self._trace_metrics(info))
+        self.stats_pending.add(process)
+
+    def _update_tag_warnings(self, process, tag, vals):
+        """Re-assesses the resource warnings of a tag from its remaining
+        trace entries.
+        """
+
+        acc = self.process_accumulators[process]
+        acc.cpu_warnings.pop(tag, None)
+        acc.mem_warnings.pop(tag, None)
+
+        cpu_warnings, mem_warnings = self._assess_resource_warnings(
+            process, vals)
+        acc.cpu_warnings.update(cpu_warnings)
+        acc.mem_warnings.update(mem_warnings)
+
     def _update_process_stats(self):
         """Updates the process stats with the information from the processes
 
         This method is called at the end of each static parsing of the nextflow
-        trace file. It re-populates the :attr:`process_stats` dictionary
-        with the new stat metrics.
+        trace file. It updates the :attr:`process_stats` dictionary of the
+        processes with new trace entries, using the running aggregates in
+        :attr:`process_accumulators`.
         """
 
-        good_status = ["COMPLETED", "CACHED"]
+        # Update submission status of tags for each process with the new
+        # trace entries
+        for process, new_vals in self.trace_new_entries.items():
+            self._update_tag_status(process, new_vals)
+        self.trace_new_entries = defaultdict(list)
+
+        for process in self.stats_pending:
 
-        for process, vals in self.trace_info.items():
+            acc = self.process_accumulators[process]
 
-            # Update submission status of tags for each process
-            vals = self._update_tag_status(process, vals)
+            # All entries of this process were from failed attempts
+            if not acc.count:
+                self.process_stats.pop(process, None)
+                continue
 
-            # Update process resources
-            self._update_process_resources(process, vals)
+            if acc.max_rss_stale:
+                acc.rebuild_max_rss([
+                    self._trace_metrics(x)
+                    for x in self.trace_info[process].values()])
 
             self.process_stats[process] = {}
 
             inst = self.process_stats[process]
 
             # Get number of completed samples
-            inst["completed"] = "{}".format(
-                len([x for x in vals if x["status"] in good_status]))
+            inst["completed"] = "{}".format(acc.completed)
 
             # Get average time
-            try:
-                time_array = [self._hms(x["realtime"]) for x in vals]
-                mean_time = round(sum(time_array) / len(time_array), 1)
-                mean_time_str = strftime('%H:%M:%S', gmtime(mean_time))
-                inst["realtime"] = mean_time_str
-            # When the realtime column is not present
-            except KeyError:
+            if "realtime" in acc.missing:
                 inst["realtime"] = "-"
+            else:
+                mean_time = round(acc.mean("realtime"), 1)
+                inst["realtime"] = strftime('%H:%M:%S', gmtime(mean_time))
+
+            # Get average queue wait and overhead
+            for key, stat in [("wait", "avgwait"), ("overhead", "overhead")]:
+                mean_latency = self.scheduling.mean(process, key)
+                if mean_latency is None:
+                    inst[stat] = "-"
+                else:
+                    inst[stat] = strftime('%H:%M:%S',
+                                          gmtime(round(mean_latency, 1)))
 
             # Get cumulative cpu/hours
-            try:
-                cpu_hours = [self._cpu_load_parser(
-                    x["cpus"], x["%cpu"], x["realtime"]) for x in vals]
-                inst["cpuhour"] = round(sum(cpu_hours), 2)
-            # When the realtime, cpus or %cpus column are not present
-            except KeyError:
+            if "cpuhour" in acc.missing:
                 inst["cpuhour"] = "-"
+            else:
+                inst["cpuhour"] = round(acc.sums["cpuhour"], 2)
 
             # Assess resource warnings
-            inst["cpu_warnings"], inst["mem_warnings"] = \
-                self._assess_resource_warnings(process, vals)
+            inst["cpu_warnings"] = dict(acc.cpu_warnings)
+            inst["mem_warnings"] = dict(acc.mem_warnings)
 
             # Get maximum memory
-            try:
-                rss_values = [self._size_coverter(x["rss"]) for x in vals
-                              if x["rss"] != "-"]
-                if rss_values:
-                    max_rss = round(max(rss_values))
-                    rss_str = self._size_compress(max_rss)
-                else:
-                    rss_str = "-"
-                inst["maxmem"] = rss_str
-            except KeyError:
+            if acc.max_rss is not None:
+                inst["maxmem"] = self._size_compress(round(acc.max_rss))
+            else:
                 inst["maxmem"] = "-"
 
-            # Get read size
-            try:
-                rchar_values = [self._size_coverter(x["rchar"]) for x in vals
-                                if x["rchar"] != "-"]
-                if rchar_values:
-                    avg_rchar = round(sum(rchar_values) / len(rchar_values))
-                    rchar_str = self._size_compress(avg_rchar)
+            # Get read and write sizes
+            for metric, key in [("rchar", "avgread"), ("wchar", "avgwrite")]:
+                mean_size = acc.mean(metric)
+                if mean_size is not None:
+                    inst[key] = self._size_compress(round(mean_size))
                 else:
-                    rchar_str = "-"
-            except KeyError:
-                rchar_str = "-"
-            inst["avgread"] = rchar_str
+                    inst[key] = "-"
 
-            # Get write size
-            try:
-                wchar_values = [self._size_coverter(x["wchar"]) for x in vals
-                                if x["wchar"] != "-"]
-                if wchar_values:
-                    avg_wchar = round(sum(wchar_values) / len(wchar_values))
-                    wchar_str = self._size_compress(avg_wchar)
-                else:
-                    wchar_str = "-"
-            except KeyError:
-                wchar_str = "-"
-            inst["avgwrite"] = wchar_str
+        self.stats_pending = set()
+
+    #################
+    # PARSING METHODS
+    #################
+
+    def trace_parser(self):
+        """Method that parses the new lines of the trace file and updates the
+        :attr:`status_info` attribute with the new entries.
+
+        Only the lines appended since the last call are read, using the
+        byte offset stored in :attr:`trace_tail`. If the trace file was
+        truncated or replaced, it is parsed again from the header.
+        """
+
+        # Check the size and inode of the trace file. Only proceed with the
+        # parsing if new content was appended from the previous time.
+        has_changed = self.trace_tail.changed()
+        self.trace_retry = 0
+
+        if self.trace_tail.reset:
+            self.trace_header = None
+
+        if not has_changed:
+            return
+
+        for line in self.trace_tail.read_lines():
+
+            # Skip empty lines
+            if line.strip() == "":
+                continue
+
+            # Get header mappings before parsing the rest of the file
+            if self.trace_header is None:
+                self.trace_header = self._header_mapping(line.strip())
+                self.trace_missing = set(
+                    x for x in TraceEntry.COLUMNS
+                    if x not in self.trace_header)
+                continue
+
+            hm = self.trace_header
+            fields = line.strip().split("\t")
+
+            # Skip if task ID was already processes
+            if fields[hm["task_id"]] in self.stored_ids:
+                continue
+
+            # Parse trace entry and update status_info attribute
+            self._update_trace_info(fields, hm)
+            self.send = True
+
+        self._update_process_stats()
+
+    def _log_submission(self, line):
+        """Updates the submitted tags of a process from a submission
+        line of the nextflow log.
+
+        Parameters
+        ----------
+        line : str
+            Line of the nextflow log with one of the .*Submitted process >.*,
+            .*Re-submitted process >.* or .*Cached process >.* signatures
+        """
+
+        r = r".* (.*) \[.*\].*\[(.*)\].*process > (.*) \((.*)\).*"
+
+        m = re.match(r, line)
+        if not m:
+            return
+
+        time_start = m.group(1)
+        workdir = m.group(2)
+        process = m.group(3)
+        tag = m.group(4)
+
+        if time_start + tag not in self.stored_log_ids:
+            self.stored_log_ids.add(time_start + tag)
+        else:
+            return
+
+        if process not in self.processes:
+            return
+
+        if "Cached process >" not in line:
+            # The time of the submission does not include the date
+            self.scheduling.submitted(workdir, " ".join(line.split()[:2]))
+
+        p = self.processes[process]
+        if tag in p["finished"] or tag in p["retry"]:
+            return
+        if tag in p["failed"] and \
+                "Re-submitted process >" in line:
+            p["retry"].add(tag)
+            self._emit("retrying", process=process, tag=tag,
+                       time=time_start, hash=workdir)
+            self.send = True
+            return
+
+        p["barrier"] = "R"
+        if tag not in p["submitted"]:
+            p["submitted"].add(tag)
+            # The work directory is only expanded when it is broadcast
+            self.process_tags[process][tag] = {
+                "hash": workdir,
+                "workdir": None,
+                "start": time_start
+            }
+            self._remove_unsuccessful_entries(process, tag)
+            # The time of the submission does not include the date
+            self.progress.submitted(process, " ".join(line.split()[:2]))
+            self._emit("submitted", process=process, tag=tag,
+                       time=time_start, hash=workdir)
+            self.send = True
+
+    def _classify_log_line(self, line):
+        """Classifies a single line of the nextflow log and sends it to the
+        appropriate handler.
+
+        The status and barrier signatures are ignored once the pipeline has
+        been aborted or completed, since the remaining lines of the log
+        refer to the shutdown of the session.
+
+        Parameters
+        ----------
+        line : str
+            Line of the nextflow log
+        """
+
+        if self.time_start is None:
+            self._log_run_start(line)
+            return
+
+        if self._expect_version:
+            self._log_nextflow_version(line)
+
+        if "Submitted process >" in line or \
+                "Re-submitted process >" in line or \
+                "Cached process >" in line:
+            self._log_submission(line)
+
+        elif "Creating operator" in line:
+            self._log_process_creation(line)
+
+        elif "Launching `" in line:
+            self._log_pipeline_launch(line)
+
+        elif self.run_status in ["aborted", "complete"]:
+            return
+
+        elif "<<< barrier arrive" in line:
+            self._log_barrier(line)
+
+        elif "DEBUG nextflow.cli.CmdRun" in line:
+            self._expect_version = True
+
+        elif "Session aborted" in line or \
+                "Execution complete -- Goodbye" in line:
+            self._log_run_end(line)
+
+    def log_parser(self):
+        """Method that parses the new lines of the nextflow log file and
+        updates the processes, submitted tags, barrier and pipeline status
+        attributes.
+
+        Each line of the log is read and classified only once, using the
+        byte offset stored in :attr:`log_tail`. When the log file is
+        replaced (nextflow rolls the log of the previous execution when the
+        pipeline is re-executed), the inspection attributes are cleared and
+        the new log is parsed from the beginning.
+        """
+
+        # Check the size and inode of the log file. Only proceed with the
+        # parsing if new content was appended from the previous time.
+        has_changed = self.log_tail.changed()
+        self.log_retry = 0
+
+        if self.log_tail.reset:
+            self._clear_inspect()
+            self.processes = OrderedDict()
+            self.content_lines = 0
+            self.run_status = ""
+            self.send = True
+            self._emit("reset")
+
+        if not has_changed:
+            return
+
+        run_status = self.run_status
+
+        for line in self.log_tail.read_lines():
+            self._classify_log_line(line)
+
+        if self.run_status not in ["aborted", "complete"]:
+            self.run_status = "running"
+
+        if self.run_status != run_status:
+            self._emit("run_status", status=self.run_status,
+                       previous=run_status, cause=self.abort_cause)
+
+    def save_checkpoint(self):
+        """Stores the inspection state and the reading positions of the
+        nextflow files in the :attr:`checkpoint_file`.
+
+        The file is replaced atomically. Errors writing the file are only
+        logged, since the checkpoint is not required for the inspection.
+        """
+
+        self.last_checkpoint = monotonic()
+
+        # Nothing was parsed since the last checkpoint
+        positions = self._get_checkpoint_positions()
+        if positions == self.checkpoint_positions:
+            return
+        self.checkpoint_positions = positions
+
+        checkpoint = {
+            "version": self.CHECKPOINT_VERSION,
+            "workdir": self.workdir,
+            "log": self.log_tail.get_state(),
+            "trace": self.trace_tail.get_state(),
+            "state": self._get_checkpoint_state()
+        }
+
+        data = gzip.compress(
+            json.dumps(checkpoint, separators=(",", ":")).encode("utf8"),
+            compresslevel=1)
+        tmp_file = "{}.tmp".format(self.checkpoint_file)
+
+        try:
+            with open(tmp_file, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_file, self.checkpoint_file)
+        except OSError as e:
+            logger.debug("Could not write checkpoint: {}".format(e))
+
+    def _get_checkpoint_state(self):
+        """Returns the inspection state as JSON serializable objects, to be
+        restored with :func:`_restore_checkpoint_state`. Sets are stored as
+        lists, and the dictionaries keyed by (process, tag) tuples as lists
+        of [process, tag, value] items.
+
+        The finished tags are only stored in the tag sets of the
+        :attr:`processes`, since their trace entries are never removed and
+        their aggregates are already in the :attr:`process_accumulators`
+        and the helpers. The :attr:`process_tags` and trace entries are only
+        stored for the tags that did not finish (e.g.: running or failed).
+
+        Returns
+        -------
+        dict
+        """
 
-    #################
-    # PARSING METHODS
-    #################
+        state = dict((x, getattr(self, x)) for x in self.CHECKPOINT_ATTRS)
+
+        state["process_tags"] = dict(
+            (p, dict((t, v) for t, v in tags.items()
+                     if t not in self.processes[p]["finished"]))
+            for p, tags in self.process_tags.items())
+        tag_index = [
+            [p, t, hashes] for (p, t), hashes in self.trace_tag_index.items()
+            if t not in self.processes[p]["finished"]]
+
+        for attr in self.CHECKPOINT_SETS:
+            state[attr] = list(getattr(self, attr))
+        for attr in self.CHECKPOINT_HELPERS:
+            state[attr] = getattr(self, attr).get_state()
+
+        # The trace entries are stored as lists of their slot values
+        state["trace_info"] = [
+            [getattr(self.trace_info[p][h], a) for a in TraceEntry.__slots__]
+            for p, _, hashes in tag_index for h in hashes]
+        state["trace_tag_index"] = tag_index
+        state["process_accumulators"] = dict(
+            (p, x.get_state()) for p, x in self.process_accumulators.items())
+        state["processes"] = dict(
+            (p, dict((k, list(v) if isinstance(v, set) else v)
+                     for k, v in proc.items()))
+            for p, proc in self.processes.items())
+        state["failed_logs"] = [[p, t, path]
+                                for (p, t), path in self.failed_logs.items()]
+
+        return state
+
+    def _restore_checkpoint_state(self, state):
+        """Rebuilds the inspection state returned by
+        :func:`_get_checkpoint_state`. The attributes are only replaced when
+        the whole state is valid.
 
-    def trace_parser(self):
-        """Method that parses the trace file once and updates the
-        :attr:`status_info` attribute with the new entries.
+        Parameters
+        ----------
+        state : dict
+
+        Raises
+        ------
+        KeyError, TypeError, ValueError, AttributeError
+            When the state is not valid.
         """
 
-        # Check the timestamp of the tracefile. Only proceed with the parsing
-        # if it changed from the previous time.
-        size_stamp = os.path.getsize(self.trace_file)
-        self.trace_retry = 0
-        if size_stamp and size_stamp == self.trace_sizestamp:
-            return
-        else:
-            self.trace_sizestamp = size_stamp
+        attrs = dict((x, state[x]) for x in self.CHECKPOINT_ATTRS)
 
-        with open(self.trace_file) as fh:
+        for attr in self.CHECKPOINT_SETS:
+            attrs[attr] = set(state[attr])
 
-            # Skip potential empty lines at the start of file
-            header = next(fh).strip()
-            while not header:
-                header = next(fh).strip()
+        for attr in self.CHECKPOINT_HELPERS:
+            # The copy keeps the parameters of the helper, and its restore
+            # method replaces the containers instead of modifying them
+            helper = copy.copy(getattr(self, attr))
+            helper.restore(state[attr])
+            attrs[attr] = helper
 
-            # Get header mappings before parsing the file
-            hm = self._header_mapping(header)
+        attrs["trace_info"] = defaultdict(OrderedDict)
+        for values in state["trace_info"]:
+            entry = TraceEntry(**dict(zip(TraceEntry.__slots__, values)))
+            for attr in ["process", "tag", "status", "exit", "queue"]:
+                if isinstance(getattr(entry, attr), str):
+                    setattr(entry, attr, sys.intern(getattr(entry, attr)))
+            attrs["trace_info"][entry.process][entry.hash] = entry
 
-            for line in fh:
+        attrs["trace_tag_index"] = defaultdict(list)
+        for process, tag, hashes in state["trace_tag_index"]:
+            attrs["trace_tag_index"][(process, tag)] = list(hashes)
 
-                # Skip empty lines
-                if line.strip() == "":
-                    continue
+        attrs["process_accumulators"] = defaultdict(ProcessAccumulator)
+        for process, acc in state["process_accumulators"].items():
+            attrs["process_accumulators"][process].restore(acc)
 
-                fields = line.strip().split("\t")
+        attrs["processes"] = OrderedDict()
+        for process, proc in state["processes"].items():
+            attrs["processes"][process] = dict(proc)
+            for key in ["submitted", "finished", "failed", "retry"]:
+                attrs["processes"][process][key] = set(proc[key])
 
-                # Skip if task ID was already processes
-                if fields[hm["task_id"]] in self.stored_ids:
-                    continue
+        attrs["failed_logs"] = dict(
+            ((p, t), path) for p, t, path in state["failed_logs"])
 
-                # Parse trace entry and update status_info attribute
-                self._update_trace_info(fields, hm)
-                self.send = True
+        for attr, val in attrs.items():
+            setattr(self, attr, val)
 
-        self._update_process_stats()
-        self._update_barrier_status()
+    def _get_checkpoint_positions(self):
+        """Returns the reading positions of the nextflow files, which
+        change whenever new content is parsed, and the number of sized work
+        directories.
+        """
 
-    def log_parser(self):
-        """Method that parses the nextflow log file once and updates the
-        submitted number of samples for each process
+        return (self.log_tail.inode, self.log_tail.offset,
+                self.trace_tail.inode, self.trace_tail.offset,
+                self.disk_usage.tasks)
+
+    def load_checkpoint(self):
+        """Restores the inspection state from the :attr:`checkpoint_file`.
+
+        The checkpoint is only used when both nextflow files were not
+        replaced or modified before the stored reading positions, in which
+        case the parsing resumes from these positions. Otherwise the files
+        are parsed from the beginning.
+
+        Returns
+        -------
+        bool
+            True if the checkpoint was restored.
         """
 
-        # Check the timestamp of the log file. Only proceed with the parsing
-        # if it changed from the previous time.
-        size_stamp = os.path.getsize(self.log_file)
-        self.log_retry = 0
-        if size_stamp and size_stamp == self.log_sizestamp:
-            return
-        else:
-            self.log_sizestamp = size_stamp
+        try:
+            with gzip.open(self.checkpoint_file, "rt",
+                           encoding="utf8") as fh:
+                checkpoint = json.load(fh, object_pairs_hook=OrderedDict)
+        except FileNotFoundError:
+            return False
+        except (OSError, EOFError, ValueError) as e:
+            logger.debug("Could not read checkpoint: {}".format(e))
+            return False
 
-        r = ".* (.*) \[.*\].*\[(.*)\].*process > (.*) \((.*)\).*"
+        try:
+            if checkpoint["version"] != self.CHECKPOINT_VERSION or \
+                    checkpoint["workdir"] != self.workdir:
+                return False
 
-        with open(self.log_file) as fh:
+            log_tail = FileTailer(self.log_file)
+            trace_tail = FileTailer(self.trace_file)
+            if not (log_tail.restore(checkpoint["log"]) and
+                    trace_tail.restore(checkpoint["trace"])):
+                return False
 
-            for line in fh:
-                if "Submitted process >" in line or \
-                        "Re-submitted process >" in line or \
-                        "Cached process >" in line:
-                    m = re.match(r, line)
-                    if not m:
-                        continue
-
-                    time_start = m.group(1)
-                    workdir = m.group(2)
-                    process = m.group(3)
-                    tag = m.group(4)
-
-                    if time_start + tag not in self.stored_log_ids:
-                        self.stored_log_ids.append(time_start + tag)
-                    else:
-                        continue
-
-                    if process not in self.processes:
-                        continue
-                    p = self.processes[process]
-                    if tag in list(p["finished"]) + list(p["retry"]):
-                        continue
-                    if tag in list(p["failed"]) and \
-                            "Re-submitted process >" in line:
-                        p["retry"].add(tag)
-                        self.send = True
-                        continue
-
-                    p["barrier"] = "R"
-                    if tag not in p["submitted"]:
-                        p["submitted"].add(tag)
-                        self.process_tags[process][tag] = {
-                            "workdir": self._expand_path(workdir),
-                            "start": time_start
-                        }
-                        self.send = True
-
-        self._update_pipeline_status()
-
-        self._update_pipeline_status()
+            self._restore_checkpoint_state(checkpoint["state"])
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.debug("Invalid checkpoint: {}".format(e))
+            return False
+
+        self.log_tail = log_tail
+        self.trace_tail = trace_tail
+
+        self.checkpoint_positions = self._get_checkpoint_positions()
+        self.send = True
+        self.last_checkpoint = monotonic()
+
+        return True
 
     def update_inspection(self):
         """Wrapper method that calls the appropriate main updating methods of
@@ -966,6 +2814,9 @@ class NextflowInspector:
         change, and they ignore entries that have been previously processes.
         """
 
+        # Allow new work directories to be found in this refresh
+        self.workdir_resolver.clear_buckets()
+
         try:
             self.log_parser()
         except (FileNotFoundError, StopIteration) as e:
@@ -981,6 +2832,12 @@ class NextflowInspector:
             if self.trace_retry == self.MAX_RETRIES:
                 raise e
 
+        if self.checkpoint_file and (
+                self.last_checkpoint is None or
+                monotonic() - self.last_checkpoint >=
+                self.checkpoint_interval):
+            self.save_checkpoint()
+
     #################
     # CURSES METHODS
     #################
@@ -989,6 +2846,7 @@ class NextflowInspector:
         """Displays the default pipeline inspection overview
         """
 
+        self._bind_signal_handler()
         stay_alive = True
 
         self.screen = curses.initscr()
@@ -1002,17 +2860,29 @@ class NextflowInspector:
         self.screen_lines = self.screen.getmaxyx()[0]
         # self.screen_width = self.screen.getmaxyx()[1]
 
+        # The inspection is updated in a background thread, so that slow
+        # parsing does not block the keybindings and the redraws.
+        parser = ParserThread(self, self._overview_snapshot)
+        parser.start()
+        self._start_disk_usage()
+        snapshot = None
+
         try:
             while stay_alive:
 
+                # Sleep until a new snapshot is published, a key is pressed
+                # or the header clock needs to be updated
+                ready = select.select(
+                    [sys.stdin, parser.read_fd], [], [],
+                    self.clock_rate - (monotonic() % self.clock_rate))[0]
+                if parser.read_fd in ready:
+                    snapshot = parser.consume()
+
                 # Provide functionality to certain keybindings
                 self._curses_keybindings()
-                # Updates main inspector attributes
-                self.update_inspection()
                 # Display curses interface
-                self.flush_overview()
-
-                sleep(self.refresh_rate)
+                if snapshot:
+                    self.flush_overview(snapshot)
         except FileNotFoundError:
             sys.stderr.write(colored_print(
                 "ERROR: nextflow log and/or trace files are no longer "
@@ -1020,6 +2890,8 @@ class NextflowInspector:
         except Exception as e:
             sys.stderr.write(str(e))
         finally:
+            parser.stop()
+            self.disk_usage.close()
             curses.nocbreak()
             self.screen.keypad(0)
             curses.echo()
@@ -1065,17 +2937,49 @@ class NextflowInspector:
                 self.screen.getmaxyx()[1] + self.padding < self.max_width:
             self.padding += 1
 
-    def flush_overview(self):
-        """Displays the default overview of the pipeline execution from the
-        :attr:`status_info`, :attr:`processes` and :attr:`run_status`
-        attributes into stdout.
+    def _overview_snapshot(self):
+        """Builds an immutable snapshot of the attributes that are displayed
+        by the curses overview.
+
+        Returns
+        -------
+        OverviewSnapshot
         """
 
-        colors = {
-            "W": 1,
-            "R": 2,
-            "C": 3
-        }
+        rows = []
+        totals = {"submitted": 0, "failed": 0, "retry": 0, "finished": 0}
+        stragglers = self._get_stragglers()
+
+        for process, proc in self.processes.items():
+
+            row = {
+                "process": process,
+                "barrier": proc["barrier"],
+                "stats": dict(self.process_stats[process])
+                if process in self.process_stats else None,
+                "stragglers": tuple(x["tag"] for x in
+                                    stragglers.get(process, []))
+            }
+            for i in totals:
+                row[i] = len(proc[i])
+                totals[i] += row[i]
+
+            rows.append(row)
+
+        return OverviewSnapshot(
+            pipeline_tag=self.pipeline_tag,
+            run_status=self.run_status,
+            totals=totals,
+            rows=tuple(rows),
+            progress=self._get_progress(),
+            waste=self.waste.summary(self.retry_alarm, top=0),
+            disk_usage=self.disk_usage.summary()
+        )
+
+    def _overview_header_lines(self, snapshot):
+        """Returns the lines of the overview header, as lists of
+        (column, text, attribute) segments.
+        """
 
         pc = {
             "running": 3,
@@ -1084,44 +2988,35 @@ class NextflowInspector:
             "error": 4
         }
 
-        curses.init_pair(1, curses.COLOR_WHITE, curses.COLOR_BLACK)
-        curses.init_pair(2, curses.COLOR_BLUE, curses.COLOR_BLACK)
-        curses.init_pair(3, curses.COLOR_GREEN, curses.COLOR_BLACK)
-        curses.init_pair(4, curses.COLOR_MAGENTA, curses.COLOR_BLACK)
-
-        # self.screen.erase()
-
-        height, width = self.screen.getmaxyx()
-        win = curses.newpad(height, 2000)
-
         # Add static header
         header = "Pipeline [{}] inspection at {}. Status: ".format(
-            self.pipeline_tag, strftime("%Y-%m-%d %H:%M:%S", gmtime()))
+            snapshot.pipeline_tag, strftime("%Y-%m-%d %H:%M:%S", gmtime()))
 
-        win.addstr(0, 0, header)
-        win.addstr(0, len(header), self.run_status,
-                   curses.color_pair(pc[self.run_status]))
         submission_str = "{0:23.23}  {1:23.23}  {2:23.23}  {3:23.23}".format(
-            "Running: {}".format(
-                sum([len(x["submitted"]) for x in self.processes.values()])
-            ),
-            "Failed: {}".format(
-                sum([len(x["failed"]) for x in self.processes.values()])
-            ),
-            "Retrying: {}".format(
-                sum([len(x["retry"]) for x in self.processes.values()])
-            ),
-            "Completed: {}".format(
-                sum([len(x["finished"]) for x in self.processes.values()])
-            )
+            "Running: {}".format(snapshot.totals["submitted"]),
+            "Failed: {}".format(snapshot.totals["failed"]),
+            "Retrying: {}".format(snapshot.totals["retry"]),
+            "Completed: {}".format(snapshot.totals["finished"])
         )
 
-        win.addstr(
-            1, 0, submission_str, curses.color_pair(1)
-        )
+        progress = snapshot.progress
+        throughput = progress["throughput"]
+        progress_str = "Throughput: {}    ETA: {}{}".format(
+            "{:.1f} samples/h".format(throughput) if throughput else "-",
+            ">" if progress["pending"] and progress["eta"] else "",
+            format_duration(progress["eta"]))
+        if snapshot.waste["total"]["failures"]:
+            progress_str += "    Wasted: {:.1f} cpu hours".format(
+                snapshot.waste["total"]["cpuHours"])
+        if snapshot.disk_usage["tasks"]:
+            growth = snapshot.disk_usage["growth"]
+            progress_str += "    Work dir: {}{}".format(
+                format_size(snapshot.disk_usage["total"]),
+                " (+{}/h)".format(format_size(growth)) if growth else "")
 
         headers = ["", "Process", "Running", "Complete", "Error",
-                   "Avg Time", "Max Mem", "Avg Read", "Avg Write"]
+                   "Avg Time", "Avg Wait", "Overhead", "Max Mem", "Avg Read",
+                   "Avg Write", "Work Dir"]
         header_str = "{0: ^1} " \
                      "{1: ^25}  " \
                      "{2: ^7} " \
@@ -1130,55 +3025,158 @@ class NextflowInspector:
                      "{5: ^10} " \
                      "{6: ^10} " \
                      "{7: ^10} " \
-                     "{8: ^10} ".format(*headers)
+                     "{8: ^10} " \
+                     "{9: ^10} " \
+                     "{10: ^10} " \
+                     "{11: ^10} ".format(*headers)
         self.max_width = len(header_str)
-        win.addstr(3, 0, header_str, curses.A_UNDERLINE | curses.A_REVERSE)
 
-        # Get display size
-        top = self.top_line
-        bottom = self.screen_lines - 4 + self.top_line
+        alarm = ()
+        if snapshot.waste["alarms"]:
+            alarm = ((len(progress_str), "    Retry alarm: {}".format(
+                ", ".join(snapshot.waste["alarms"])),
+                curses.color_pair(4) | curses.A_BOLD),)
+
+        return [
+            ((0, header, curses.A_NORMAL),
+             (len(header), snapshot.run_status,
+              curses.color_pair(pc.get(snapshot.run_status, 1)))),
+            ((0, submission_str, curses.color_pair(1)),),
+            ((0, progress_str, curses.A_NORMAL),) + alarm,
+            ((0, header_str, curses.A_UNDERLINE | curses.A_REVERSE),)
+        ]
+
+    def _overview_process_lines(self, snapshot, top, bottom):
+        """Returns the lines of the processes between the ``top`` and
+        ``bottom`` positions, as lists of (column, text, attribute) segments.
+        """
+
+        colors = {
+            "W": 1,
+            "R": 2,
+            "C": 3
+        }
+
+        lines = []
 
         # Fetch process information
-        for p, process in enumerate(
-                list(self.processes.keys())[top:bottom]):
+        for proc in snapshot.rows[top:bottom]:
 
-            if process not in self.process_stats:
+            process = proc["process"]
+
+            if proc["stats"] is None:
                 vals = ["-"] * 8
                 txt_fmt = curses.A_NORMAL
             else:
-                ref = self.process_stats[process]
+                ref = proc["stats"]
                 vals = [ref["completed"],
-                        len(self.processes[process]["failed"]),
+                        proc["failed"],
                         ref["realtime"],
+                        ref["avgwait"], ref["overhead"],
                         ref["maxmem"], ref["avgread"],
                         ref["avgwrite"]]
                 txt_fmt = curses.A_BOLD
 
-            proc = self.processes[process]
+            # The work directories are sized independently of the stats
+            vals.append(format_size(
+                snapshot.disk_usage["processes"].get(process)))
+
             if proc["retry"]:
-                completed = "{}({})".format(len(proc["submitted"]),
-                                            len(proc["retry"]))
+                completed = "{}({})".format(proc["submitted"],
+                                            proc["retry"])
             else:
-                completed = "{}".format(len(proc["submitted"]))
-
-            win.addstr(
-                4 + p, 0, "{0: ^1} "
-                          "{1:25.25}  "
-                          "{2: ^7} "
-                          "{3: ^7} "
-                          "{4: ^7} "
-                          "{5: ^10} "
-                          "{6: ^10} "
-                          "{7: ^10} "
-                          "{8: ^10} ".format(
-                                proc["barrier"],
-                                process,
-                                completed,
-                                *vals),
-                curses.color_pair(colors[proc["barrier"]]) | txt_fmt)
-
-        win.clrtoeol()
-        win.refresh(0, self.padding, 0, 0, height-1, width-1)
+                completed = "{}".format(proc["submitted"])
+
+            line = ((
+                0, "{0: ^1} "
+                   "{1:25.25}  "
+                   "{2: ^7} "
+                   "{3: ^7} "
+                   "{4: ^7} "
+                   "{5: ^10} "
+                   "{6: ^10} "
+                   "{7: ^10} "
+                   "{8: ^10} "
+                   "{9: ^10} "
+                   "{10: ^10} "
+                   "{11: ^10} ".format(
+                        proc["barrier"],
+                        process,
+                        completed,
+                        *vals),
+                curses.color_pair(colors[proc["barrier"]]) | txt_fmt),)
+
+            # The number of stragglers and the first tags are displayed
+            # after the columns of the process
+            stragglers = proc["stragglers"]
+            if stragglers:
+                line += ((len(line[0][1]), "Stragglers: {} ({}{})".format(
+                    len(stragglers), ", ".join(stragglers[:3]),
+                    ", ..." if len(stragglers) > 3 else ""),
+                    curses.color_pair(4) | curses.A_BOLD),)
+
+            lines.append(line)
+
+        return lines
+
+    def _draw_frame(self, lines):
+        """Draws the provided lines on the :attr:`pad`, re-drawing only the
+        lines that differ from the ones currently drawn (see
+        :func:`draw_frame`).
+        """
+
+        return draw_frame(self.pad, self.frame, lines)
+
+    def flush_overview(self, snapshot=None):
+        """Displays the default overview of the pipeline execution from the
+        :attr:`status_info`, :attr:`processes` and :attr:`run_status`
+        attributes into stdout.
+
+        The same curses pad is reused between calls and is only re-created
+        when the terminal is resized. Only the lines that changed since the
+        previous call are re-drawn, and the screen is not refreshed when
+        nothing changed.
+
+        Parameters
+        ----------
+        snapshot : OverviewSnapshot
+            Snapshot of the inspection state to display. If not provided,
+            it is built from the current attributes.
+        """
+
+        if snapshot is None:
+            snapshot = self._overview_snapshot()
+
+        curses.init_pair(1, curses.COLOR_WHITE, curses.COLOR_BLACK)
+        curses.init_pair(2, curses.COLOR_BLUE, curses.COLOR_BLACK)
+        curses.init_pair(3, curses.COLOR_GREEN, curses.COLOR_BLACK)
+        curses.init_pair(4, curses.COLOR_MAGENTA, curses.COLOR_BLACK)
+
+        height, width = self.screen.getmaxyx()
+
+        if self.pad is None or self.pad_size != (height, width):
+            self.pad = curses.newpad(height, 2000)
+            self.pad_size = (height, width)
+            self.frame = {}
+            self.frame_padding = None
+
+        # Get display size
+        top = self.top_line
+        bottom = self.screen_lines - 4 + self.top_line
+
+        # Process lines are only formatted when the snapshot or the
+        # scrolling position changed
+        frame_key = (snapshot, top, bottom)
+        if frame_key != self.frame_key:
+            self.frame_rows = self._overview_process_lines(
+                snapshot, top, bottom)
+            self.frame_key = frame_key
+
+        lines = self._overview_header_lines(snapshot) + self.frame_rows
+
+        if self._draw_frame(lines) or self.padding != self.frame_padding:
+            self.pad.refresh(0, self.padding, 0, 0, height-1, width-1)
+            self.frame_padding = self.padding
 
     ###################
     # BROADCAST METHODS
@@ -1209,15 +3207,20 @@ class NextflowInspector:
             "Complete": "complete",
             "Error": "error",
             "Avg Time": "avgTime",
+            "Avg Wait": "avgWait",
+            "Overhead": "overhead",
             "CPU/hour": "cpuhour",
             "Max Mem": "maxMem",
             "Avg Read": "avgRead",
-            "Avg Write": "avgWrite"
+            "Avg Write": "avgWrite",
+            "Work Dir": "workDir"
         }
 
         # Set table data
         data = []
-        table_headers = ["avgTime", "cpuhour", "maxMem", "avgRead", "avgWrite"]
+        disk_usage = self.disk_usage.summary()["processes"]
+        table_headers = ["avgTime", "avgWait", "overhead", "cpuhour",
+                         "maxMem", "avgRead", "avgWrite"]
         for p, process in enumerate(list(self.processes)):
 
             proc = self.processes[process]
@@ -1227,7 +3230,8 @@ class NextflowInspector:
                 "barrier": proc["barrier"],
                 "complete": list(proc["finished"]),
                 "error": list(proc["failed"]),
-                "running": list(proc["submitted"])
+                "running": list(proc["submitted"]),
+                "workDir": format_size(disk_usage.get(process))
             }
 
             # Add stats data that is only available for processes that have
@@ -1244,6 +3248,8 @@ class NextflowInspector:
                 current_data = {
                     **current_data,
                     **{"avgTime": ref["realtime"],
+                       "avgWait": ref["avgwait"],
+                       "overhead": ref["overhead"],
                        "cpuhour": ref["cpuhour"],
                        "maxMem": ref["maxmem"],
                        "avgRead": ref["avgread"],
@@ -1306,10 +3312,7 @@ class NextflowInspector:
             List of strings with the nextflow log
         """
 
-        with open(self.log_file) as fh:
-            last_lines = fh.readlines()[-n:]
-
-        return last_lines
+        return read_tail(self.log_file, n)
 
     def _prepare_run_status_data(self):
 
@@ -1324,7 +3327,26 @@ class NextflowInspector:
             "logLines": log_lines
         }
 
-    def _send_status_info(self, run_id):
+    def _expand_tag_workdirs(self):
+        """Expands the work directory of the tags in :attr:`process_tags`
+        that have not been resolved yet. It is only called when the status
+        is built, so that the other modes do not resolve them.
+        """
+
+        for tags in self.process_tags.values():
+            for info in tags.values():
+                if info["workdir"] is None:
+                    info["workdir"] = self._expand_path(info["hash"])
+
+    def _get_status_json(self):
+        """Builds the complete status of the inspection that is broadcast.
+
+        Returns
+        -------
+        dict
+        """
+
+        self._expand_tag_workdirs()
 
         mappings, data = self._prepare_table_data()
         overview_data = self._prepare_overview_data()
@@ -1337,28 +3359,98 @@ class NextflowInspector:
             "tableData": data,
             "tableMappings": mappings,
             "processInfo": self._convert_process_dict(),
-            "processTags": self.process_tags,
+            # The tags are copied since the status is sent from the
+            # broadcast sender thread
+            "processTags": dict(
+                (p, dict((t, dict(v)) for t, v in tags.items()))
+                for p, tags in self.process_tags.items()),
             "runStatus": status_data,
             "timeStart": str(self.time_start),
             "timeStop": str(self.time_stop) if self.time_stop else "-",
-            "processes": list(self.processes)
+            "processes": list(self.processes),
+            "progress": self._get_progress(),
+            "scheduling": self.scheduling.summary(),
+            "stragglers": self._get_stragglers(),
+            "timeline": self._get_timeline(),
+            "waste": self.waste.summary(self.retry_alarm),
+            "diskUsage": self.disk_usage.summary()
         }
 
-        self._c += 1
-        logger.debug("Payload [{}] sent with size: {}".format(
-            self._c,
-            asizeof.asizeof(json.dumps(status_json))
-        ))
+        # Fetch the logs of the failed tags
+        for process, tag in self.failed_logs:
+            try:
+                info = status_json["processTags"][process][tag]
+            except KeyError:
+                continue
+            info["log"] = self._get_failed_log(process, tag)
 
-        try:
-            requests.put(self.broadcast_address,
-                         json={"run_id": run_id, "status_json": status_json})
-        except requests.exceptions.ConnectionError:
-            logger.error(colored_print(
-                "ERROR: Could not establish connection with server. The server"
-                " may be down or there is a problem with your internet "
-                "connection.", "red_bold"))
-            sys.exit(1)
+        return status_json
+
+    def _get_progress(self):
+        """Estimates the throughput and the remaining time of the processes
+        and of the pipeline (see :func:`ProgressEstimator.estimate`).
+
+        Returns
+        -------
+        dict
+        """
+
+        now = parse_log_time(self.time_stop) if self.time_stop else None
+
+        return self.progress.estimate(self.processes, self.samples,
+                                      self.run_status, now or time())
+
+    def _get_stragglers(self):
+        """Finds the running tags whose time since submission exceeds
+        :attr:`straggler_factor` times the 90th percentile of the duration
+        of their process (see :func:`StragglerDetector.find`).
+
+        Returns
+        -------
+        dict
+        """
+
+        if self.run_status != "running":
+            return OrderedDict()
+
+        submit_times = self.scheduling.submit_times
+
+        running = []
+        for process, proc in self.processes.items():
+            for tag in proc["submitted"]:
+                submit_time = submit_times.get(
+                    self.process_tags[process][tag]["hash"])
+                if submit_time is not None:
+                    running.append((process, tag, submit_time))
+
+        return self.stragglers.find(running, time(), self.straggler_factor)
+
+    def _get_timeline(self):
+        """Summarises the use of the cpus over time, including the tasks
+        that are still running (see :func:`ConcurrencyTimeline.summary`).
+
+        Returns
+        -------
+        dict
+        """
+
+        submit_times = self.scheduling.submit_times
+
+        running = []
+        if self.run_status == "running":
+            for process, proc in self.processes.items():
+                try:
+                    cpus = int(proc["cpus"])
+                except (TypeError, ValueError):
+                    cpus = 1
+                for tag in proc["submitted"]:
+                    submit_time = submit_times.get(
+                        self.process_tags[process][tag]["hash"])
+                    if submit_time is not None:
+                        running.append((process, tag, submit_time, cpus))
+
+        return self.timeline.summary(running, time(), self.capacity,
+                                     gantt=self.gantt)
 
     def _prepare_static_info(self):
         """Prepares the first batch of information, containing static
@@ -1402,7 +3494,7 @@ class NextflowInspector:
         Returns
         -------
         Returns a dictionary with the dag object to be used in the post
-        instance available through the method _establish_connection
+        instance available through the method broadcast_status
 
         """
         try:
@@ -1416,50 +3508,14 @@ class NextflowInspector:
 
         return dag_json
 
-    def _establish_connection(self, run_id, dict_dag):
-
-        try:
-
-            static_info = self._prepare_static_info()
-
-            r = requests.post(self.broadcast_address,
-                              json={"run_id": run_id, "dag_json": dict_dag,
-                                    "pipeline_files": static_info})
-            if r.status_code != 201:
-                logger.error(colored_print(
-                    "ERROR: There was a problem sending data to the server"
-                    "with reason: {}".format(r.reason)))
-                sys.exit(1)
-        except requests.exceptions.ConnectionError:
-            logger.error(colored_print(
-                "ERROR: Could not establish connection with server. The server"
-                " may be down or there is a problem with your internet "
-                "connection.", "red_bold"))
-            sys.exit(1)
-
-    def _close_connection(self, run_id):
-
-        try:
-            r = requests.delete(self.broadcast_address,
-                                json={"run_id": run_id})
-            if r.status_code != 202:
-                logger.error(colored_print(
-                    "ERROR: There was a problem sending data to the server"
-                    "with reason: {}".format(r.reason)))
-        except requests.exceptions.ConnectionError:
-            logger.error(colored_print(
-                "ERROR: Could not establish connection with server. The server"
-                " may be down or there is a problem with your internet "
-                "connection.", "red_bold"))
-            sys.exit(1)
-
     def _get_run_hash(self):
         """Gets the hash of the nextflow file"""
 
         # Get name of the pipeline from the log file
         with open(self.log_file) as fh:
             header = fh.readline()
-        pipeline_path = re.match(".*nextflow run ([^\s]+).*", header).group(1)
+        pipeline_path = join(self.workdir, re.match(
+            ".*nextflow run ([^\s]+).*", header).group(1))
 
         # Get hash from the entire pipeline file
         pipeline_hash = hashlib.md5()
@@ -1481,14 +3537,47 @@ class NextflowInspector:
             "link below:", "green_bold"))
         logger.info("{}".format(inspect_address))
 
-    def broadcast_status(self):
+    def start_sender(self, session=None):
+        """Creates and starts the :py:class:`BroadcastSender` that sends
+        the status of this pipeline to the server.
 
-        logger.info(colored_print("Preparing broadcast data...", "green_bold"))
+        Parameters
+        ----------
+        session : requests.Session, optional
+            Session shared with the senders of other pipelines.
+
+        Returns
+        -------
+        BroadcastSender
+        """
 
         run_hash = self._get_run_hash()
         dict_dag = self._dag_file_to_dict()
+
+        # The requests are sent in the background, so that a slow server
+        # never stalls the parsing of the nextflow files
+        sender = BroadcastSender(
+            self.broadcast_address, run_hash,
+            {"dag_json": dict_dag,
+             "pipeline_files": self._prepare_static_info()},
+            StatusDeltaEncoder() if self.delta_broadcast else None,
+            session=session)
+        sender.start()
+
+        return sender
+
+    def broadcast_status(self):
+
+        self._bind_signal_handler()
+        logger.info(colored_print("Preparing broadcast data...", "green_bold"))
+
+        sender = self.start_sender()
+        run_hash = sender.run_id
         _broadcast_sent = False
-        self._establish_connection(run_hash, dict_dag)
+
+        watcher = FileWatcher([self.log_file, self.trace_file],
+                              self.refresh_rate)
+        self._start_disk_usage()
 
         stay_alive = True
         try:
@@ -1499,11 +3588,17 @@ class NextflowInspector:
                     _broadcast_sent = True
 
                 self.update_inspection()
-                if self.send:
-                    self._send_status_info(run_hash)
-                    self.send = False
+                if self._publish_due():
+                    sender.submit(self._get_status_json())
 
-                sleep(self.refresh_rate)
+                # The server refused the run
+                if sender.error:
+                    stay_alive = False
+                    continue
+
+                # Sleep until the nextflow files change or the status must
+                # be published again
+                watcher.wait(max(0, self.next_publish - monotonic()))
 
         except FileNotFoundError:
             logger.error(colored_print(
@@ -1512,5 +3607,210 @@ class NextflowInspector:
         except Exception as e:
             logger.error("ERROR: ", sys.exc_info()[0])
         finally:
+            watcher.close()
+            self.disk_usage.close()
             logger.info("Closing connection")
-            self._close_connection(run_hash)
+            sender.close(sender.timeout)
+
+    def _publish_due(self):
+        """Returns True when the status must be published, because the
+        inspection changed (see :attr:`send`) or :attr:`publish_rate`
+        seconds passed since the previous publication. Both are reset when
+        it returns True.
+
+        Returns
+        -------
+        bool
+        """
+
+        now = monotonic()
+        if not self.send and now < self.next_publish:
+            return False
+
+        self.send = False
+        self.next_publish = now + self.publish_rate
+        return True
+
+    def serve_status(self, host="127.0.0.1", port=8000, status=True):
+        """Serves the status and the metrics of the inspection from a local
+        HTTP server (see :py:class:`StatusServer`).
+
+        The status and the metrics are built once for each update of the
+        inspection (or every :attr:`publish_rate` seconds) and are shared by
+        all clients of the server.
+
+        Parameters
+        ----------
+        host : str
+            Host where the server listens.
+        port : int
+            Port where the server listens.
+        status : bool
+            If False, only the metrics are served, and the status is not
+            built.
+        """
+
+        self._bind_signal_handler()
+        server = StatusServer((host, port))
+        server.start()
+
+        address = "http://{}:{}".format(host, server.server_port)
+        if status:
+            logger.info(colored_print(
+                "Serving the inspection status at {0}/status and the stream "
+                "of changes at {0}/events".format(address), "green_bold"))
+        logger.info(colored_print(
+            "Serving the inspection metrics at {}/metrics".format(address),
+            "green_bold"))
+
+        watcher = FileWatcher([self.log_file, self.trace_file],
+                              self.refresh_rate)
+        self._start_disk_usage()
+
+        try:
+            while True:
+                self.update_inspection()
+                if self._publish_due():
+                    if status:
+                        server.publish(self._get_status_json())
+                    server.publish_metrics(format_metrics(self))
+
+                # Sleep until the nextflow files change or the status must
+                # be published again
+                watcher.wait(max(0, self.next_publish - monotonic()))
+
+        except FileNotFoundError:
+            logger.error(colored_print(
+                "ERROR: nextflow log and/or trace files are no longer "
+                "reachable!", "red_bold"))
+        finally:
+            watcher.close()
+            self.disk_usage.close()
+            logger.info("Closing server")
+            server.close()
+
+    def _get_summary_json(self):
+        """Builds a summary of the inspection, with the status of the
+        pipeline and the table data of the processes (see
+        :func:`_prepare_table_data`).
+
+        Returns
+        -------
+        dict
+        """
+
+        mappings, data = self._prepare_table_data()
+
+        return {
+            "pipelineTag": self.pipeline_tag,
+            "workdir": self.workdir,
+            "runStatus": self._prepare_run_status_data(),
+            "timeStart": str(self.time_start),
+            "timeStop": str(self.time_stop) if self.time_stop else "-",
+            "tableData": data,
+            "timeline": self._get_timeline(),
+            "waste": self.waste.summary(self.retry_alarm),
+            "diskUsage": self.disk_usage.summary()
+        }
+
+    def inspect_once(self, output="-"):
+        """Parses the nextflow files a single time and writes the summary of
+        the inspection as JSON (see :func:`_get_summary_json`).
+
+        When the checkpoint is enabled, only the content appended since the
+        previous run is parsed, and the checkpoint is updated.
+
+        Parameters
+        ----------
+        output : str
+            Path to the output file, or "-" for the standard output.
+        """
+
+        self.update_inspection()
+        # The checkpoints of update_inspection are throttled, and the
+        # loaded checkpoint counts as a recent one
+        if self.checkpoint_file:
+            self.save_checkpoint()
+
+        write_json(self._get_summary_json(), output)
+
+    def _snapshot_event(self):
+        """Returns the event with the current state of the inspection, which
+        starts the stream of events.
+        """
+
+        processes = OrderedDict()
+
+        for process, vals in self.processes.items():
+            processes[process] = {
+                "barrier": vals["barrier"],
+                "submitted": sorted(vals["submitted"]),
+                "finished": sorted(vals["finished"]),
+                "failed": sorted(vals["failed"]),
+                "retry": sorted(vals["retry"])
+            }
+
+        return {"event": "snapshot", "pipeline": self.pipeline_tag,
+                "status": self.run_status, "processes": processes}
+
+    def stream_events(self, output="-"):
+        """Writes one compact JSON object per line for each state change of
+        the inspection (see :func:`_emit`).
+
+        The stream starts with a ``snapshot`` event with the current state of
+        the processes, followed by the ``submitted``, ``retrying``,
+        ``completed`` and ``failed`` events of the tags, the
+        ``barrier_closed`` events of the processes and the ``run_status``
+        events of the pipeline. A ``reset`` event is written when the
+        nextflow log is replaced. Events are written and flushed as soon as
+        the nextflow files change.
+
+        Parameters
+        ----------
+        output : str
+            Path to the file (e.g.: a named pipe) where the events are
+            written, or "-" for the standard output.
+        """
+
+        self._bind_signal_handler()
+
+        # The events are only recorded from this point, so that the first
+        # update is summarised by the snapshot
+        self.update_inspection()
+        self.events = []
+
+        stream = sys.stdout if output == "-" else open(output, "w")
+
+        watcher = FileWatcher([self.log_file, self.trace_file],
+                              self.refresh_rate)
+
+        try:
+            events = [self._snapshot_event()]
+            while True:
+                for event in events:
+                    stream.write(json.dumps(event, separators=(",", ":")))
+                    stream.write("\n")
+                stream.flush()
+
+                # Sleep until the nextflow files change
+                watcher.wait()
+
+                self.update_inspection()
+                events, self.events = self.events, []
+
+        except FileNotFoundError:
+            # The logger writes to stdout, which may be the stream
+            sys.stderr.write(colored_print(
+                "ERROR: nextflow log and/or trace files are no longer "
+                "reachable!\n", "red_bold"))
+        except BrokenPipeError:
+            # The reader of the stream closed it
+            pass
+        finally:
+            watcher.close()
+            self.events = None
+            if stream is not sys.stdout:
+                try:
+                    stream.close()
+                except BrokenPipeError:
+                    pass
@@ -0,0 +1,202 @@
+BARRIER_STATES = {
+    "W": "waiting",
+    "R": "running",
+    "C": "complete"
+}
+"""
+dict: Maps the barrier codes of the processes to the values of the
+"barrier" label.
+"""
+
+TAG_STATES = {
+    "submitted": "running",
+    "finished": "complete",
+    "failed": "failed",
+    "retry": "retrying"
+}
+"""
+dict: Maps the tag sets of the processes to the values of the "state"
+label.
+"""
+
+RUN_STATES = ["running", "complete", "aborted"]
+"""
+list: Values of the "status" label of the pipeline status metric.
+"""
+
+MB = 1024 * 1024
+
+
+def _escape(value):
+    """Escapes a label value of the text exposition format.
+    """
+
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n")\
+        .replace('"', '\\"')
+
+
+def _format_labels(labels):
+
+    return ",".join('{}="{}"'.format(k, _escape(v))
+                    for k, v in labels.items())
+
+
+def _family(name, metric_type, help_text, samples):
+    """Formats a metric family.
+
+    Parameters
+    ----------
+    name : str
+        Name of the metric.
+    metric_type : str
+        Type of the metric (gauge or counter).
+    help_text : str
+        Description of the metric.
+    samples : list
+        List of (labels, value) tuples.
+
+    Returns
+    -------
+    list
+        Lines of the metric family.
+    """
+
+    lines = ["# HELP {} {}".format(name, help_text),
+             "# TYPE {} {}".format(name, metric_type)]
+
+    for labels, value in samples:
+        lines.append("{}{{{}}} {}".format(name, _format_labels(labels),
+                                          repr(float(value))))
+
+    return lines
+
+
+def format_metrics(inspector):
+    """Formats the metrics of an inspection in the Prometheus text
+    exposition format.
+
+    The metrics are derived from the running aggregates of each process
+    (see :py:class:`ProcessAccumulator`) and from the tag sets of the
+    processes, so that formatting them is proportional to the number of
+    processes and does not require parsing the nextflow files again.
+
+    Parameters
+    ----------
+    inspector : NextflowInspector
+        The inspector whose state is exported.
+
+    Returns
+    -------
+    str
+        The metrics in the Prometheus text exposition format.
+    """
+
+    pipeline = inspector.pipeline_tag
+
+    run_states = list(RUN_STATES)
+    if inspector.run_status and inspector.run_status not in run_states:
+        run_states.append(inspector.run_status)
+
+    status = [({"pipeline": pipeline, "status": x},
+               int(x == inspector.run_status)) for x in run_states]
+
+    tasks = []
+    barriers = []
+    parsed = []
+    realtime = []
+    cpuhours = []
+    max_rss = []
+    reads = []
+    writes = []
+    warnings = []
+    failures = []
+    wasted = []
+    workdir = []
+
+    disk_usage = inspector.disk_usage.summary()["processes"]
+
+    for process, proc in inspector.processes.items():
+
+        labels = {"pipeline": pipeline, "process": process}
+
+        waste = inspector.waste.processes.get(process)
+        if waste is not None:
+            failures.append((labels, waste.failures))
+            wasted.append((labels, waste.cpu_hours))
+
+        if process in disk_usage:
+            workdir.append((labels, disk_usage[process]))
+
+        for attr, state in TAG_STATES.items():
+            tasks.append((dict(labels, state=state), len(proc[attr])))
+
+        for code, state in BARRIER_STATES.items():
+            barriers.append((dict(labels, barrier=state),
+                             int(proc["barrier"] == code)))
+
+        # The accumulators are only created for processes with trace
+        # entries
+        acc = inspector.process_accumulators.get(process)
+        if acc is None:
+            continue
+
+        parsed.append((labels, acc.parsed))
+
+        warnings.append((dict(labels, resource="cpu"),
+                         len(acc.cpu_warnings)))
+        warnings.append((dict(labels, resource="memory"),
+                         len(acc.mem_warnings)))
+
+        if not acc.count:
+            continue
+
+        if "realtime" not in acc.missing and acc.counts["realtime"]:
+            realtime.append((labels, acc.mean("realtime")))
+
+        if "cpuhour" not in acc.missing:
+            cpuhours.append((labels, acc.sums["cpuhour"]))
+
+        if acc.max_rss is not None:
+            max_rss.append((labels, acc.max_rss * MB))
+
+        for metric, samples in [("rchar", reads), ("wchar", writes)]:
+            if metric not in acc.missing and acc.counts[metric]:
+                samples.append((labels, acc.mean(metric) * MB))
+
+    lines = []
+    lines += _family("flowcraft_pipeline_status", "gauge",
+                     "Current status of the pipeline.", status)
+    lines += _family("flowcraft_process_tasks", "gauge",
+                     "Number of tags of the process in each state.", tasks)
+    lines += _family("flowcraft_process_barrier", "gauge",
+                     "Current barrier state of the process.", barriers)
+    lines += _family("flowcraft_process_trace_entries_total", "counter",
+                     "Trace entries of the process parsed since the "
+                     "execution started.", parsed)
+    lines += _family("flowcraft_process_realtime_seconds_avg", "gauge",
+                     "Average realtime of the tasks of the process.",
+                     realtime)
+    lines += _family("flowcraft_process_cpu_hours", "gauge",
+                     "Cumulative cpu hours of the tasks of the process.",
+                     cpuhours)
+    lines += _family("flowcraft_process_max_rss_bytes", "gauge",
+                     "Maximum resident memory of the tasks of the process.",
+                     max_rss)
+    lines += _family("flowcraft_process_read_bytes_avg", "gauge",
+                     "Average bytes read by the tasks of the process.", reads)
+    lines += _family("flowcraft_process_write_bytes_avg", "gauge",
+                     "Average bytes written by the tasks of the process.",
+                     writes)
+    lines += _family("flowcraft_process_resource_warnings", "gauge",
+                     "Number of tags of the process with resource usage "
+                     "warnings.", warnings)
+    lines += _family("flowcraft_process_failed_attempts_total", "counter",
+                     "Failed attempts of the tasks of the process.", failures)
+    lines += _family("flowcraft_process_wasted_cpu_hours_total", "counter",
+                     "Cpu hours allocated to the failed attempts of the "
+                     "process.", wasted)
+    lines += _family("flowcraft_process_workdir_bytes", "gauge",
+                     "Disk usage of the work directories of the tasks of the "
+                     "process.", workdir)
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,469 @@
+import sys
+import curses
+import signal
+import asyncio
+import logging
+import requests
+
+from os.path import basename
+from time import gmtime, strftime, monotonic
+from collections import OrderedDict
+
+try:
+    from generator.process_details import colored_print
+    from generator.inspect import NextflowInspector, FileWatcher, \
+        draw_frame, signal_handler, write_json
+except ImportError:
+    from flowcraft.generator.process_details import colored_print
+    from flowcraft.generator.inspect import NextflowInspector, FileWatcher, \
+        draw_frame, signal_handler, write_json
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class MultiInspector:
+    """Inspects several nextflow pipelines from a single process.
+
+    One :py:class:`NextflowInspector` is created for each project directory
+    and all of them are driven from a single asyncio event loop: each
+    pipeline has a coroutine that waits for changes in its nextflow files
+    (see :func:`FileWatcher.wait_async`) and updates its inspection in the
+    default executor of the loop. The pipelines can be displayed in an
+    aggregated curses overview, with the detailed overview of each pipeline
+    available on demand, or broadcast to the flowcraft web app using a single
+    pool of HTTP connections.
+
+    Parameters
+    ----------
+    directories : list
+        Project directories of the pipelines.
+    trace_file : str
+        Path to the trace file, relative to each project directory.
+    refresh_rate : float
+        Minimum interval between checks of the nextflow files, when they
+        are polled.
+    pretty : bool
+        Pretty inspection mode that removes usual reporting processes.
+    ip_addr : str
+        Address of the flowcraft web app.
+    delta : bool
+        Broadcast versioned deltas of the status.
+    checkpoint : bool
+        Store the inspection state of each pipeline next to its trace file.
+    straggler_factor : float
+        Multiple of the 90th percentile of the duration of a process above
+        which its running tags are flagged as stragglers.
+    capacity : int
+        Number of cpus available to the executor of each pipeline.
+    gantt : bool
+        Include the intervals of each task in the timeline of the pipelines.
+    retry_alarm : float
+        Fraction of failed attempts of a process above which it raises a
+        retry alarm.
+    disk_rate : float
+        Maximum number of task work directories sized per second in each
+        pipeline. If 0, the work directories are not sized.
+    """
+
+    def __init__(self, directories, trace_file, refresh_rate, pretty=False,
+                 ip_addr=None, delta=False, checkpoint=True,
+                 straggler_factor=3, capacity=None, gantt=False,
+                 retry_alarm=0.25, disk_rate=20):
+
+        self.inspectors = OrderedDict()
+        """
+        dict: Maps the project directories to their
+        :py:class:`NextflowInspector`.
+        """
+
+        for d in directories:
+            inspector = NextflowInspector(trace_file, refresh_rate, pretty,
+                                          ip_addr, delta, checkpoint,
+                                          workdir=d,
+                                          straggler_factor=straggler_factor,
+                                          capacity=capacity, gantt=gantt,
+                                          retry_alarm=retry_alarm,
+                                          disk_rate=disk_rate)
+            self.inspectors[inspector.workdir] = inspector
+
+        self.snapshots = {}
+        """
+        dict: Maps the project directories to the latest
+        :py:class:`OverviewSnapshot` of their pipeline.
+        """
+
+        self.errors = {}
+        """
+        dict: Maps the project directories to the error that stopped the
+        inspection of their pipeline.
+        """
+
+        self.senders = OrderedDict()
+        """
+        dict: Maps the project directories to their
+        :py:class:`BroadcastSender`, in the broadcast mode.
+        """
+
+        self.wake = None
+        """
+        asyncio.Event: Set when a pipeline is updated or a key is pressed,
+        to wake the curses overview. Created in the event loop.
+        """
+
+        self.stay_alive = True
+        """
+        boolean: Set to False to stop the inspection.
+        """
+
+        self.clock_rate = 1
+        """
+        int: Interval in seconds between redraws of the overview clock.
+        """
+
+        # CURSES ATTRIBUTES
+        self.screen = None
+        self.pad = None
+        self.pad_size = None
+        self.frame = {}
+        # Set when the whole pad must be refreshed (e.g.: when returning
+        # from the overview of a pipeline)
+        self.refresh_pending = True
+        # Index of the selected pipeline and directory of the pipeline
+        # whose overview is displayed
+        self.selected = 0
+        self.drilldown = None
+
+    def _bind_signal_handler(self):
+        """Binds SIGINT to the :func:`signal_handler` function, which resets
+        the screen of the aggregated overview. It is not bound by the
+        one-shot inspection.
+        """
+
+        signal.signal(signal.SIGINT, lambda *x: signal_handler(self.screen))
+
+    async def _watch(self, directory, on_update):
+        """Updates the inspection of a pipeline whenever its nextflow files
+        change, calling ``on_update`` with the directory after each update.
+        ``on_update`` is also called every ``clock_rate`` seconds of the
+        inspector, so that the values that depend on the current time are
+        updated while the files do not change.
+        """
+
+        inspector = self.inspectors[directory]
+        watcher = FileWatcher([inspector.log_file, inspector.trace_file],
+                              inspector.refresh_rate)
+        inspector._start_disk_usage()
+        loop = asyncio.get_event_loop()
+
+        changed = True
+
+        try:
+            while True:
+                # The files are parsed in the default executor, so that a
+                # slow pipeline does not stall the others or the overview
+                if changed:
+                    await loop.run_in_executor(None,
+                                               inspector.update_inspection)
+                on_update(directory)
+                changed = await watcher.wait_async(inspector.clock_rate)
+        except FileNotFoundError:
+            self.errors[directory] = "nextflow log and/or trace files are " \
+                                     "no longer reachable"
+        except Exception as e:
+            self.errors[directory] = str(e) or type(e).__name__
+        finally:
+            watcher.close()
+            inspector.disk_usage.close()
+
+        # The errors are only reported after closing the curses overview
+        if self.screen is None:
+            logger.error(colored_print(
+                "ERROR: Inspection of {} stopped: {}".format(
+                    directory, self.errors[directory]), "red_bold"))
+        on_update(directory)
+
+    async def _run(self, on_update, main):
+        """Runs the ``main`` coroutine while the pipelines are inspected.
+        """
+
+        self.wake = asyncio.Event()
+
+        tasks = [asyncio.ensure_future(self._watch(d, on_update))
+                 for d in self.inspectors]
+
+        try:
+            await main()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def inspect_once(self, output="-"):
+        """Parses the nextflow files of each pipeline a single time and
+        writes the summaries of the inspections as a JSON object, keyed by
+        project directory. Pipelines whose inspection failed only contain
+        the ``error`` key.
+
+        Parameters
+        ----------
+        output : str
+            Path to the output file, or "-" for the standard output.
+        """
+
+        summaries = OrderedDict()
+
+        for directory, inspector in self.inspectors.items():
+            try:
+                inspector.update_inspection()
+                if inspector.checkpoint_file:
+                    inspector.save_checkpoint()
+                summaries[directory] = inspector._get_summary_json()
+            except Exception as e:
+                summaries[directory] = {"error": str(e) or
+                                        type(e).__name__}
+
+        write_json(summaries, output)
+
+    #################
+    # CURSES METHODS
+    #################
+
+    def display_overview(self):
+        """Displays the aggregated overview of the pipelines.
+        """
+
+        self._bind_signal_handler()
+        self.screen = curses.initscr()
+
+        self.screen.keypad(True)
+        self.screen.nodelay(-1)
+        curses.cbreak()
+        curses.noecho()
+        curses.start_color()
+
+        try:
+            loop = asyncio.get_event_loop()
+            loop.run_until_complete(self._run(self._on_overview_update,
+                                              self._overview_loop))
+        finally:
+            curses.nocbreak()
+            self.screen.keypad(0)
+            curses.echo()
+            curses.endwin()
+
+        for directory, error in self.errors.items():
+            sys.stderr.write(colored_print(
+                "ERROR: Inspection of {} stopped: {}\n".format(
+                    directory, error), "red_bold"))
+
+    def _on_overview_update(self, directory):
+
+        self.snapshots[directory] = \
+            self.inspectors[directory]._overview_snapshot()
+        self.wake.set()
+
+    async def _overview_loop(self):
+
+        loop = asyncio.get_event_loop()
+        loop.add_reader(sys.stdin, self.wake.set)
+
+        try:
+            while self.stay_alive:
+
+                # Sleep until a pipeline is updated, a key is pressed or the
+                # header clock needs to be updated
+                try:
+                    await asyncio.wait_for(
+                        self.wake.wait(),
+                        self.clock_rate - (monotonic() % self.clock_rate))
+                except asyncio.TimeoutError:
+                    pass
+                self.wake.clear()
+
+                self._curses_keybindings()
+                self.flush_overview()
+        finally:
+            loop.remove_reader(sys.stdin)
+
+    def _curses_keybindings(self):
+
+        c = self.screen.getch()
+
+        # Keybindings of the overview of a single pipeline
+        if self.drilldown:
+            inspector = self.inspectors[self.drilldown]
+            if c in [ord("q"), ord("b"), 27, 127, curses.KEY_BACKSPACE]:
+                self._show_pipeline(None)
+            elif c == curses.KEY_UP:
+                inspector._updown("up")
+            elif c == curses.KEY_DOWN:
+                inspector._updown("down")
+            elif c == curses.KEY_LEFT:
+                inspector._rightleft("left")
+            elif c == curses.KEY_RIGHT:
+                inspector._rightleft("right")
+            elif c == curses.KEY_RESIZE:
+                inspector.screen_lines = self.screen.getmaxyx()[0]
+            return
+
+        if c == curses.KEY_UP and self.selected > 0:
+            self.selected -= 1
+        elif c == curses.KEY_DOWN and \
+                self.selected < len(self.inspectors) - 1:
+            self.selected += 1
+        elif c in [curses.KEY_ENTER, curses.KEY_RIGHT, 10, 13]:
+            self._show_pipeline(list(self.inspectors)[self.selected])
+        elif c == ord("q"):
+            self.stay_alive = False
+
+    def _show_pipeline(self, directory):
+        """Switches the display to the overview of the pipeline in
+        ``directory``, or back to the aggregated overview when None.
+        """
+
+        self.drilldown = directory
+
+        if directory is None:
+            self.refresh_pending = True
+            return
+
+        inspector = self.inspectors[directory]
+        inspector.screen = self.screen
+        inspector.screen_lines = self.screen.getmaxyx()[0]
+        # Forces the refresh of the whole pad of the inspector
+        inspector.frame_padding = None
+
+    def _aggregated_lines(self, height):
+        """Returns the lines of the aggregated overview, as lists of
+        (column, text, attribute) segments.
+
+        Parameters
+        ----------
+        height : int
+            Number of lines of the screen.
+        """
+
+        totals = {"submitted": 0, "failed": 0, "retry": 0, "finished": 0}
+        rows = []
+
+        for directory in self.inspectors:
+            snapshot = self.snapshots.get(directory)
+
+            if directory in self.errors:
+                status = "error"
+            elif snapshot:
+                status = snapshot.run_status or "-"
+            else:
+                status = "waiting"
+
+            counts = snapshot.totals if snapshot else {}
+            for i in totals:
+                totals[i] += counts.get(i, 0)
+
+            name = basename(directory)
+            if snapshot and snapshot.pipeline_tag:
+                name = "{} [{}]".format(name, snapshot.pipeline_tag)
+
+            rows.append("{0:40.40}  {1:10.10}  {2:>8}  {3:>8}  {4:>8}  "
+                        "{5:>9}".format(name, status,
+                                        *[counts.get(i, 0) for i in totals]))
+
+        lines = [
+            [(0, "Inspection of {} pipelines at {}".format(
+                len(self.inspectors),
+                strftime("%Y-%m-%d %H:%M:%S", gmtime())), curses.A_BOLD)],
+            [(0, "Running: {}  Failed: {}  Retrying: {}  Completed: {}    "
+                 "(Up/Down: select, Enter: details, q: quit)".format(
+                    *[totals[i] for i in totals]), curses.A_NORMAL)],
+            [(0, "{0:40.40}  {1:10.10}  {2:>8}  {3:>8}  {4:>8}  {5:>9}".format(
+                "Pipeline", "Status", "Running", "Failed", "Retrying",
+                "Completed"), curses.A_UNDERLINE)]
+        ]
+
+        # Scroll the rows so that the selected pipeline is visible
+        visible = max(height - len(lines), 1)
+        top = max(0, self.selected - visible + 1)
+
+        for i, row in enumerate(rows[top:top + visible], top):
+            lines.append([(0, row, curses.A_REVERSE if i == self.selected
+                           else curses.A_NORMAL)])
+
+        return lines
+
+    def flush_overview(self):
+        """Displays the aggregated overview of the pipelines, or the
+        overview of the selected pipeline.
+        """
+
+        if self.drilldown:
+            snapshot = self.snapshots.get(self.drilldown)
+            if snapshot:
+                self.inspectors[self.drilldown].flush_overview(snapshot)
+            return
+
+        height, width = self.screen.getmaxyx()
+
+        if self.pad is None or self.pad_size != (height, width):
+            self.pad = curses.newpad(height, 2000)
+            self.pad_size = (height, width)
+            self.frame = {}
+            self.refresh_pending = True
+
+        if draw_frame(self.pad, self.frame, self._aggregated_lines(height)) \
+                or self.refresh_pending:
+            self.pad.refresh(0, 0, 0, 0, height - 1, width - 1)
+            self.refresh_pending = False
+
+    ###################
+    # BROADCAST METHODS
+    ###################
+
+    def broadcast_status(self):
+        """Broadcasts the status of all pipelines to the flowcraft web app.
+
+        The senders of all pipelines share the same HTTP session, so that
+        the connections to the server are taken from a single pool.
+        """
+
+        self._bind_signal_handler()
+        logger.info(colored_print("Preparing broadcast data...", "green_bold"))
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=len(self.inspectors))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        try:
+            for directory, inspector in self.inspectors.items():
+                self.senders[directory] = inspector.start_sender(session)
+                inspector._print_msg(self.senders[directory].run_id)
+
+            loop = asyncio.get_event_loop()
+            loop.run_until_complete(self._run(self._on_broadcast_update,
+                                              self._broadcast_loop))
+        finally:
+            logger.info("Closing connections")
+            # The senders are stopped together and then joined
+            for sender in self.senders.values():
+                sender.close(0)
+            for sender in self.senders.values():
+                sender.join(sender.timeout)
+            session.close()
+
+    def _on_broadcast_update(self, directory):
+
+        inspector = self.inspectors[directory]
+
+        if directory in self.senders and inspector._publish_due():
+            self.senders[directory].submit(inspector._get_status_json())
+
+    async def _broadcast_loop(self):
+
+        # Runs until the server refused all the pipelines or all the
+        # inspections stopped
+        while self.stay_alive:
+            if all(x.error for x in self.senders.values()) or \
+                    len(self.errors) == len(self.inspectors):
+                break
+            await asyncio.sleep(1)
@@ -0,0 +1,265 @@
+import time
+import logging
+
+from datetime import datetime
+from collections import OrderedDict
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+def parse_log_time(time_str, year=None):
+    """Converts a timestamp of the nextflow log (e.g.: "Apr-19
+    19:07:33.100") into seconds since the epoch.
+
+    The log timestamps do not include the year, so the current year is
+    assumed, and they are interpreted in the local time zone.
+
+    Parameters
+    ----------
+    time_str : str
+        Timestamp of the nextflow log.
+    year : int, optional
+        Year of the timestamp. By default, the current year.
+
+    Returns
+    -------
+    float
+        Seconds since the epoch, or None when the timestamp cannot be
+        parsed.
+    """
+
+    if year is None:
+        year = datetime.now().year
+
+    try:
+        return datetime.strptime("{}-{}".format(year, time_str),
+                                 "%Y-%b-%d %H:%M:%S.%f").timestamp()
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_trace_time(time_str):
+    """Converts a timestamp of the trace file (e.g.: "2018-04-19
+    19:07:33.123") into seconds since the epoch, interpreted in the local
+    time zone.
+
+    Parameters
+    ----------
+    time_str : str
+        Timestamp of the trace file.
+
+    Returns
+    -------
+    float
+        Seconds since the epoch, or None when the timestamp cannot be
+        parsed.
+    """
+
+    for fmt in ["%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"]:
+        try:
+            return datetime.strptime(time_str, fmt).timestamp()
+        except (ValueError, TypeError):
+            continue
+
+    return None
+
+
+def format_duration(seconds):
+    """Formats a duration in seconds as H:MM:SS, or "-" when it is unknown.
+    """
+
+    if seconds is None:
+        return "-"
+
+    m, s = divmod(int(round(seconds)), 60)
+    h, m = divmod(m, 60)
+
+    return "{}:{:02d}:{:02d}".format(h, m, s)
+
+
+class ProgressEstimator:
+    """Estimates the throughput and the remaining time of each process and
+    of the pipeline.
+
+    Only the time of the first submission and of the latest completion of
+    each process are stored, as the tags are submitted and completed. The
+    throughput of a process is the number of completed tags per hour since
+    its first submission, and the remaining tags are derived from the
+    number of samples of the pipeline and from the barrier of the process:
+    once the input channel of a process is closed, only its running tags
+    remain.
+    """
+
+    def __init__(self):
+
+        self.first_submit = {}
+        """
+        dict: Maps the processes to the time (seconds since the epoch) of
+        their first submission.
+        """
+
+        self.last_complete = {}
+        """
+        dict: Maps the processes to the time (seconds since the epoch) of
+        their latest completed tag.
+        """
+
+    def get_state(self):
+        """Returns the submission and completion times, to be restored with
+        :func:`restore`.
+
+        Returns
+        -------
+        dict
+        """
+
+        return {"first_submit": dict(self.first_submit),
+                "last_complete": dict(self.last_complete)}
+
+    def restore(self, state):
+        """Restores the state returned by :func:`get_state`.
+
+        Parameters
+        ----------
+        state : dict
+        """
+
+        self.first_submit = dict(state["first_submit"])
+        self.last_complete = dict(state["last_complete"])
+
+    def submitted(self, process, time_str):
+        """Registers the submission of a tag of a process.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        time_str : str
+            Timestamp of the submission in the nextflow log.
+        """
+
+        if process in self.first_submit:
+            return
+
+        submit_time = parse_log_time(time_str)
+        if submit_time is not None:
+            self.first_submit[process] = submit_time
+
+    def completed(self, process, entry):
+        """Registers the completion of a tag of a process.
+
+        The completion time is the start time of the trace entry plus its
+        realtime. When these columns are not available, the time when the
+        entry was parsed is used.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        entry : TraceEntry
+            Trace entry of the completed tag.
+        """
+
+        if entry.start is not None and entry.realtime is not None:
+            complete_time = entry.start + entry.realtime
+        else:
+            complete_time = time.time()
+
+        self.last_complete[process] = max(
+            complete_time, self.last_complete.get(process, complete_time))
+
+    def _process_estimate(self, process, proc, n_samples, now):
+
+        done = len(proc["finished"]) + len(proc["failed"] - proc["retry"])
+        active = len(proc["submitted"]) + len(proc["retry"])
+
+        if proc["barrier"] == "C":
+            remaining = active
+        else:
+            remaining = max(n_samples - done, active)
+
+        # The throughput of a process whose tags have all finished is
+        # measured until its last completion
+        first = self.first_submit.get(process)
+        if active or proc["barrier"] != "C":
+            end = now
+        else:
+            end = self.last_complete.get(process, now)
+
+        throughput = None
+        if first is not None and proc["finished"] and end > first:
+            throughput = len(proc["finished"]) / (end - first) * 3600
+
+        if not remaining:
+            eta = 0
+        elif throughput:
+            eta = remaining / throughput * 3600
+        else:
+            eta = None
+
+        return {
+            "throughput": throughput,
+            "remaining": remaining,
+            "eta": eta
+        }
+
+    def estimate(self, processes, samples, run_status, now):
+        """Estimates the throughput and the remaining time of each process
+        and of the pipeline.
+
+        The throughput of the pipeline is the one of its slowest process
+        that is still receiving or running tags, and its remaining time is
+        the longest remaining time of the processes. Processes that have not
+        completed any tag yet have no estimate, in which case the remaining
+        time of the pipeline is a lower bound (see the "pending" key).
+
+        Parameters
+        ----------
+        processes : dict
+            The processes of the inspection, with their barrier and tag
+            sets.
+        samples : set
+            Samples of the pipeline.
+        run_status : str
+            Status of the pipeline.
+        now : float
+            Current time, or the time when the pipeline stopped, in seconds
+            since the epoch.
+
+        Returns
+        -------
+        dict
+            Dictionary with the "throughput" (samples per hour), "eta"
+            (seconds), "pending" (number of processes without an estimate)
+            and "processes" (estimates of each process) keys.
+        """
+
+        estimates = OrderedDict()
+        for process, proc in processes.items():
+            estimates[process] = self._process_estimate(
+                process, proc, len(samples), now)
+
+        rates = [x["throughput"] for p, x in estimates.items()
+                 if x["throughput"] and (processes[p]["barrier"] != "C" or
+                                         x["remaining"])]
+        if not rates:
+            rates = [x["throughput"] for x in estimates.values()
+                     if x["throughput"]]
+
+        pending = len([x for x in estimates.values() if x["eta"] is None])
+
+        if run_status == "complete":
+            eta = 0
+        elif run_status == "aborted":
+            eta = None
+        else:
+            etas = [x["eta"] for x in estimates.values()
+                    if x["eta"] is not None]
+            eta = max(etas) if etas else None
+
+        return {
+            "throughput": min(rates) if rates else None,
+            "eta": eta,
+            "pending": pending,
+            "processes": estimates
+        }
@@ -0,0 +1,208 @@
+import logging
+
+from collections import defaultdict, OrderedDict
+
+try:
+    from generator.progress import parse_log_time
+except ImportError:
+    from flowcraft.generator.progress import parse_log_time
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class LatencyAggregate:
+    """Running count, sum and maximum of a latency, in seconds.
+    """
+
+    __slots__ = ["count", "total", "max"]
+
+    def __init__(self):
+
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def add(self, value):
+
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def mean(self):
+        """Returns the mean latency, or None when no value was added.
+        """
+
+        return self.total / self.count if self.count else None
+
+    def get_state(self):
+
+        return [self.count, self.total, self.max]
+
+    def restore(self, state):
+
+        self.count, self.total, self.max = state
+
+    def to_dict(self):
+
+        return {
+            "count": self.count,
+            "avg": round(self.mean(), 1) if self.count else None,
+            "max": round(self.max, 1) if self.count else None
+        }
+
+
+class SchedulingStats:
+    """Scheduling latencies of the tasks, aggregated by process and by
+    executor queue.
+
+    Two latencies are measured for each task:
+
+        - Queue wait: time between the submission of the task, in the
+          nextflow log, and the start of its execution, in the ``start``
+          column of the trace. It is spent waiting for the executor (e.g.:
+          in the queue of a cluster scheduler).
+        - Overhead: difference between the ``duration`` and the
+          ``realtime`` columns of the trace, which is spent outside of the
+          task script (e.g.: staging files or pulling containers).
+
+    The submission time of each task is kept, by its hash, only until its
+    trace entry is parsed.
+    """
+
+    def __init__(self):
+
+        self.submit_times = {}
+        """
+        dict: Maps the hashes of the submitted tasks whose trace entry was
+        not parsed yet to their submission time, in seconds since the epoch.
+        """
+
+        self.processes = defaultdict(
+            lambda: {"wait": LatencyAggregate(),
+                     "overhead": LatencyAggregate()})
+        """
+        dict: Maps the processes to the aggregates of the queue wait and
+        overhead of their tasks.
+        """
+
+        self.queues = defaultdict(
+            lambda: {"wait": LatencyAggregate(),
+                     "overhead": LatencyAggregate()})
+        """
+        dict: Maps the executor queues to the aggregates of the queue wait
+        and overhead of their tasks.
+        """
+
+    def get_state(self):
+        """Returns the pending submissions and the aggregates, to be
+        restored with :func:`restore`.
+
+        Returns
+        -------
+        dict
+        """
+
+        state = {"submit_times": dict(self.submit_times)}
+        for attr in ["processes", "queues"]:
+            state[attr] = dict(
+                (k, dict((key, agg.get_state()) for key, agg in v.items()))
+                for k, v in getattr(self, attr).items())
+
+        return state
+
+    def restore(self, state):
+        """Restores the state returned by :func:`get_state`.
+
+        Parameters
+        ----------
+        state : dict
+        """
+
+        self.submit_times = dict(state["submit_times"])
+        for attr in ["processes", "queues"]:
+            aggregates = defaultdict(
+                lambda: {"wait": LatencyAggregate(),
+                         "overhead": LatencyAggregate()})
+            for k, v in state[attr].items():
+                for key, agg in v.items():
+                    aggregates[k][key].restore(agg)
+            setattr(self, attr, aggregates)
+
+    def submitted(self, task_hash, time_str):
+        """Registers the submission of a task.
+
+        Parameters
+        ----------
+        task_hash : str
+            Hash of the task (e.g.: "ab/123456").
+        time_str : str
+            Timestamp of the submission in the nextflow log.
+        """
+
+        submit_time = parse_log_time(time_str)
+        if submit_time is not None:
+            self.submit_times[task_hash] = submit_time
+
+    def add(self, process, entry):
+        """Adds the latencies of a trace entry to the aggregates of its
+        process and executor queue.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        entry : TraceEntry
+            Trace entry of the task.
+        """
+
+        queue = entry.queue or "-"
+        latencies = {}
+
+        submit_time = self.submit_times.pop(entry.hash, None)
+        # The start of cached tasks precedes their submission
+        if submit_time is not None and entry.start is not None and \
+                entry.start >= submit_time:
+            latencies["wait"] = entry.start - submit_time
+
+        if entry.duration is not None and entry.realtime is not None:
+            latencies["overhead"] = max(entry.duration - entry.realtime, 0)
+
+        for key, value in latencies.items():
+            self.processes[process][key].add(value)
+            self.queues[queue][key].add(value)
+
+    def mean(self, process, key):
+        """Returns the mean latency of a process, or None when it is not
+        available.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        key : str
+            Either "wait" or "overhead".
+        """
+
+        if process not in self.processes:
+            return None
+
+        return self.processes[process][key].mean()
+
+    def summary(self):
+        """Returns the latencies of each process and executor queue.
+
+        Returns
+        -------
+        dict
+            Dictionary with the "processes" and "queues" keys, mapping each
+            process or queue to the count, average and maximum (in seconds)
+            of the "wait" and "overhead" latencies.
+        """
+
+        return dict(
+            (attr, OrderedDict(
+                (k, {"wait": v["wait"].to_dict(),
+                     "overhead": v["overhead"].to_dict()})
+                for k, v in sorted(getattr(self, attr).items())))
+            for attr in ["processes", "queues"])
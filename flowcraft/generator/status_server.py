@@ -0,0 +1,333 @@
+import json
+import queue
+import logging
+import threading
+
+from socketserver import ThreadingMixIn
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+try:
+    from generator.broadcast import StatusDeltaEncoder
+except ImportError:
+    from flowcraft.generator.broadcast import StatusDeltaEncoder
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests of the :py:class:`StatusServer`.
+
+    The following endpoints are available:
+
+        - ``/status``: JSON snapshot with the complete status of the
+          inspection (``{"version": ..., "status_json": ...}``).
+        - ``/events``: Server-Sent-Events stream. The first event
+          (``full``) contains the complete status and the following ones
+          (``delta``) only contain the changes since the previous version,
+          in the format of :py:class:`StatusDeltaEncoder`. A ``full`` event
+          is sent again when the client falls behind.
+        - ``/metrics``: Metrics of the inspection in the Prometheus text
+          exposition format (see :func:`format_metrics`).
+    """
+
+    def do_GET(self):
+
+        path = self.path.split("?")[0].rstrip("/")
+
+        if path == "/status":
+            self._send_snapshot()
+        elif path == "/events":
+            self._send_events()
+        elif path == "/metrics":
+            self._send_metrics()
+        else:
+            self.send_error(404)
+
+    def _send_headers(self, code, content_type, length=None):
+
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        if length is not None:
+            self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+    def _send_snapshot(self):
+
+        body = self.server.get_snapshot()
+
+        if body is None:
+            self.send_error(503, "The inspection has not started yet")
+            return
+
+        self._send_headers(200, "application/json", len(body))
+        self.wfile.write(body)
+
+    def _send_metrics(self):
+
+        body = self.server.metrics
+
+        if body is None:
+            self.send_error(503, "The inspection has not started yet")
+            return
+
+        self._send_headers(200, "text/plain; version=0.0.4; charset=utf-8",
+                           len(body))
+        self.wfile.write(body)
+
+    def _send_events(self):
+
+        self._send_headers(200, "text/event-stream")
+
+        events = self.server.subscribe()
+
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=self.server.keepalive)
+                except queue.Empty:
+                    # Comment line that keeps the connection alive
+                    event = b": keepalive\n\n"
+
+                # The server is closing
+                if event is None:
+                    break
+
+                self.wfile.write(event)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.unsubscribe(events)
+
+    def log_message(self, fmt, *args):
+
+        logger.debug("{} - {}".format(self.address_string(), fmt % args))
+
+
+class StatusServer(ThreadingMixIn, HTTPServer):
+    """Local HTTP server that provides the status of an inspection to any
+    number of clients (e.g.: dashboards).
+
+    Each new status is provided with :func:`publish` and is encoded only
+    once, regardless of the number of clients: the delta to the previous
+    version is serialized once and the same event is queued for every
+    connected client of the ``/events`` stream. The complete status is
+    only serialized when requested. Clients whose queue of events is full
+    are resynced with the complete status.
+
+    Parameters
+    ----------
+    address : tuple
+        Host and port where the server listens.
+    keepalive : float
+        Time in seconds without events after which a keepalive comment is
+        sent to the clients of the events stream.
+    max_pending : int
+        Maximum number of events waiting to be sent to each client.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, keepalive=15, max_pending=16):
+
+        super().__init__(address, StatusRequestHandler)
+
+        self.keepalive = keepalive
+        """
+        float: Time in seconds without events after which a keepalive
+        comment is sent to the clients of the events stream.
+        """
+
+        self.max_pending = max_pending
+        """
+        int: Maximum number of events waiting to be sent to each client.
+        """
+
+        self.encoder = StatusDeltaEncoder()
+        """
+        :py:class:`StatusDeltaEncoder`: Encodes the changes between
+        consecutive versions of the status. Each version is acknowledged as
+        soon as it is encoded.
+        """
+
+        self.lock = threading.Lock()
+        """
+        threading.Lock: Guards the status and the queues of the clients.
+        """
+
+        self.status_json = None
+        """
+        dict: The latest status. It must not be modified after being
+        published.
+        """
+
+        self.version = None
+        """
+        int: Version of the latest status.
+        """
+
+        self.full_cache = None
+        """
+        tuple: Version of the status, serialized snapshot and full event,
+        cached until a new status is published.
+        """
+
+        self.metrics = None
+        """
+        bytes: The latest metrics, in the Prometheus text exposition format.
+        Scrapes return these bytes without formatting the metrics again.
+        """
+
+        self.clients = set()
+        """
+        set: Queues of events of the connected clients.
+        """
+
+        self.thread = None
+        """
+        threading.Thread: Thread where the requests are served.
+        """
+
+    def start(self):
+        """Starts serving the requests in a background thread.
+        """
+
+        self.thread = threading.Thread(target=self.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Ends the events streams and stops the server.
+        """
+
+        with self.lock:
+            for events in self.clients:
+                self._put(events, None)
+
+        self.shutdown()
+        self.server_close()
+
+    @staticmethod
+    def _event(name, version, data):
+        """Formats a Server-Sent-Event.
+        """
+
+        return "id: {}\nevent: {}\ndata: {}\n\n".format(
+            version, name, data).encode("utf8")
+
+    def _get_full(self):
+        """Returns the serialized snapshot and the full event of the latest
+        status. Must be called with the :attr:`lock`.
+        """
+
+        if self.full_cache is None or self.full_cache[0] != self.version:
+            data = json.dumps({"version": self.version,
+                               "status_json": self.status_json})
+            self.full_cache = (self.version, data.encode("utf8"),
+                               self._event("full", self.version, data))
+
+        return self.full_cache[1], self.full_cache[2]
+
+    def _put(self, events, event):
+        """Queues an event for a client. When the queue is full, the
+        client fell behind and its pending events are replaced by the full
+        event of the latest status (or by None, when the server is closing).
+        """
+
+        try:
+            events.put_nowait(event)
+            return
+        except queue.Full:
+            pass
+
+        while True:
+            try:
+                events.get_nowait()
+            except queue.Empty:
+                break
+
+        if event is not None and self.status_json is not None:
+            event = self._get_full()[1]
+
+        events.put_nowait(event)
+
+    def get_snapshot(self):
+        """Returns the serialized snapshot of the latest status, or None
+        when no status was published.
+
+        Returns
+        -------
+        bytes
+        """
+
+        with self.lock:
+            if self.status_json is None:
+                return None
+            return self._get_full()[0]
+
+    def subscribe(self):
+        """Registers a new client of the events stream.
+
+        Returns
+        -------
+        queue.Queue
+            The queue of events of the client. It starts with the full
+            event of the latest status.
+        """
+
+        events = queue.Queue(self.max_pending)
+
+        with self.lock:
+            if self.status_json is not None:
+                events.put_nowait(self._get_full()[1])
+            self.clients.add(events)
+
+        return events
+
+    def unsubscribe(self, events):
+        """Removes a client of the events stream.
+        """
+
+        with self.lock:
+            self.clients.discard(events)
+
+    def publish_metrics(self, metrics):
+        """Publishes the new metrics of the inspection.
+
+        Parameters
+        ----------
+        metrics : str
+            The metrics in the Prometheus text exposition format.
+        """
+
+        self.metrics = metrics.encode("utf8")
+
+    def publish(self, status_json):
+        """Publishes a new status to the clients.
+
+        Parameters
+        ----------
+        status_json : dict
+            The complete status of the inspection. It must not be modified
+            after being published.
+        """
+
+        with self.lock:
+            payload = self.encoder.encode(status_json)
+            self.encoder.ack(payload["version"])
+
+            self.status_json = status_json
+            self.version = payload["version"]
+
+            if not self.clients:
+                return
+
+            if "status_json" in payload:
+                event = self._get_full()[1]
+            else:
+                event = self._event("delta", self.version,
+                                    json.dumps(payload))
+
+            for events in self.clients:
+                self._put(events, event)
@@ -0,0 +1,256 @@
+import logging
+
+from collections import OrderedDict
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class P2Quantile:
+    """Streaming estimate of a quantile with the P² algorithm (Jain and
+    Chlamtac, 1985).
+
+    Only five markers are stored, regardless of the number of observations.
+    The heights of the markers are adjusted with a piecewise-parabolic
+    prediction as each observation is added. Until five observations are
+    added, the quantile is computed from the stored observations.
+
+    Parameters
+    ----------
+    p : float
+        Quantile to estimate, between 0 and 1.
+    """
+
+    __slots__ = ["p", "count", "heights", "positions", "desired",
+                 "increments"]
+
+    def __init__(self, p):
+
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        """Adds an observation.
+        """
+
+        self.count += 1
+
+        if self.count <= 5:
+            self.heights.append(x)
+            self.heights.sort()
+            return
+
+        q = self.heights
+        n = self.positions
+
+        # Find the cell of the observation, extending the extreme markers
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Adjust the heights of the middle markers
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or \
+                    (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                h = self._parabolic(i, d)
+                if not q[i - 1] < h < q[i + 1]:
+                    h = self._linear(i, d)
+                q[i] = h
+                n[i] += d
+
+    def _parabolic(self, i, d):
+
+        q = self.heights
+        n = self.positions
+
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def _linear(self, i, d):
+
+        q = self.heights
+        n = self.positions
+
+        return q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+    def get_state(self):
+
+        return [self.count, self.heights, self.positions, self.desired]
+
+    def restore(self, state):
+
+        count, heights, positions, desired = state
+        self.count = count
+        self.heights = list(heights)
+        self.positions = list(positions)
+        self.desired = list(desired)
+
+    def value(self):
+        """Returns the estimate of the quantile, or None when there are no
+        observations.
+        """
+
+        if not self.count:
+            return None
+
+        if self.count > 5:
+            return self.heights[2]
+
+        # Linear interpolation between the stored observations
+        pos = self.p * (self.count - 1)
+        low = int(pos)
+        high = min(low + 1, self.count - 1)
+
+        return self.heights[low] + (pos - low) * \
+            (self.heights[high] - self.heights[low])
+
+
+class StragglerDetector:
+    """Flags the running tags of a process that take much longer than its
+    completed tags.
+
+    A streaming estimate of a quantile (by default, the 90th percentile) of
+    the duration of the completed tasks is kept for each process (see
+    :py:class:`P2Quantile`), so that no history of durations is stored. A
+    running tag is a straggler when the time since its submission exceeds
+    the estimate multiplied by a factor.
+
+    Parameters
+    ----------
+    quantile : float
+        Quantile of the durations used as the reference of each process.
+    min_count : int
+        Minimum number of completed tasks of a process before its running
+        tags are checked.
+    """
+
+    def __init__(self, quantile=0.9, min_count=5):
+
+        self.quantile = quantile
+        """
+        float: Quantile of the durations used as the reference of each
+        process.
+        """
+
+        self.min_count = min_count
+        """
+        int: Minimum number of completed tasks of a process before its
+        running tags are checked.
+        """
+
+        self.estimators = {}
+        """
+        dict: Maps the processes to the :py:class:`P2Quantile` of the
+        duration of their completed tasks.
+        """
+
+    def get_state(self):
+        """Returns the markers of the estimators, to be restored with
+        :func:`restore`.
+
+        Returns
+        -------
+        dict
+        """
+
+        return dict((p, x.get_state()) for p, x in self.estimators.items())
+
+    def restore(self, state):
+        """Restores the state returned by :func:`get_state`.
+
+        Parameters
+        ----------
+        state : dict
+        """
+
+        self.estimators = {}
+        for process, markers in state.items():
+            self.estimators[process] = P2Quantile(self.quantile)
+            self.estimators[process].restore(markers)
+
+    def add(self, process, duration):
+        """Adds the duration of a completed task of a process.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        duration : float
+            Duration of the task in seconds.
+        """
+
+        if process not in self.estimators:
+            self.estimators[process] = P2Quantile(self.quantile)
+
+        self.estimators[process].add(duration)
+
+    def reference(self, process):
+        """Returns the reference duration of a process, or None when it
+        does not have enough completed tasks.
+        """
+
+        estimator = self.estimators.get(process)
+        if estimator is None or estimator.count < self.min_count:
+            return None
+
+        return estimator.value()
+
+    def find(self, running, now, factor):
+        """Finds the stragglers among the running tags.
+
+        Parameters
+        ----------
+        running : iterable
+            (process, tag, submission time) tuples of the running tags, with
+            the submission time in seconds since the epoch.
+        now : float
+            Current time in seconds since the epoch.
+        factor : float
+            Multiple of the reference duration above which a tag is a
+            straggler.
+
+        Returns
+        -------
+        dict
+            Maps the processes with stragglers to the list of their
+            stragglers, as dictionaries with the "tag", "elapsed" and
+            "reference" keys (in seconds), sorted by the elapsed time.
+        """
+
+        stragglers = OrderedDict()
+
+        for process, tag, submit_time in running:
+            reference = self.reference(process)
+            if reference is None:
+                continue
+
+            elapsed = now - submit_time
+            if elapsed > reference * factor:
+                stragglers.setdefault(process, []).append({
+                    "tag": tag,
+                    "elapsed": round(elapsed, 1),
+                    "reference": round(reference, 1)
+                })
+
+        for tags in stragglers.values():
+            tags.sort(key=lambda x: -x["elapsed"])
+
+        return stragglers
@@ -0,0 +1,389 @@
+import math
+import heapq
+import bisect
+import logging
+
+from collections import defaultdict
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class ConcurrencyTimeline:
+    """Use of the cpus over time by the tasks of a pipeline, weighted by
+    the number of cpus of each task.
+
+    The interval of a task that has a trace entry goes from its ``start``
+    column to the start plus its ``realtime`` (or ``duration``). Running
+    tasks are provided when the timeline is summarised, with an interval
+    from their submission to the current time.
+
+    The intervals are not stored (unless ``gantt`` is set). Instead, only
+    the endpoints of each interval are recorded, as the changes of the
+    cpus and tasks in use at each point in time. When the timeline is
+    summarised, the levels of this step function, its maxima, idle gaps
+    and the prefix sums of the cpu seconds are recomputed after the
+    earliest point changed since the previous summary, and the time series
+    is built from the prefix sums.
+
+    Parameters
+    ----------
+    min_gap : float
+        Minimum duration, in seconds, of the periods without running tasks
+        that are reported as idle gaps.
+    gantt : bool
+        If True, the interval of each task is stored, to be included in the
+        summary.
+    """
+
+    def __init__(self, min_gap=60, gantt=False):
+
+        self.min_gap = min_gap
+        """
+        float: Minimum duration, in seconds, of the periods without running
+        tasks that are reported as idle gaps.
+        """
+
+        self.gantt = gantt
+        """
+        boolean: If True, the interval of each task is stored in
+        :attr:`intervals`.
+        """
+
+        self.times = []
+        """
+        list: Sorted points in time (seconds since the epoch) where the
+        number of cpus or tasks in use changes.
+        """
+
+        self.deltas = {}
+        """
+        dict: Maps the :attr:`times` to the [cpus, tasks] changes at that
+        point.
+        """
+
+        self.levels = []
+        """
+        list: (cpus, tasks) in use after each of the :attr:`times`.
+        """
+
+        self.peaks = []
+        """
+        list: Maximum (cpus, tasks) in use up to each of the :attr:`times`.
+        """
+
+        self.areas = []
+        """
+        list: Cpu seconds used from the first of the :attr:`times` up to
+        each of them.
+        """
+
+        self.gaps = []
+        """
+        list: [start, end] of the idle gaps between the :attr:`times`.
+        """
+
+        self.stale = None
+        """
+        int: Index of the earliest of the :attr:`times` whose level must be
+        recomputed, or None when the levels are up to date.
+        """
+
+        self.process_usage = defaultdict(float)
+        """
+        dict: Maps the processes to the cpu seconds of their tasks.
+        """
+
+        self.intervals = []
+        """
+        list: (process, tag, start, end, cpus) tuples of the tasks with a
+        trace entry, only stored when :attr:`gantt` is set.
+        """
+
+    def get_state(self):
+        """Returns the changes of the step function and the cpu seconds of
+        each process, to be restored with :func:`restore`.
+
+        Returns
+        -------
+        dict
+        """
+
+        return {
+            "deltas": [[t] + self.deltas[t] for t in self.times],
+            "process_usage": dict(self.process_usage),
+            "intervals": [list(x) for x in self.intervals]
+        }
+
+    def restore(self, state):
+        """Restores the state returned by :func:`get_state`.
+
+        Parameters
+        ----------
+        state : dict
+        """
+
+        self.times = [x[0] for x in state["deltas"]]
+        self.deltas = dict((t, [cpus, tasks])
+                           for t, cpus, tasks in state["deltas"])
+        self.levels, self.peaks, self.areas, self.gaps = [], [], [], []
+        self.stale = 0 if self.times else None
+        self.process_usage = defaultdict(float, state["process_usage"])
+        self.intervals = [tuple(x) for x in state["intervals"]]
+
+    def add(self, process, entry):
+        """Adds the interval of a trace entry. Entries of cached tasks and
+        entries without the start time are ignored.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        entry : TraceEntry
+            Trace entry of the task.
+        """
+
+        elapsed = entry.realtime if entry.realtime is not None \
+            else entry.duration
+        if entry.status == "CACHED" or entry.start is None or \
+                elapsed is None:
+            return
+
+        start = entry.start
+        end = start + elapsed
+        cpus = entry.cpus or 1
+
+        self._add_change(start, cpus, 1)
+        self._add_change(end, -cpus, -1)
+        self.process_usage[process] += elapsed * cpus
+
+        if self.gantt:
+            self.intervals.append((process, entry.tag, start, end, cpus))
+
+    def _add_change(self, t, cpus, tasks):
+
+        if t in self.deltas:
+            self.deltas[t][0] += cpus
+            self.deltas[t][1] += tasks
+            i = bisect.bisect_left(self.times, t)
+        else:
+            # New tasks usually end after the previous ones, so the point
+            # is inserted close to the end of the list
+            i = bisect.bisect_left(self.times, t)
+            self.times.insert(i, t)
+            self.deltas[t] = [cpus, tasks]
+
+        if self.stale is None or i < self.stale:
+            self.stale = i
+
+    def _update_levels(self):
+        """Recomputes the levels, maxima, cpu seconds and idle gaps of the
+        step function from the earliest changed point.
+        """
+
+        i = self.stale
+        if i is None:
+            return
+        self.stale = None
+
+        del self.levels[i:]
+        del self.peaks[i:]
+        del self.areas[i:]
+
+        # The gap that ends at the changed point is recomputed too
+        if i:
+            self.gaps = [x for x in self.gaps if x[0] < self.times[i - 1]]
+        else:
+            self.gaps = []
+
+        cpus, tasks = self.levels[-1] if self.levels else (0, 0)
+        peak_cpus, peak_tasks = self.peaks[-1] if self.peaks else (0, 0)
+        area = self.areas[-1] if self.areas else 0
+        previous = self.times[i - 1] if i else None
+
+        for t in self.times[i:]:
+            if previous is not None:
+                area += cpus * (t - previous)
+            previous = t
+            self.areas.append(area)
+            d_cpus, d_tasks = self.deltas[t]
+            cpus += d_cpus
+            tasks += d_tasks
+            peak_cpus = max(peak_cpus, cpus)
+            peak_tasks = max(peak_tasks, tasks)
+            self.levels.append((cpus, tasks))
+            self.peaks.append((peak_cpus, peak_tasks))
+
+        for j in range(max(i - 1, 0), len(self.times) - 1):
+            a, b = self.times[j], self.times[j + 1]
+            if not self.levels[j][1] and b - a >= self.min_gap:
+                self.gaps.append([a, b])
+
+    def _cpu_seconds(self, t):
+        """Returns the cpu seconds used by the tasks with a trace entry up
+        to the time ``t``.
+        """
+
+        i = bisect.bisect_right(self.times, t) - 1
+        if i < 0:
+            return 0
+
+        return self.areas[i] + self.levels[i][0] * (t - self.times[i])
+
+    def _running_peaks(self, running, now):
+        """Returns the maximum (cpus, tasks) in use, including the running
+        tasks. Only the points after the submission of the earliest running
+        task are visited.
+        """
+
+        starts = sorted((s, c) for _, _, s, c in running if s < now)
+        if not starts:
+            return self.peaks[-1] if self.peaks else (0, 0)
+
+        k = bisect.bisect_right(self.times, starts[0][0])
+        peak_cpus, peak_tasks = self.peaks[k - 1] if k else (0, 0)
+
+        # The running tasks only start before now, so their use does not
+        # decrease until then
+        points = heapq.merge(self.times[k:], [s for s, _ in starts])
+        run_cpus = run_tasks = 0
+        n = 0
+        j = max(k - 1, 0)
+        for t in points:
+            if t >= now:
+                break
+            while n < len(starts) and starts[n][0] <= t:
+                run_cpus += starts[n][1]
+                run_tasks += 1
+                n += 1
+            while j + 1 < len(self.times) and self.times[j + 1] <= t:
+                j += 1
+            cpus, tasks = self.levels[j] if self.times and \
+                self.times[j] <= t else (0, 0)
+            peak_cpus = max(peak_cpus, cpus + run_cpus)
+            peak_tasks = max(peak_tasks, tasks + run_tasks)
+
+        return peak_cpus, peak_tasks
+
+    def _running_gaps(self, running):
+        """Returns the idle gaps, excluding the periods with running
+        tasks. Since the running tasks end now, they cover the period since
+        the submission of the earliest one.
+        """
+
+        if not running:
+            return self.gaps
+
+        first = min(x[2] for x in running)
+
+        gaps = []
+        for a, b in self.gaps:
+            b = min(b, first)
+            if b - a >= self.min_gap:
+                gaps.append([a, b])
+
+        # Period between the end of the last task and the first submission
+        if self.times and first - self.times[-1] >= self.min_gap:
+            gaps.append([self.times[-1], first])
+
+        return gaps
+
+    def summary(self, running=(), now=None, capacity=None, max_points=100,
+                gantt=False):
+        """Summarises the use of the cpus over time.
+
+        Parameters
+        ----------
+        running : iterable
+            (process, tag, submission time, cpus) tuples of the running
+            tasks, whose intervals end at ``now``.
+        now : float
+            Current time in seconds since the epoch.
+        capacity : int, optional
+            Number of cpus available to the executor. When provided, the
+            utilization is the fraction of this capacity that was used.
+        max_points : int
+            Maximum number of points of the time series.
+        gantt : bool
+            If True, the intervals of each task are included. Requires the
+            intervals to be stored (see the ``gantt`` parameter).
+
+        Returns
+        -------
+        dict
+            Dictionary with the start and end of the timeline (seconds since
+            the epoch), the cpu seconds used by each process and in total,
+            the peak of cpus and tasks running at the same time, the
+            utilization, the idle gaps ([offset, duration] lists, in seconds
+            since the start), and the time series of the average cpus in use
+            in each interval of ``resolution`` seconds. Returns None when
+            there are no intervals.
+        """
+
+        self._update_levels()
+
+        running = [(p, t, s, c) for p, t, s, c in running] \
+            if now is not None else []
+
+        if not self.times and not running:
+            return None
+
+        t0 = min(self.times[:1] + [x[2] for x in running])
+        t1 = max(self.times[-1:] + ([now] if running else []))
+        span = t1 - t0
+
+        process_usage = defaultdict(float, self.process_usage)
+        for process, _, start, cpus in running:
+            process_usage[process] += max(now - start, 0) * cpus
+
+        peak_cpus, peak_tasks = self._running_peaks(running, now)
+
+        resolution = max(span / max_points, 1)
+        series = [0.0] * max(int(math.ceil(span / resolution)), 1)
+        last = len(series) - 1
+
+        # The cpu seconds of the tasks with a trace entry in each interval
+        # of the series are the differences of the prefix sums
+        used = [self._cpu_seconds(t0 + i * resolution)
+                for i in range(len(series))] + [self._cpu_seconds(t1)]
+        for i in range(len(series)):
+            series[i] = (used[i + 1] - used[i]) / resolution
+
+        # The running tasks are spread over the intervals
+        for _, _, a, cpus in running:
+            b = max(now, a)
+            first_bucket = max(min(int((a - t0) // resolution), last), 0)
+            last_bucket = max(min(int((b - t0) // resolution), last), 0)
+            for i in range(first_bucket, last_bucket + 1):
+                low = max(a, t0 + i * resolution)
+                high = b if i == last else min(b, t0 + (i + 1) * resolution)
+                if high > low:
+                    series[i] += (high - low) * cpus / resolution
+
+        cpu_seconds = sum(process_usage.values())
+
+        timeline = {
+            "start": t0,
+            "end": t1,
+            "cpuSeconds": round(cpu_seconds, 1),
+            "processCpuSeconds": dict(
+                (k, round(v, 1)) for k, v in process_usage.items()),
+            "peakCpus": peak_cpus,
+            "peakTasks": peak_tasks,
+            "capacity": capacity,
+            "utilization": round(cpu_seconds / (capacity * span), 3)
+            if capacity and span else None,
+            "idleGaps": [[round(a - t0, 1), round(b - a, 1)]
+                         for a, b in self._running_gaps(running)],
+            "resolution": round(resolution, 1),
+            "series": [round(x, 2) for x in series]
+        }
+
+        if gantt:
+            intervals = self.intervals + [(p, t, s, max(now, s), c)
+                                          for p, t, s, c in running]
+            timeline["gantt"] = [
+                {"process": p, "tag": t, "start": round(s - t0, 1),
+                 "end": round(e - t0, 1), "cpus": c}
+                for p, t, s, e, c in sorted(intervals, key=lambda x: x[2])]
+
+        return timeline
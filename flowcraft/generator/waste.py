@@ -0,0 +1,226 @@
+import heapq
+import logging
+
+from collections import OrderedDict
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class WasteRecord:
+    """Compute spent on the failed attempts of a process or tag.
+    """
+
+    __slots__ = ["attempts", "failures", "cpu_hours", "wall_seconds",
+                 "mem_hours"]
+
+    def __init__(self):
+
+        self.attempts = 0
+        self.failures = 0
+        self.cpu_hours = 0.0
+        self.wall_seconds = 0.0
+        self.mem_hours = 0.0
+
+    def get_state(self):
+
+        return [getattr(self, x) for x in self.__slots__]
+
+    def restore(self, state):
+
+        for attr, value in zip(self.__slots__, state):
+            setattr(self, attr, value)
+
+    def to_dict(self):
+
+        return {
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "cpuHours": round(self.cpu_hours, 3),
+            "wallSeconds": round(self.wall_seconds, 1),
+            "memGbHours": round(self.mem_hours, 3)
+        }
+
+
+class WasteAccounting:
+    """Accounts the compute spent on failed attempts, by process and by
+    tag.
+
+    For each trace entry with the FAILED status, the cpu hours (allocated
+    cpus times the realtime), the wall time and the memory hours (requested
+    memory, or the rss when it is not available, times the realtime) are
+    added to its process and tag. The attempts of every executed entry are
+    counted, so that the retry rate of each process is the fraction of its
+    attempts that failed. Tags are only recorded from their first failed
+    attempt, so that the tags that succeed are not stored.
+
+    Parameters
+    ----------
+    min_attempts : int
+        Minimum number of attempts of a process before its retry rate is
+        assessed.
+    """
+
+    def __init__(self, min_attempts=5):
+
+        self.min_attempts = min_attempts
+        """
+        int: Minimum number of attempts of a process before its retry rate
+        is assessed.
+        """
+
+        self.processes = OrderedDict()
+        """
+        dict: Maps the processes to their :py:class:`WasteRecord`.
+        """
+
+        self.tags = {}
+        """
+        dict: Maps the (process, tag) tuples with failed attempts to their
+        :py:class:`WasteRecord`.
+        """
+
+    def get_state(self):
+        """Returns the records of the processes and tags, to be restored
+        with :func:`restore`.
+
+        Returns
+        -------
+        dict
+        """
+
+        return {
+            "processes": [[p, r.get_state()]
+                          for p, r in self.processes.items()],
+            "tags": [[p, t, r.get_state()]
+                     for (p, t), r in self.tags.items()]
+        }
+
+    def restore(self, state):
+        """Restores the state returned by :func:`get_state`.
+
+        Parameters
+        ----------
+        state : dict
+        """
+
+        self.processes = OrderedDict()
+        self.tags = {}
+
+        for process, record in state["processes"]:
+            self.processes[process] = WasteRecord()
+            self.processes[process].restore(record)
+
+        for process, tag, record in state["tags"]:
+            self.tags[(process, tag)] = WasteRecord()
+            self.tags[(process, tag)].restore(record)
+
+    def add(self, process, entry):
+        """Adds a trace entry. Entries of cached tasks are ignored.
+
+        Parameters
+        ----------
+        process : str
+            Name of the process.
+        entry : TraceEntry
+            Trace entry of the task.
+        """
+
+        if entry.status == "CACHED":
+            return
+
+        if process not in self.processes:
+            self.processes[process] = WasteRecord()
+        if entry.status == "FAILED" and (process, entry.tag) not in self.tags:
+            self.tags[(process, entry.tag)] = WasteRecord()
+
+        records = [self.processes[process]]
+        if (process, entry.tag) in self.tags:
+            records.append(self.tags[(process, entry.tag)])
+
+        elapsed = entry.realtime if entry.realtime is not None \
+            else entry.duration or 0
+        hours = elapsed / 3600
+        memory = entry.memory if entry.memory is not None else entry.rss
+
+        for record in records:
+            record.attempts += 1
+            if entry.status != "FAILED":
+                continue
+            record.failures += 1
+            record.cpu_hours += (entry.cpus or 1) * hours
+            record.wall_seconds += elapsed
+            record.mem_hours += (memory or 0) / 1024 * hours
+
+    def retry_rate(self, process):
+        """Returns the fraction of the attempts of a process that failed,
+        or None when it has no attempts.
+        """
+
+        record = self.processes.get(process)
+        if not record or not record.attempts:
+            return None
+
+        return record.failures / record.attempts
+
+    def alarms(self, alarm_rate):
+        """Returns the processes whose retry rate is above ``alarm_rate``.
+
+        Parameters
+        ----------
+        alarm_rate : float
+            Retry rate above which a process raises an alarm.
+
+        Returns
+        -------
+        list
+        """
+
+        return [p for p, r in self.processes.items()
+                if r.attempts >= self.min_attempts and
+                r.failures / r.attempts > alarm_rate]
+
+    def summary(self, alarm_rate, top=10):
+        """Returns the compute spent on failed attempts.
+
+        Parameters
+        ----------
+        alarm_rate : float
+            Retry rate above which a process raises an alarm.
+        top : int
+            Number of processes and tags with the most wasted cpu hours
+            that are reported.
+
+        Returns
+        -------
+        dict
+            Dictionary with the "total" waste, the waste and "retryRate" of
+            each process ("processes"), the "topProcesses" and "topTags"
+            with the most wasted cpu hours, and the processes with a retry
+            rate "alarm".
+        """
+
+        total = WasteRecord()
+        processes = OrderedDict()
+
+        for process, record in self.processes.items():
+            for attr in WasteRecord.__slots__:
+                setattr(total, attr,
+                        getattr(total, attr) + getattr(record, attr))
+            processes[process] = dict(
+                record.to_dict(),
+                retryRate=round(record.failures / record.attempts, 3))
+
+        wasters = heapq.nlargest(
+            top, (x for x in self.processes.items() if x[1].failures),
+            key=lambda x: x[1].cpu_hours)
+        tags = heapq.nlargest(top, self.tags.items(),
+                              key=lambda x: x[1].cpu_hours)
+
+        return {
+            "total": total.to_dict(),
+            "processes": processes,
+            "topProcesses": [p for p, _ in wasters],
+            "topTags": [dict(r.to_dict(), process=p, tag=t)
+                        for (p, t), r in tags],
+            "alarms": self.alarms(alarm_rate)
+        }
@@ -0,0 +1,75 @@
+import os
+import pytest
+
+import flowcraft.generator.inspect as ins
+
+LOG_HEADER = [
+    "Apr-19 19:07:26.493 [main] DEBUG nextflow.cli.Launcher - $> nextflow "
+    "run teste.nf -profile docker\n",
+    "Apr-19 19:07:26.620 [main] INFO  nextflow.cli.CmdRun - Launching "
+    "`teste.nf` [nasty_kare] - revision: 6e1a4fd\n",
+    "Apr-19 19:07:32.660 [main] DEBUG nextflow.processor.TaskProcessor - "
+    "Creating operator > integrity_coverage_1_1 -- maxForks: 4\n",
+    "Apr-19 19:07:32.661 [main] DEBUG nextflow.processor.TaskProcessor - "
+    "Creating operator > fastqc_1_2 -- maxForks: 4\n"
+]
+
+TRACE_HEADER = "task_id\thash\tprocess\ttag\tstatus\texit\tcpus\tmemory\t" \
+               "realtime\t%cpu\trss\trchar\twchar\tstart\tqueue\tduration\n"
+
+
+def submit_line(time, hash_str, process, tag):
+
+    return "Apr-19 {} [Task submitter] INFO  nextflow.Session - [{}] " \
+           "Submitted process > {} ({})\n".format(time, hash_str, process,
+                                                  tag)
+
+
+def trace_line(task_id, hash_str, process, tag, status="COMPLETED",
+               rss="200 MB", start="-", queue="-", duration="-", cpus="2"):
+
+    return "\t".join([str(task_id), hash_str, process, tag, status, "0",
+                      cpus, "1 GB", "1m30s", "150.0%", rss, "1 GB",
+                      "500 MB", start, queue, duration]) + "\n"
+
+
+def entry(tag="SampleA", status="COMPLETED", **fields):
+    """Returns a :py:class:`TraceEntry` with the provided attributes. The
+    other attributes are None. The ``start`` is provided as a timestamp of
+    the trace file, and converted as in the trace parser.
+    """
+
+    if "start" in fields:
+        fields["start"] = ins.parse_trace_time(fields["start"])
+
+    return ins.TraceEntry(tag=tag, status=status, **fields)
+
+
+@pytest.fixture
+def project(tmpdir, monkeypatch):
+
+    monkeypatch.chdir(tmpdir)
+
+    with open(".nextflow.log", "w") as fh:
+        fh.writelines(LOG_HEADER)
+        fh.write(submit_line("19:07:33.100", "ab/123456",
+                             "integrity_coverage_1_1", "SampleA"))
+        fh.write(submit_line("19:07:33.200", "cd/789012",
+                             "integrity_coverage_1_1", "SampleB"))
+
+    with open("pipeline_stats.txt", "w") as fh:
+        fh.write(TRACE_HEADER)
+
+    for h in ["ab/123456abcdef", "cd/789012abcdef"]:
+        os.makedirs(os.path.join("work", h))
+
+    return tmpdir
+
+
+@pytest.fixture
+def inspector(project):
+
+    nf_inspect = ins.NextflowInspector("pipeline_stats.txt", 0.01)
+    nf_inspect.update_inspection()
+
+    return nf_inspect
@@ -0,0 +1,332 @@
+import gzip
+import json
+import zlib
+import threading
+import time
+import http.server
+import pytest
+
+import flowcraft.generator.broadcast as bc
+
+
+def get_status(tags=None):
+
+    tags = tags if tags is not None else {"SampleA": {"start": "10:00"}}
+
+    return {
+        "generalOverview": [{"header": "Pipeline name", "value": "teste"}],
+        "generalDetails": [],
+        "tableMappings": {"Process": "process"},
+        "tableData": [{"process": "A", "running": list(tags)},
+                      {"process": "B", "running": []}],
+        "processInfo": {"A": {"barrier": "R"}, "B": {"barrier": "W"}},
+        "processTags": {"A": tags, "B": {}},
+        "runStatus": {"value": "running"},
+        "timeStart": "10:00",
+        "timeStop": "-",
+        "processes": ["A", "B"]
+    }
+
+
+@pytest.fixture
+def encoder():
+
+    return bc.StatusDeltaEncoder(full_interval=3)
+
+
+def test_first_payload_is_full(encoder):
+
+    payload = encoder.encode(get_status())
+
+    assert payload["version"] == 1
+    assert "status_json" in payload
+
+
+def test_delta_only_changed(encoder):
+
+    receiver = bc.StatusDeltaReceiver()
+
+    receiver.apply(encoder.encode(get_status()))
+    encoder.ack(1)
+
+    status = get_status({"SampleA": {"start": "10:00"},
+                         "SampleB": {"start": "10:05"}})
+    status["processInfo"]["B"]["barrier"] = "C"
+    payload = encoder.encode(status)
+
+    delta = payload["status_delta"]
+    assert payload["baseVersion"] == 1
+    assert list(delta["processTags"]) == ["A"]
+    assert list(delta["processTags"]["A"]) == ["SampleB"]
+    assert list(delta["tableData"]) == ["A"]
+    assert list(delta["processInfo"]) == ["B"]
+    assert delta["sections"] == {}
+
+    assert receiver.apply(payload)
+    assert receiver.status_json == status
+
+
+def test_removed_tags(encoder):
+
+    receiver = bc.StatusDeltaReceiver()
+
+    receiver.apply(encoder.encode(get_status()))
+    encoder.ack(1)
+
+    status = get_status({})
+    payload = encoder.encode(status)
+
+    assert payload["status_delta"]["processTags"] == {"A": {"SampleA": None}}
+    assert receiver.apply(payload)
+    assert receiver.status_json == status
+
+
+def test_periodic_full_payload(encoder):
+
+    encoder.encode(get_status())
+    encoder.ack(1)
+
+    for v in range(2, 5):
+        assert "status_delta" in encoder.encode(get_status())
+        encoder.ack(v)
+
+    assert "status_json" in encoder.encode(get_status())
+
+
+def test_pending_versions_bounded(encoder):
+
+    encoder.encode(get_status())
+    encoder.ack(1)
+
+    # The receiver never acknowledges again
+    for _ in range(20):
+        encoder.encode(get_status())
+
+    assert len(encoder.pending) <= encoder.full_interval + 1
+
+    # Rejected versions are forgotten
+    encoder.discard(encoder.version)
+    assert encoder.version not in encoder.pending
+    encoder.ack(encoder.version)
+    assert encoder.acked_version == 1
+
+
+def test_receiver_rejects_stale_base(encoder):
+
+    receiver = bc.StatusDeltaReceiver()
+
+    receiver.apply(encoder.encode(get_status()))
+    encoder.ack(1)
+
+    # The receiver applies the second payload but the acknowledgement is lost
+    assert receiver.apply(encoder.encode(get_status({})))
+
+    payload = encoder.encode(get_status({"SampleC": {}}))
+    assert payload["baseVersion"] == 1
+    assert not receiver.apply(payload)
+
+    encoder.reset()
+    payload = encoder.encode(get_status({"SampleC": {}}))
+    assert "status_json" in payload
+    assert receiver.apply(payload)
+    assert receiver.status_json == get_status({"SampleC": {}})
+
+
+def test_removed_process_full_payload(encoder):
+
+    encoder.encode(get_status())
+    encoder.ack(1)
+
+    status = get_status()
+    status["tableData"].pop()
+    status["processes"].pop()
+    del status["processInfo"]["B"]
+    del status["processTags"]["B"]
+
+    assert "status_json" in encoder.encode(status)
+
+
+class StatusHandler(http.server.BaseHTTPRequestHandler):
+    """Records the requests and answers with the codes queued in the
+    server."""
+
+    def _handle(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        self.server.requests.append((self.command,
+                                     json.loads(body.decode("utf8"))))
+        self.server.encodings.append(encoding)
+        code = self.server.codes.pop(0) if self.server.codes else \
+            {"POST": 201, "PUT": 201, "DELETE": 202}[self.command]
+        self.send_response(code)
+        if self.server.accept_encoding:
+            self.send_header("Accept-Encoding", self.server.accept_encoding)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+
+    srv = http.server.HTTPServer(("127.0.0.1", 0), StatusHandler)
+    srv.requests = []
+    srv.codes = []
+    srv.encodings = []
+    srv.accept_encoding = None
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    srv.address = "http://127.0.0.1:{}/".format(srv.server_port)
+
+    yield srv
+
+    srv.shutdown()
+    srv.server_close()
+
+
+def get_sender(server, **kwargs):
+
+    return bc.BroadcastSender(server.address, "run", {"dag_json": {}},
+                              min_backoff=0.01, max_backoff=0.05, **kwargs)
+
+
+def test_sender_lifecycle(server):
+
+    sender = get_sender(server)
+    sender.start()
+    sender.submit(get_status())
+    sender.close(5)
+
+    assert [x[0] for x in server.requests] == ["POST", "PUT", "DELETE"]
+    assert server.requests[0][1] == {"run_id": "run", "dag_json": {}}
+    assert server.requests[1][1]["status_json"] == get_status()
+    assert not sender.is_alive()
+
+
+def test_sender_coalesces_status(server):
+
+    sender = get_sender(server)
+
+    # The status queued before the sender starts are coalesced
+    for i in range(5):
+        sender.submit(get_status({"Sample{}".format(i): {}}))
+    sender.start()
+    sender.close(5)
+
+    puts = [x[1] for x in server.requests if x[0] == "PUT"]
+    assert len(puts) == 1
+    assert puts[0]["status_json"] == get_status({"Sample4": {}})
+    assert sender.dropped == 4
+
+
+def wait_for(func, timeout=5):
+
+    deadline = time.time() + timeout
+    while not func() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_sender_retries(server):
+
+    server.codes = [503, 503, 201, 500]
+
+    sender = get_sender(server)
+    sender.start()
+    sender.submit(get_status())
+    wait_for(lambda: sender.sent)
+    sender.close(5)
+
+    assert [x[0] for x in server.requests] == \
+        ["POST", "POST", "POST", "PUT", "PUT", "DELETE"]
+    assert sender.sent == 1
+
+
+def test_sender_refused(server):
+
+    server.codes = [400]
+
+    sender = get_sender(server)
+    sender.start()
+    sender.join(5)
+
+    assert sender.error
+    assert [x[0] for x in server.requests] == ["POST"]
+
+
+def test_sender_delta_resync(server):
+
+    server.codes = [201, 201, 409]
+
+    sender = get_sender(server, encoder=bc.StatusDeltaEncoder())
+    sender.start()
+    sender.submit(get_status())
+    wait_for(lambda: sender.sent)
+    sender.submit(get_status({}))
+    sender.close(5)
+
+    puts = [x[1] for x in server.requests if x[0] == "PUT"]
+    assert ["status_delta" in x for x in puts] == [False, True, False]
+    assert puts[-1]["status_json"] == get_status({})
+
+
+def test_sender_unreachable():
+
+    sender = bc.BroadcastSender("http://127.0.0.1:1/", "run", {},
+                                min_backoff=0.01, max_backoff=0.02)
+    sender.start()
+    sender.submit(get_status())
+    sender.close(5)
+
+    assert not sender.is_alive()
+    assert not sender.registered
+
+
+@pytest.mark.parametrize("accepted,encoding", [
+    ("gzip", "gzip"),
+    ("identity, deflate;q=0.5", "deflate"),
+    ("br", None)
+])
+def test_sender_compression(server, accepted, encoding):
+
+    server.accept_encoding = accepted
+    tags = dict(("Sample{}".format(i), {"start": "10:00"})
+                for i in range(100))
+
+    sender = get_sender(server)
+    sender.start()
+    sender.submit(get_status(tags))
+    sender.close(5)
+
+    # The first request is sent before the server advertises its encodings
+    assert server.encodings == [None, encoding, encoding]
+    assert server.requests[1][1]["status_json"] == get_status(tags)
+    if encoding:
+        assert sender.compression_ratio > 2
+    else:
+        assert sender.compression_ratio == 1
+
+
+def test_sender_unsupported_encoding(server):
+
+    server.accept_encoding = "gzip"
+    server.codes = [201, 415]
+
+    sender = get_sender(server)
+    sender.start()
+    wait_for(lambda: sender.content_encoding)
+    server.accept_encoding = "identity"
+    sender.submit(get_status())
+    sender.close(5)
+
+    assert [x[0] for x in server.requests] == ["POST", "PUT", "PUT",
+                                               "DELETE"]
+    assert server.encodings == [None, "gzip", None, None]
+    assert sender.sent == 1
@@ -0,0 +1,148 @@
+import os
+
+from time import sleep
+
+import flowcraft.generator.inspect as ins
+import flowcraft.generator.metrics as mt
+import flowcraft.generator.disk_usage as du
+
+from flowcraft.tests.conftest import trace_line
+
+
+def write_file(path, size):
+
+    with open(path, "wb") as fh:
+        fh.write(b"0" * size)
+
+
+def test_dir_size(tmpdir):
+
+    write_file(str(tmpdir.join("a.txt")), 100)
+    tmpdir.mkdir("sub")
+    write_file(str(tmpdir.join("sub", "b.txt")), 50)
+    # Staged inputs are symbolic links and are not counted
+    os.symlink(str(tmpdir.join("a.txt")), str(tmpdir.join("sub", "link")))
+
+    assert du.dir_size(str(tmpdir)) == 150
+    assert du.dir_size(str(tmpdir.join("missing"))) == 0
+
+
+def test_format_size():
+
+    assert du.format_size(None) == "-"
+    assert du.format_size(512) == "512B"
+    assert du.format_size(1536) == "1.5KB"
+    assert du.format_size(3 * 1024 ** 3) == "3.0GB"
+
+
+def test_disk_usage_tracker(tmpdir):
+
+    for h, size in [("ab/123456abcdef", 100), ("cd/789012abcdef", 300)]:
+        os.makedirs(str(tmpdir.join("work", h)))
+        write_file(str(tmpdir.join("work", h, "out.txt")), size)
+
+    tracker = du.DiskUsageTracker(
+        ins.WorkdirResolver(str(tmpdir.join("work"))))
+
+    tracker.add("trim", "A", "ab/123456", 1000)
+    tracker.add("spades", "A", "cd/789012", 1000 + 3600)
+    # Tasks are only queued once
+    tracker.add("spades", "A", "cd/789012")
+
+    assert tracker.summary()["pending"] == 2
+
+    tracker.drain()
+    tracker.add("trim", "B", "ef/000000")
+    tracker.drain()
+
+    summary = tracker.summary()
+
+    assert summary["total"] == 400
+    assert summary["tasks"] == 3
+    assert summary["pending"] == 0
+    # The growth only depends on the completion of the tasks
+    assert summary["growth"] == 300
+    assert list(summary["processes"].items()) == [("spades", 300),
+                                                  ("trim", 100)]
+    assert summary["samples"] == {"A": 400, "B": 0}
+
+
+def test_disk_usage_tracker_listings(tmpdir, monkeypatch):
+
+    resolver = ins.WorkdirResolver(str(tmpdir.join("work")))
+    tracker = du.DiskUsageTracker(resolver)
+
+    listings = []
+    list_bucket = resolver._list_bucket
+    monkeypatch.setattr(resolver, "_list_bucket",
+                        lambda x: listings.append(x) or list_bucket(x))
+
+    for h in ["111111", "222222"]:
+        os.makedirs(str(tmpdir.join("work", "ab", h + "abcdef")))
+        tracker.add("trim", "A", "ab/" + h)
+    tracker.drain()
+
+    # A single listing serves all the tasks of the bucket
+    assert listings == ["ab"]
+
+    # The directory of a new task is not in the previous listing, and
+    # only its bucket is listed again
+    os.makedirs(str(tmpdir.join("work", "ab", "333333abcdef")))
+    tracker.add("trim", "B", "ab/333333")
+    tracker.add("trim", "B", "cd/444444")
+    tracker.add("trim", "B", "ab/555555")
+    tracker.drain()
+
+    assert listings == ["ab", "ab", "cd"]
+    assert tracker.tasks == 5
+
+
+def test_disk_usage_tracker_thread(tmpdir):
+
+    os.makedirs(str(tmpdir.join("work", "ab", "123456abcdef")))
+    write_file(str(tmpdir.join("work", "ab", "123456abcdef", "out")), 10)
+
+    tracker = du.DiskUsageTracker(
+        ins.WorkdirResolver(str(tmpdir.join("work"))))
+    tracker.start(rate=100)
+    tracker.add("trim", "A", "ab/123456")
+
+    for _ in range(100):
+        if tracker.tasks:
+            break
+        sleep(0.05)
+    tracker.close()
+
+    assert tracker.summary()["total"] == 10
+    assert tracker.thread is None
+    assert tracker.summary()["growth"] is None
+
+
+def test_inspector_disk_usage(inspector):
+
+    write_file(os.path.join("work", "ab", "123456abcdef", "out.txt"), 2048)
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA"))
+
+    inspector.update_inspection()
+    inspector.disk_usage.drain()
+    inspector.save_checkpoint()
+
+    disk_usage = inspector._get_status_json()["diskUsage"]
+    data = dict((x["process"], x) for x in
+                inspector._prepare_table_data()[1])
+
+    assert disk_usage["processes"] == {"integrity_coverage_1_1": 2048}
+    assert data["integrity_coverage_1_1"]["workDir"] == "2.0KB"
+    assert inspector._overview_snapshot().disk_usage["total"] == 2048
+    assert 'flowcraft_process_workdir_bytes{pipeline="nasty_kare",' \
+           'process="integrity_coverage_1_1"} 2048' in \
+           mt.format_metrics(inspector)
+
+    # The sizes are restored from the checkpoint
+    restored = ins.NextflowInspector("pipeline_stats.txt", 0.01)
+
+    assert restored.disk_usage.summary()["processes"] == \
+        {"integrity_coverage_1_1": 2048}
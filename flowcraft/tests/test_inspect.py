@@ -0,0 +1,700 @@
+import os
+import gzip
+import json
+import select
+import signal
+import asyncio
+import pytest
+
+from datetime import datetime
+
+import flowcraft.generator.inspect as ins
+
+from flowcraft.tests.conftest import LOG_HEADER, TRACE_HEADER, submit_line, \
+    trace_line
+
+
+def test_file_tailer_partial_line(tmpdir):
+
+    p = tmpdir.join("file.txt")
+    p.write("line1\nline2\nlin")
+
+    tail = ins.FileTailer(str(p))
+
+    assert tail.changed()
+    assert list(tail.read_lines()) == ["line1\n", "line2\n"]
+
+    p.write("e3\n", mode="a")
+
+    assert tail.changed()
+    assert list(tail.read_lines()) == ["line3\n"]
+    assert not tail.changed()
+
+
+def test_file_tailer_truncation(tmpdir):
+
+    p = tmpdir.join("file.txt")
+    p.write("line1\nline2\n")
+
+    tail = ins.FileTailer(str(p))
+    tail.changed()
+    list(tail.read_lines())
+
+    p.write("new\n")
+
+    assert tail.changed()
+    assert tail.reset
+    assert list(tail.read_lines()) == ["new\n"]
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 65536])
+def test_read_tail(tmpdir, block_size):
+
+    p = tmpdir.join("file.txt")
+    p.write("".join("line{}\n".format(i) for i in range(100)) + "last")
+
+    assert ins.read_tail(str(p), 3, block_size=block_size) == \
+        ["line98\n", "line99\n", "last"]
+    assert len(ins.read_tail(str(p), block_size=block_size)) == 101
+    assert ins.read_tail(str(p), 0, block_size=block_size) == []
+
+
+def test_read_tail_max_bytes(tmpdir):
+
+    p = tmpdir.join("file.txt")
+    p.write("aaaa\nbbbb\ncccc\n")
+
+    # The line cut by the byte limit is discarded
+    assert ins.read_tail(str(p), max_bytes=8) == ["cccc\n"]
+    assert ins.read_tail(str(p), max_bytes=10) == ["bbbb\n", "cccc\n"]
+    assert ins.read_tail(str(p), 1, max_bytes=100) == ["cccc\n"]
+
+    p.write("")
+    assert ins.read_tail(str(p), 10) == []
+
+
+def test_inspector_processes(inspector):
+
+    assert list(inspector.processes) == ["integrity_coverage_1_1",
+                                         "fastqc_1_2"]
+    assert inspector.pipeline_tag == "nasty_kare"
+    assert inspector.run_status == "running"
+
+
+def test_trace_parser_incremental(inspector):
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA"))
+
+    inspector.update_inspection()
+    p = inspector.processes["integrity_coverage_1_1"]
+
+    assert p["finished"] == {"SampleA"}
+    assert p["submitted"] == {"SampleB"}
+
+    offset = inspector.trace_tail.offset
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(2, "cd/789012", "integrity_coverage_1_1",
+                            "SampleB"))
+
+    inspector.update_inspection()
+
+    assert inspector.trace_tail.offset > offset
+    assert p["finished"] == {"SampleA", "SampleB"}
+    assert inspector.process_stats["integrity_coverage_1_1"][
+        "completed"] == "2"
+
+
+def test_trace_parser_replaced_file(inspector):
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA"))
+
+    inspector.update_inspection()
+
+    # Nextflow rolls the previous trace file when resuming
+    os.rename("pipeline_stats.txt", "pipeline_stats.txt.1")
+    with open("pipeline_stats.txt", "w") as fh:
+        fh.write(TRACE_HEADER)
+        fh.write(trace_line(2, "cd/789012", "integrity_coverage_1_1",
+                            "SampleB"))
+
+    inspector.update_inspection()
+
+    assert inspector.processes["integrity_coverage_1_1"]["finished"] == \
+        {"SampleA", "SampleB"}
+
+
+def test_log_parser_submissions(inspector):
+
+    p = inspector.processes["integrity_coverage_1_1"]
+
+    assert p["submitted"] == {"SampleA", "SampleB"}
+    assert p["barrier"] == "R"
+    assert inspector.process_tags["integrity_coverage_1_1"]["SampleA"][
+        "workdir"] is None
+
+    inspector._expand_tag_workdirs()
+
+    assert inspector.process_tags["integrity_coverage_1_1"]["SampleA"][
+        "workdir"].endswith("123456abcdef")
+
+
+def test_log_parser_barrier_and_abort(inspector):
+
+    with open(".nextflow.log", "a") as fh:
+        fh.write("Apr-19 19:08:00.000 [main] DEBUG nextflow.Session - <<< "
+                 "barrier arrive (process: integrity_coverage_1_1)\n")
+        fh.write("Apr-19 19:09:00.000 [main] ERROR nextflow.Session - "
+                 "Session aborted -- Cause: Out of memory\n")
+        fh.write("Apr-19 19:09:01.000 [main] DEBUG nextflow.Session - <<< "
+                 "barrier arrive (process: fastqc_1_2)\n")
+
+    inspector.update_inspection()
+
+    assert inspector.processes["integrity_coverage_1_1"]["barrier"] == "C"
+    assert inspector.processes["fastqc_1_2"]["barrier"] == "W"
+    assert inspector.run_status == "aborted"
+    assert inspector.abort_cause == "Out of memory"
+    assert inspector.time_stop == "Apr-19 19:09:00.000"
+
+
+def test_log_parser_new_execution(inspector):
+
+    with open(".nextflow.log", "a") as fh:
+        fh.write("Apr-19 19:09:00.000 [main] DEBUG nextflow.Session - "
+                 "Execution complete -- Goodbye\n")
+
+    inspector.update_inspection()
+    assert inspector.run_status == "complete"
+
+    # Nextflow rolls the log of the previous execution
+    os.rename(".nextflow.log", ".nextflow.log.1")
+    with open(".nextflow.log", "w") as fh:
+        fh.writelines(LOG_HEADER)
+
+    inspector.update_inspection()
+
+    assert inspector.run_status == "running"
+    assert inspector.time_stop is None
+    assert inspector.processes["integrity_coverage_1_1"]["submitted"] == \
+        set()
+
+
+def test_trace_parser_retry(inspector):
+
+    os.makedirs(os.path.join("work", "ef", "345678abcdef"))
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA", "FAILED"))
+
+    inspector.update_inspection()
+    p = inspector.processes["integrity_coverage_1_1"]
+
+    assert p["failed"] == {"SampleA"}
+    assert "log" in inspector.process_tags["integrity_coverage_1_1"][
+        "SampleA"]
+
+    with open(".nextflow.log", "a") as fh:
+        fh.write(submit_line("19:08:33.100", "ef/345678",
+                             "integrity_coverage_1_1",
+                             "SampleA").replace("Submitted",
+                                                "Re-submitted"))
+
+    inspector.update_inspection()
+
+    assert p["retry"] == {"SampleA"}
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(2, "ef/345678", "integrity_coverage_1_1",
+                            "SampleA"))
+
+    inspector.update_inspection()
+
+    assert p["retry"] == set()
+    assert p["failed"] == set()
+    assert p["finished"] == {"SampleA"}
+    assert list(inspector.trace_info["integrity_coverage_1_1"]) == \
+        ["ef/345678"]
+    assert inspector.trace_tag_index[("integrity_coverage_1_1",
+                                      "SampleA")] == ["ef/345678"]
+
+
+def test_workdir_resolver(tmpdir):
+
+    tmpdir.mkdir("ab").mkdir("123456abcdef")
+    resolver = ins.WorkdirResolver(str(tmpdir))
+
+    assert resolver.resolve("ab/123456") == \
+        str(tmpdir.join("ab", "123456abcdef"))
+    assert resolver.resolve("ab/789012") is None
+    assert resolver.resolve("cd/789012") is None
+
+    tmpdir.join("ab").mkdir("789012abcdef")
+
+    # Buckets are only listed again after being cleared
+    assert resolver.resolve("ab/789012") is None
+    resolver.clear_buckets()
+    assert resolver.resolve("ab/789012") == \
+        str(tmpdir.join("ab", "789012abcdef"))
+
+
+def test_process_stats(inspector):
+
+    os.makedirs(os.path.join("work", "ef", "345678abcdef"))
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA", "FAILED", rss="3 GB"))
+        fh.write(trace_line(2, "cd/789012", "integrity_coverage_1_1",
+                            "SampleB"))
+
+    inspector.update_inspection()
+    stats = inspector.process_stats["integrity_coverage_1_1"]
+
+    assert stats["completed"] == "1"
+    assert stats["realtime"] == "00:01:30"
+    assert stats["maxmem"] == "3GB"
+    assert stats["avgread"] == "1024MB"
+    assert stats["avgwrite"] == "500MB"
+    assert list(stats["mem_warnings"]) == ["SampleA"]
+
+    with open(".nextflow.log", "a") as fh:
+        fh.write(submit_line("19:08:33.100", "ef/345678",
+                             "integrity_coverage_1_1",
+                             "SampleA").replace("Submitted",
+                                                "Re-submitted"))
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(3, "ef/345678", "integrity_coverage_1_1",
+                            "SampleA"))
+
+    inspector.update_inspection()
+    stats = inspector.process_stats["integrity_coverage_1_1"]
+
+    # The failed attempt is no longer accounted for
+    assert stats["completed"] == "2"
+    assert stats["maxmem"] == "200MB"
+    assert stats["mem_warnings"] == {}
+
+
+def test_trace_entry_conversion(inspector):
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA", start="2018-04-19 19:09:03.100"))
+
+    inspector.update_inspection()
+    entry = inspector.trace_info["integrity_coverage_1_1"]["ab/123456"]
+
+    assert entry.start == datetime(2018, 4, 19, 19, 9, 3,
+                                   100000).timestamp()
+    assert entry.realtime == 90
+    assert entry.cpus == 2
+    assert entry.pcpu == 150.0
+    assert entry.rss == 200
+    assert entry.memory == 1024
+    assert not hasattr(entry, "__dict__")
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_file_watcher(tmpdir, monkeypatch, inotify):
+
+    if not inotify:
+        monkeypatch.setattr(ins, "_inotify_init1", None)
+
+    p = tmpdir.join("file.txt")
+    p.write("line1\n")
+    tmpdir.join("other.txt").write("")
+
+    watcher = ins.FileWatcher([str(p)], min_interval=0.01)
+
+    assert (watcher.fd is not None) == \
+        (inotify and ins._inotify_init1 is not None)
+
+    # Changes in other files of the directory are ignored
+    tmpdir.join("other.txt").write("a")
+    assert not watcher.wait(0.1)
+
+    p.write("line2\n", mode="a")
+    assert watcher.wait(1)
+    assert not watcher.wait(0.05)
+
+    watcher.close()
+
+
+def test_file_watcher_remote_writes(tmpdir):
+
+    p = tmpdir.join("file.txt")
+    p.write("line1\n")
+
+    watcher = ins.FileWatcher([str(p)], min_interval=0.01, max_interval=0.05)
+
+    # Writes from other hosts of a network file system are not reported by
+    # inotify
+    read_events = watcher._read_events
+    watcher._read_events = lambda: read_events() and False
+
+    p.write("line2\n", mode="a")
+    assert watcher.wait(1)
+    assert not watcher.wait(0.1)
+
+    p.write("line3\n", mode="a")
+    asyncio.get_event_loop().run_until_complete(
+        asyncio.wait_for(watcher.wait_async(), 1))
+
+    watcher.close()
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_file_watcher_async(tmpdir, monkeypatch, inotify):
+
+    if not inotify:
+        monkeypatch.setattr(ins, "_inotify_init1", None)
+
+    p = tmpdir.join("file.txt")
+    p.write("line1\n")
+
+    watcher = ins.FileWatcher([str(p)], min_interval=0.01)
+
+    async def main():
+        waiter = asyncio.ensure_future(watcher.wait_async())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        p.write("line2\n", mode="a")
+        assert await asyncio.wait_for(waiter, 1)
+        assert not await watcher.wait_async(0.05)
+
+    asyncio.get_event_loop().run_until_complete(main())
+    watcher.close()
+
+
+def test_parser_thread(inspector):
+
+    # Only the changes of the files publish a snapshot
+    inspector.clock_rate = 60
+    parser = ins.ParserThread(inspector, inspector._overview_snapshot)
+    parser.start()
+
+    assert select.select([parser.read_fd], [], [], 5)[0]
+    snapshot = parser.consume()
+
+    assert snapshot.run_status == "running"
+    assert snapshot.totals["submitted"] == 2
+    assert snapshot.rows[0]["stats"] is None
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA"))
+
+    assert select.select([parser.read_fd], [], [], 5)[0]
+    new_snapshot = parser.consume()
+
+    # Published snapshots are not modified by later updates
+    assert snapshot.totals["finished"] == 0
+    assert new_snapshot.totals["finished"] == 1
+    assert new_snapshot.rows[0]["stats"]["completed"] == "1"
+
+    parser.stop()
+    assert not parser.is_alive()
+
+
+def test_parser_thread_clock(inspector):
+
+    inspector.clock_rate = 0.05
+    parser = ins.ParserThread(inspector, inspector._overview_snapshot)
+    parser.start()
+
+    assert select.select([parser.read_fd], [], [], 5)[0]
+    snapshot = parser.consume()
+
+    # A new snapshot is published although the files did not change
+    assert select.select([parser.read_fd], [], [], 5)[0]
+    assert parser.consume() is not snapshot
+
+    parser.stop()
+
+
+def test_publish_due(inspector, monkeypatch):
+
+    now = [1000]
+    monkeypatch.setattr(ins, "monotonic", lambda: now[0])
+
+    inspector.send = True
+    assert inspector._publish_due()
+    assert not inspector.send
+    assert not inspector._publish_due()
+
+    # The status is published again after publish_rate seconds
+    now[0] += inspector.publish_rate
+    assert inspector._publish_due()
+
+
+class FakePad:
+
+    def __init__(self, width=2000):
+        self.calls = []
+        self.width = width
+
+    def getmaxyx(self):
+        return 100, self.width
+
+    def move(self, y, x):
+        self.calls.append(("move", y))
+
+    def clrtoeol(self):
+        pass
+
+    def addstr(self, y, x, text, attr):
+        self.calls.append(("addstr", y, text))
+
+
+def test_draw_frame_only_changed_lines(inspector):
+
+    inspector.pad = FakePad()
+    lines = [((0, "header", 0),), ((0, "row1", 0),), ((0, "row2", 0),)]
+
+    assert inspector._draw_frame(lines)
+    assert len([x for x in inspector.pad.calls if x[0] == "addstr"]) == 3
+
+    # Nothing is drawn when the frame did not change
+    inspector.pad.calls = []
+    assert not inspector._draw_frame(list(lines))
+    assert inspector.pad.calls == []
+
+    lines = [((0, "header", 0),), ((0, "row1 changed", 0),)]
+    assert inspector._draw_frame(lines)
+    assert ("addstr", 1, "row1 changed") in inspector.pad.calls
+    assert ("addstr", 0, "header") not in inspector.pad.calls
+    # The line of row2 is cleared
+    assert ("move", 2) in inspector.pad.calls
+    assert sorted(inspector.frame) == [0, 1]
+
+
+def test_draw_frame_clips_lines():
+
+    pad = FakePad(width=10)
+    ins.draw_frame(pad, {}, [((0, "process", 0), (8, "Stragglers", 0),
+                              (12, "hidden", 0))])
+
+    # The last cell of the pad is not written
+    assert [x[2] for x in pad.calls if x[0] == "addstr"] == \
+        ["process", "S"]
+
+
+def test_failed_log_lazy_tail(inspector):
+
+    log = os.path.join("work", "ab", "123456abcdef", ".command.log")
+    with open(log, "w") as fh:
+        fh.writelines("output {}\n".format(i) for i in range(1000))
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA", "FAILED"))
+
+    inspector.update_inspection()
+
+    # The log is not read until the status is built
+    assert inspector.failed_log_tails == {}
+
+    status = inspector._get_status_json()
+    lines = status["processTags"]["integrity_coverage_1_1"]["SampleA"]["log"]
+
+    assert len(lines) == 300
+    assert lines[-1] == "output 999\n"
+    assert inspector.process_tags["integrity_coverage_1_1"]["SampleA"][
+        "log"] is None
+
+
+def test_checkpoint_resume(inspector):
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA"))
+        fh.write(trace_line(2, "cd/789012", "integrity_coverage_1_1",
+                            "SampleB", "FAILED", rss="900 MB"))
+
+    inspector.update_inspection()
+    inspector.save_checkpoint()
+
+    # The checkpoint only contains plain JSON data, without the trace
+    # entries and tag details of the finished tags
+    with gzip.open(".pipeline_stats.txt.checkpoint", "rt") as fh:
+        checkpoint = json.load(fh)
+    state = checkpoint["state"]
+    assert state["processes"]["integrity_coverage_1_1"]["finished"] == \
+        ["SampleA"]
+    assert list(state["process_tags"]["integrity_coverage_1_1"]) == \
+        ["SampleB"]
+    assert [x[1] for x in state["trace_info"]] == ["cd/789012"]
+
+    with open(".nextflow.log", "a") as fh:
+        fh.write(submit_line("19:08:33.100", "ef/345678",
+                             "integrity_coverage_1_1",
+                             "SampleB").replace("Submitted",
+                                                "Re-submitted"))
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(3, "ef/345678", "integrity_coverage_1_1",
+                            "SampleB", rss="100 MB"))
+
+    resumed = ins.NextflowInspector("pipeline_stats.txt", 0.01)
+
+    # Only the new trace line is left to parse
+    assert resumed.trace_tail.offset == inspector.trace_tail.offset
+    assert list(resumed.trace_info["integrity_coverage_1_1"]) == \
+        ["cd/789012"]
+    assert resumed.trace_tag_index[("integrity_coverage_1_1", "SampleB")] \
+        == ["cd/789012"]
+    assert resumed.process_tags["integrity_coverage_1_1"] == {
+        "SampleB": inspector.process_tags["integrity_coverage_1_1"][
+            "SampleB"]}
+    assert resumed.processes["integrity_coverage_1_1"]["finished"] == \
+        {"SampleA"}
+
+    resumed.update_inspection()
+
+    assert resumed.processes["integrity_coverage_1_1"]["finished"] == \
+        {"SampleA", "SampleB"}
+    acc = resumed.process_accumulators["integrity_coverage_1_1"]
+    assert acc.count == 2
+    # The maximum rss of the failed attempt is discarded, and the one of
+    # the finished tag is kept
+    assert acc.max_rss == 200
+
+
+def test_checkpoint_replaced_file(inspector):
+
+    inspector.update_inspection()
+    inspector.save_checkpoint()
+
+    # The log of a new execution invalidates the checkpoint
+    os.rename(".nextflow.log", ".nextflow.log.1")
+    with open(".nextflow.log", "w") as fh:
+        fh.writelines(LOG_HEADER)
+
+    resumed = ins.NextflowInspector("pipeline_stats.txt", 0.01)
+
+    assert not resumed.load_checkpoint()
+    assert resumed.process_tags["integrity_coverage_1_1"] == {}
+
+    resumed = ins.NextflowInspector("pipeline_stats.txt", 0.01,
+                                    checkpoint=False)
+    assert resumed.checkpoint_file is None
+
+
+def test_state_change_events(inspector):
+
+    inspector.events = []
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA", "FAILED"))
+        fh.write(trace_line(2, "cd/789012", "integrity_coverage_1_1",
+                            "SampleB"))
+
+    inspector.update_inspection()
+
+    with open(".nextflow.log", "a") as fh:
+        fh.write(submit_line("19:08:33.100", "ef/345678",
+                             "integrity_coverage_1_1",
+                             "SampleA").replace("Submitted",
+                                                "Re-submitted"))
+        fh.write("Apr-19 19:09:00.000 [main] DEBUG nextflow.Session - <<< "
+                 "barrier arrive (process: integrity_coverage_1_1)\n")
+        fh.write("Apr-19 19:09:01.000 [main] DEBUG nextflow.Session - "
+                 "Execution complete -- Goodbye\n")
+
+    inspector.update_inspection()
+
+    assert [(e["event"], e.get("tag")) for e in inspector.events] == [
+        ("completed", "SampleB"),
+        ("failed", "SampleA"),
+        ("retrying", "SampleA"),
+        ("barrier_closed", None),
+        ("run_status", None)
+    ]
+    assert inspector.events[-1]["status"] == "complete"
+    assert inspector.events[-1]["previous"] == "running"
+
+    # Entries that were already processed do not produce new events
+    inspector.events = []
+    inspector.update_inspection()
+
+    assert inspector.events == []
+
+
+def test_stream_events(inspector, monkeypatch):
+
+    class Watcher:
+
+        def __init__(self, *args):
+            self.calls = 0
+
+        def wait(self):
+            self.calls += 1
+            if self.calls > 1:
+                raise FileNotFoundError
+            with open("pipeline_stats.txt", "a") as fh:
+                fh.write(trace_line(1, "ab/123456",
+                                    "integrity_coverage_1_1", "SampleA"))
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(ins, "FileWatcher", Watcher)
+
+    inspector.stream_events("events.jsonl")
+
+    with open("events.jsonl") as fh:
+        events = [ins.json.loads(x) for x in fh]
+
+    assert events[0]["event"] == "snapshot"
+    assert events[0]["processes"]["integrity_coverage_1_1"]["submitted"] == \
+        ["SampleA", "SampleB"]
+    assert events[1] == {"event": "completed",
+                         "process": "integrity_coverage_1_1",
+                         "tag": "SampleA", "status": "COMPLETED",
+                         "hash": "ab/123456"}
+    assert inspector.events is None
+
+
+def test_inspect_once(inspector, capsys):
+
+    handler = signal.getsignal(signal.SIGINT)
+    nf_inspect = ins.NextflowInspector("pipeline_stats.txt", 0.01)
+
+    nf_inspect.inspect_once()
+
+    # The one-shot inspection keeps the SIGINT handler
+    assert signal.getsignal(signal.SIGINT) is handler
+
+    summary = ins.json.loads(capsys.readouterr().out)
+    data = dict((x["process"], x) for x in summary["tableData"])
+
+    assert summary["runStatus"]["value"] == "running"
+    assert sorted(data["integrity_coverage_1_1"]["running"]) == \
+        ["SampleA", "SampleB"]
+    assert os.path.exists(nf_inspect.checkpoint_file)
+
+
+def test_inspect_once_resumed(inspector, capsys):
+
+    ins.NextflowInspector("pipeline_stats.txt", 0.01,
+                          disk_rate=0).inspect_once()
+
+    # Each resumed one-shot run advances the checkpoint, even when no work
+    # directory is sized
+    for tag in ["SampleC", "SampleD"]:
+        with open(".nextflow.log", "a") as fh:
+            fh.write(submit_line("19:07:34.100", "ef/345678",
+                                 "integrity_coverage_1_1", tag))
+
+        ins.NextflowInspector("pipeline_stats.txt", 0.01,
+                              disk_rate=0).inspect_once()
+
+        with gzip.open(".pipeline_stats.txt.checkpoint", "rt") as fh:
+            assert json.load(fh)["log"]["offset"] == \
+                os.path.getsize(".nextflow.log")
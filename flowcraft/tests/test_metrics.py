@@ -0,0 +1,60 @@
+import flowcraft.generator.metrics as mt
+
+from flowcraft.tests.conftest import trace_line
+
+
+def parse_metrics(text):
+
+    samples = {}
+    types = {}
+
+    for line in text.splitlines():
+        if line.startswith("# TYPE"):
+            _, _, name, metric_type = line.split()
+            types[name] = metric_type
+        elif not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+
+    return samples, types
+
+
+def test_format_metrics(inspector):
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA", rss="2 GB"))
+
+    inspector.update_inspection()
+
+    samples, types = parse_metrics(mt.format_metrics(inspector))
+    labels = 'pipeline="nasty_kare",process="integrity_coverage_1_1"'
+
+    assert types["flowcraft_process_trace_entries_total"] == "counter"
+    assert types["flowcraft_process_tasks"] == "gauge"
+
+    assert samples['flowcraft_pipeline_status{pipeline="nasty_kare",'
+                   'status="running"}'] == 1
+    assert samples["flowcraft_process_tasks{%s,state=\"complete\"}"
+                   % labels] == 1
+    assert samples["flowcraft_process_tasks{%s,state=\"running\"}"
+                   % labels] == 1
+    assert samples["flowcraft_process_barrier{%s,barrier=\"running\"}"
+                   % labels] == 1
+    assert samples["flowcraft_process_trace_entries_total{%s}"
+                   % labels] == 1
+    assert samples["flowcraft_process_realtime_seconds_avg{%s}"
+                   % labels] == 90
+    assert samples["flowcraft_process_max_rss_bytes{%s}"
+                   % labels] == 2 * 1024 ** 3
+    assert samples["flowcraft_process_read_bytes_avg{%s}"
+                   % labels] == 1024 ** 3
+
+    # Processes without trace entries only have the tag and barrier metrics
+    assert not any('process="fastqc_1_2"' in x and "tasks" not in x and
+                   "barrier" not in x for x in samples)
+
+
+def test_label_escaping():
+
+    assert mt._format_labels({"a": 'x"y\\z\n'}) == 'a="x\\"y\\\\z\\n"'
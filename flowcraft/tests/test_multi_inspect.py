@@ -0,0 +1,152 @@
+import os
+import gzip
+import json
+import asyncio
+import curses
+import pytest
+
+import flowcraft.generator.multi_inspect as mi
+
+from flowcraft.tests.conftest import LOG_HEADER, TRACE_HEADER, \
+    submit_line, trace_line
+
+
+class FakeScreen:
+
+    def __init__(self, keys=()):
+        self.keys = list(keys)
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+    def getmaxyx(self):
+        return 10, 120
+
+
+def create_project(path, tags):
+
+    os.makedirs(path)
+
+    with open(os.path.join(path, ".nextflow.log"), "w") as fh:
+        fh.writelines(LOG_HEADER)
+        for i, tag in enumerate(tags):
+            fh.write(submit_line("19:07:33.{}00".format(i),
+                                 "ab/12345{}".format(i),
+                                 "integrity_coverage_1_1", tag))
+
+    with open(os.path.join(path, "pipeline_stats.txt"), "w") as fh:
+        fh.write(TRACE_HEADER)
+
+
+@pytest.fixture
+def multi(tmpdir):
+
+    create_project(str(tmpdir.join("p1")), ["SampleA", "SampleB"])
+    create_project(str(tmpdir.join("p2")), ["SampleC"])
+
+    return mi.MultiInspector([str(tmpdir.join("p1")), str(tmpdir.join("p2"))],
+                             "pipeline_stats.txt", 0.01)
+
+
+def test_multi_inspector_updates(multi, tmpdir):
+
+    updated = []
+    p2 = str(tmpdir.join("p2"))
+
+    async def main():
+        while len(multi.snapshots) < 2:
+            await asyncio.sleep(0.01)
+
+        with open(os.path.join(p2, "pipeline_stats.txt"), "a") as fh:
+            fh.write(trace_line(1, "ab/123450", "integrity_coverage_1_1",
+                                "SampleC"))
+
+        for _ in range(100):
+            if multi.snapshots[p2].totals["finished"]:
+                break
+            await asyncio.sleep(0.01)
+
+    def on_update(directory):
+        updated.append(directory)
+        multi._on_overview_update(directory)
+
+    asyncio.get_event_loop().run_until_complete(
+        asyncio.wait_for(multi._run(on_update, main), 5))
+
+    assert multi.snapshots[p2].totals["finished"] == 1
+    assert multi.snapshots[str(tmpdir.join("p1"))].totals["submitted"] == 2
+    assert updated.count(p2) >= 2
+
+
+def test_multi_inspector_lines(multi, tmpdir):
+
+    for d, inspector in multi.inspectors.items():
+        inspector.update_inspection()
+        multi.snapshots[d] = inspector._overview_snapshot()
+
+    lines = multi._aggregated_lines(10)
+
+    assert "Running: 3" in lines[1][0][1]
+    assert lines[3][0][1].startswith("p1")
+    assert lines[3][0][2] == curses.A_REVERSE
+    assert lines[4][0][1].startswith("p2")
+
+    # Only the rows that fit the screen are displayed
+    multi.selected = 1
+    lines = multi._aggregated_lines(4)
+    assert len(lines) == 4
+    assert lines[3][0][1].startswith("p2")
+
+
+def test_multi_inspector_drilldown(multi, tmpdir):
+
+    multi.screen = FakeScreen([curses.KEY_DOWN, 10, ord("q")])
+
+    multi._curses_keybindings()
+    assert multi.selected == 1
+
+    multi._curses_keybindings()
+    p2 = str(tmpdir.join("p2"))
+    assert multi.drilldown == p2
+    assert multi.inspectors[p2].screen is multi.screen
+
+    # Leaving the pipeline overview returns to the aggregated overview
+    multi._curses_keybindings()
+    assert multi.drilldown is None
+    assert multi.stay_alive
+
+
+def test_multi_inspector_once(multi, tmpdir):
+
+    output = str(tmpdir.join("status.json"))
+
+    multi.inspect_once(output)
+
+    with open(output) as fh:
+        summaries = json.load(fh)
+
+    assert list(summaries) == [str(tmpdir.join("p1")), str(tmpdir.join("p2"))]
+    assert summaries[str(tmpdir.join("p2"))]["tableData"][0]["running"] == \
+        ["SampleC"]
+
+
+def test_multi_inspector_once_checkpoint(tmpdir):
+
+    p1 = str(tmpdir.join("p1"))
+    create_project(p1, ["SampleA"])
+
+    mi.MultiInspector([p1], "pipeline_stats.txt", 0.01,
+                      disk_rate=0).inspect_once(str(tmpdir.join("a.json")))
+
+    with open(os.path.join(p1, ".nextflow.log"), "a") as fh:
+        fh.write(submit_line("19:07:34.100", "ef/345678",
+                             "integrity_coverage_1_1", "SampleB"))
+
+    # The checkpoint loaded by the second run is advanced too
+    mi.MultiInspector([p1], "pipeline_stats.txt", 0.01,
+                      disk_rate=0).inspect_once(str(tmpdir.join("b.json")))
+
+    with gzip.open(os.path.join(p1, ".pipeline_stats.txt.checkpoint"),
+                   "rt") as fh:
+        assert json.load(fh)["log"]["offset"] == \
+            os.path.getsize(os.path.join(p1, ".nextflow.log"))
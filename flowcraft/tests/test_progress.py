@@ -0,0 +1,86 @@
+import pytest
+
+import flowcraft.generator.progress as pg
+
+from flowcraft.tests.conftest import trace_line
+
+
+def process(barrier="R", submitted=(), finished=(), failed=(), retry=()):
+
+    return {"barrier": barrier, "submitted": set(submitted),
+            "finished": set(finished), "failed": set(failed),
+            "retry": set(retry)}
+
+
+def test_parse_times():
+
+    start = pg.parse_log_time("Apr-19 19:07:33.100", 2018)
+
+    assert pg.parse_log_time("Apr-19 19:08:33.600", 2018) - start == \
+        pytest.approx(60.5)
+    assert pg.parse_log_time("Feb-29 10:00:00.000", 2020) is not None
+    assert pg.parse_log_time("invalid") is None
+    assert pg.parse_trace_time("2018-04-19 19:07:33.100") == \
+        pytest.approx(start)
+    assert pg.parse_trace_time("2018-04-19 19:07:33") == \
+        pytest.approx(start - 0.1)
+    assert pg.format_duration(3725.4) == "1:02:05"
+    assert pg.format_duration(None) == "-"
+
+
+def test_progress_estimate():
+
+    est = pg.ProgressEstimator()
+    est.first_submit = {"trim": 0, "assembly": 1800}
+    samples = set("ABCDEFGH")
+
+    processes = {
+        "trim": process("C", finished="ABCDEF", failed="GH"),
+        "assembly": process("R", submitted="CD", finished="AB")
+    }
+    est.last_complete = {"trim": 1800}
+
+    res = est.estimate(processes, samples, "running", 5400)
+    trim = res["processes"]["trim"]
+    assembly = res["processes"]["assembly"]
+
+    # The closed process is measured until its last completion
+    assert trim["throughput"] == pytest.approx(12)
+    assert trim["eta"] == 0
+    assert assembly["throughput"] == pytest.approx(2)
+    assert assembly["remaining"] == 6
+    assert assembly["eta"] == pytest.approx(3 * 3600)
+
+    assert res["throughput"] == pytest.approx(2)
+    assert res["eta"] == pytest.approx(3 * 3600)
+    assert res["pending"] == 0
+
+    # Processes without completed tags have no estimate
+    processes["report"] = process("W")
+    res = est.estimate(processes, samples, "running", 5400)
+
+    assert res["processes"]["report"]["eta"] is None
+    assert res["pending"] == 1
+    assert res["eta"] == pytest.approx(3 * 3600)
+
+    assert est.estimate(processes, samples, "complete", 5400)["eta"] == 0
+
+
+def test_inspector_progress(inspector):
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA"))
+
+    inspector.update_inspection()
+
+    assert "integrity_coverage_1_1" in inspector.progress.first_submit
+    assert "integrity_coverage_1_1" in inspector.progress.last_complete
+
+    progress = inspector._get_status_json()["progress"]
+    proc = progress["processes"]["integrity_coverage_1_1"]
+
+    assert proc["remaining"] == 1
+    assert proc["throughput"] > 0
+    assert progress["processes"]["fastqc_1_2"]["eta"] is None
+    assert inspector._overview_snapshot().progress["pending"] == 1
@@ -0,0 +1,65 @@
+import json
+import pytest
+
+from datetime import datetime
+
+import flowcraft.generator.scheduling as sc
+
+from flowcraft.tests.conftest import entry, trace_line
+
+YEAR = datetime.now().year
+
+
+def test_scheduling_stats():
+
+    stats = sc.SchedulingStats()
+
+    stats.submitted("ab/123456", "Apr-19 19:07:33.000")
+    stats.submitted("cd/789012", "Apr-19 19:07:40.000")
+
+    stats.add("trim", entry(hash="ab/123456",
+                            start="{}-04-19 19:08:33.000".format(YEAR),
+                            queue="short", duration=100, realtime=70))
+    stats.add("trim", entry(hash="cd/789012",
+                            start="{}-04-19 19:07:50.000".format(YEAR),
+                            duration=50, realtime=60))
+
+    assert stats.submit_times == {}
+    assert stats.mean("trim", "wait") == pytest.approx(35)
+    assert stats.mean("trim", "overhead") == pytest.approx(15)
+    assert stats.mean("assembly", "wait") is None
+
+    summary = stats.summary()
+    assert summary["processes"]["trim"]["wait"] == \
+        {"count": 2, "avg": 35.0, "max": 60.0}
+    assert summary["queues"]["short"]["overhead"]["avg"] == 30.0
+    assert summary["queues"]["-"]["overhead"]["avg"] == 0.0
+
+    restored = sc.SchedulingStats()
+    restored.restore(json.loads(json.dumps(stats.get_state())))
+    assert restored.summary() == summary
+
+    # Entries without a submission only have the overhead
+    restored.add("assembly", entry(hash="ef/345678", queue="short",
+                                   duration=100, realtime=70))
+    assert restored.mean("assembly", "overhead") == pytest.approx(30)
+    assert restored.mean("assembly", "wait") is None
+
+
+def test_inspector_scheduling(inspector):
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA",
+                            start="{}-04-19 19:09:03.100".format(YEAR),
+                            queue="short", duration="2m"))
+
+    inspector.update_inspection()
+
+    stats = inspector.process_stats["integrity_coverage_1_1"]
+    assert stats["avgwait"] == "00:01:30"
+    assert stats["overhead"] == "00:00:30"
+
+    status = inspector._get_status_json()
+    assert status["scheduling"]["queues"]["short"]["wait"]["avg"] == 90.0
+    assert status["tableData"][0]["avgWait"] == "00:01:30"
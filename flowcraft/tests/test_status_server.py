@@ -0,0 +1,103 @@
+import json
+import pytest
+
+import flowcraft.generator.status_server as ss
+
+from urllib.request import urlopen
+from urllib.error import HTTPError
+
+from flowcraft.generator.broadcast import StatusDeltaReceiver
+from flowcraft.tests.test_broadcast import get_status
+
+
+@pytest.fixture
+def server():
+
+    srv = ss.StatusServer(("127.0.0.1", 0), keepalive=0.05, max_pending=2)
+    srv.start()
+    srv.url = "http://127.0.0.1:{}".format(srv.server_port)
+
+    yield srv
+
+    srv.close()
+
+
+def read_event(fh):
+
+    event = {}
+    for line in fh:
+        line = line.decode("utf8").rstrip("\n")
+        if not line:
+            if event:
+                return event
+            continue
+        key, _, value = line.partition(": ")
+        event[key] = value
+
+
+def test_snapshot(server):
+
+    with pytest.raises(HTTPError) as e:
+        urlopen(server.url + "/status")
+    assert e.value.code == 503
+
+    server.publish(get_status())
+
+    body = json.loads(urlopen(server.url + "/status").read().decode("utf8"))
+    assert body == {"version": 1, "status_json": get_status()}
+
+    with pytest.raises(HTTPError) as e:
+        urlopen(server.url + "/other")
+    assert e.value.code == 404
+
+
+def test_events_stream(server):
+
+    server.publish(get_status())
+
+    receiver = StatusDeltaReceiver()
+
+    with urlopen(server.url + "/events") as fh:
+        event = read_event(fh)
+        assert event["event"] == "full"
+        assert receiver.apply(json.loads(event["data"]))
+
+        # Keepalive comments are sent while nothing changes
+        assert fh.readline() == b": keepalive\n"
+
+        server.publish(get_status({}))
+
+        event = read_event(fh)
+        assert event["event"] == "delta"
+        assert event["id"] == "2"
+        assert receiver.apply(json.loads(event["data"]))
+        assert receiver.status_json == get_status({})
+
+
+def test_events_slow_client(server):
+
+    events = server.subscribe()
+
+    for i in range(5):
+        server.publish(get_status({"Sample{}".format(i): {}}))
+
+    # The client fell behind and only receives the latest status
+    event = events.get_nowait()
+    assert event.startswith(b"id: 5\nevent: full\n")
+    assert events.empty()
+
+    server.unsubscribe(events)
+    assert not server.clients
+
+
+def test_metrics(server):
+
+    with pytest.raises(HTTPError) as e:
+        urlopen(server.url + "/metrics")
+    assert e.value.code == 503
+
+    server.publish_metrics("flowcraft_test 1.0\n")
+
+    r = urlopen(server.url + "/metrics")
+    assert r.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert r.read() == b"flowcraft_test 1.0\n"
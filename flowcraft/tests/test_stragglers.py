@@ -0,0 +1,92 @@
+import time
+import curses
+import random
+import pytest
+
+import flowcraft.generator.stragglers as st
+
+from flowcraft.tests.conftest import trace_line
+
+
+@pytest.mark.parametrize("p", [0.5, 0.9])
+def test_p2_quantile(p):
+
+    random.seed(42)
+    values = [random.expovariate(1 / 60) for _ in range(5000)]
+
+    estimator = st.P2Quantile(p)
+    for x in values:
+        estimator.add(x)
+
+    values.sort()
+    exact = values[int(p * len(values))]
+
+    assert estimator.count == 5000
+    assert estimator.value() == pytest.approx(exact, rel=0.05)
+
+
+def test_p2_quantile_few_values():
+
+    estimator = st.P2Quantile(0.9)
+    assert estimator.value() is None
+
+    for x in [30, 10, 20]:
+        estimator.add(x)
+
+    assert estimator.value() == pytest.approx(28)
+
+
+def test_straggler_detector():
+
+    detector = st.StragglerDetector(min_count=3)
+
+    for x in [100, 110, 120]:
+        detector.add("spades", x)
+    detector.add("trim", 10)
+
+    assert detector.reference("trim") is None
+
+    running = [("spades", "SampleA", 0), ("spades", "SampleB", 700),
+               ("spades", "SampleC", 300), ("trim", "SampleA", 0)]
+    stragglers = detector.find(running, 1000, 3)
+
+    assert list(stragglers) == ["spades"]
+    assert [x["tag"] for x in stragglers["spades"]] == ["SampleA", "SampleC"]
+    assert stragglers["spades"][0]["elapsed"] == 1000
+
+
+def test_inspector_stragglers(inspector):
+
+    inspector.stragglers.min_count = 1
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA"))
+
+    inspector.update_inspection()
+
+    # SampleB is running for longer than 3 times the 1m30s of SampleA
+    inspector.scheduling.submit_times["cd/789012"] = time.time() - 600
+    stragglers = inspector._get_status_json()["stragglers"]
+
+    assert [x["tag"] for x in stragglers["integrity_coverage_1_1"]] == \
+        ["SampleB"]
+    assert stragglers["integrity_coverage_1_1"][0]["reference"] == 90
+    assert inspector._overview_snapshot().rows[0]["stragglers"] == \
+        ("SampleB",)
+
+    inspector.straggler_factor = 1e9
+    assert inspector._get_stragglers() == {}
+
+
+def test_overview_stragglers_line(inspector, monkeypatch):
+
+    monkeypatch.setattr(curses, "color_pair", lambda x: 0)
+
+    snapshot = inspector._overview_snapshot()
+    snapshot.rows[0]["stragglers"] = tuple(
+        "Sample{}".format(i) for i in range(37))
+
+    line = inspector._overview_process_lines(snapshot, 0, 1)[0]
+
+    assert line[-1][1] == "Stragglers: 37 (Sample0, Sample1, Sample2, ...)"
@@ -0,0 +1,105 @@
+import json
+import pytest
+
+from datetime import datetime
+
+import flowcraft.generator.timeline as tl
+
+from flowcraft.tests.conftest import entry, trace_line
+
+START = "2018-04-19 10:{:02d}:00"
+
+
+def test_timeline_summary():
+
+    timeline = tl.ConcurrencyTimeline(min_gap=60, gantt=True)
+
+    # Two overlapping tasks, an idle gap of 2 minutes and a third task
+    timeline.add("trim", entry(tag="A", start=START.format(0), realtime=120,
+                               cpus=2))
+    timeline.add("trim", entry(tag="B", start=START.format(1), realtime=60,
+                               cpus=4))
+    timeline.add("assembly", entry(tag="A", start=START.format(4),
+                                   realtime=60, cpus=1))
+    timeline.add("assembly", entry(tag="B", status="CACHED",
+                                   start=START.format(0), realtime=60,
+                                   cpus=2))
+    timeline.add("assembly", entry(tag="C", realtime=60))
+
+    res = timeline.summary(capacity=4, max_points=5, gantt=True)
+
+    assert res["end"] - res["start"] == 300
+    assert res["cpuSeconds"] == 2 * 120 + 4 * 60 + 60
+    assert res["processCpuSeconds"] == {"trim": 480, "assembly": 60}
+    assert res["peakCpus"] == 6
+    assert res["peakTasks"] == 2
+    assert res["utilization"] == pytest.approx(540 / (4 * 300), abs=1e-3)
+    assert res["idleGaps"] == [[120.0, 120.0]]
+    assert res["resolution"] == 60
+    assert res["series"] == [2, 6, 0, 0, 1]
+    assert [x["tag"] for x in res["gantt"]] == ["A", "B", "A"]
+
+    assert tl.ConcurrencyTimeline().summary() is None
+
+
+def test_timeline_running_tasks():
+
+    timeline = tl.ConcurrencyTimeline()
+    timeline.add("trim", entry(tag="A", start=START.format(0), realtime=60,
+                               cpus=2))
+
+    start = timeline.times[0]
+    res = timeline.summary([("trim", "B", start + 30, 8)], now=start + 90)
+
+    assert res["peakCpus"] == 10
+    assert res["cpuSeconds"] == 2 * 60 + 8 * 60
+    assert res["utilization"] is None
+    assert "gantt" not in res
+
+
+def test_inspector_timeline(inspector):
+
+    year = datetime.now().year
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA", cpus="4",
+                            start="{}-04-19 19:09:03.100".format(year)))
+
+    inspector.capacity = 8
+    inspector.update_inspection()
+
+    timeline = inspector._get_status_json()["timeline"]
+
+    # SampleB is still running
+    assert timeline["peakTasks"] >= 1
+    assert timeline["processCpuSeconds"]["integrity_coverage_1_1"] >= 360
+    assert timeline["utilization"] is not None
+    assert inspector._get_summary_json()["timeline"]["capacity"] == 8
+
+
+def test_timeline_incremental():
+
+    timeline = tl.ConcurrencyTimeline(min_gap=60)
+
+    timeline.add("trim", entry(tag="A", start=START.format(4), realtime=60,
+                               cpus=1))
+    first = timeline.summary()
+    assert first["peakCpus"] == 1
+
+    # An earlier entry arriving later changes the levels from its start
+    timeline.add("trim", entry(tag="B", start=START.format(0), realtime=120,
+                               cpus=2))
+    timeline.add("trim", entry(tag="C", start=START.format(1), realtime=60,
+                               cpus=4))
+
+    res = timeline.summary(max_points=5)
+    assert res["peakCpus"] == 6
+    assert res["idleGaps"] == [[120.0, 120.0]]
+    assert res["cpuSeconds"] == 540
+    assert res["series"] == [2, 6, 0, 0, 1]
+    assert timeline.intervals == []
+
+    restored = tl.ConcurrencyTimeline(min_gap=60)
+    restored.restore(json.loads(json.dumps(timeline.get_state())))
+    assert restored.summary(max_points=5) == res
@@ -0,0 +1,62 @@
+import pytest
+
+import flowcraft.generator.metrics as mt
+import flowcraft.generator.waste as ws
+
+from flowcraft.tests.conftest import entry, trace_line
+
+
+def test_waste_accounting():
+
+    waste = ws.WasteAccounting(min_attempts=3)
+
+    waste.add("spades", entry(tag="A", status="FAILED", cpus=4,
+                              realtime=1800, memory=2048))
+    waste.add("spades", entry(tag="A", status="FAILED", cpus=4,
+                              realtime=3600, memory=2048))
+    waste.add("spades", entry(tag="A", cpus=4, realtime=1800, memory=2048))
+    waste.add("spades", entry(tag="B", status="FAILED", realtime=1800))
+    waste.add("trim", entry(tag="A", cpus=4, realtime=1800, memory=2048))
+    waste.add("trim", entry(tag="B", status="CACHED", cpus=4, realtime=1800,
+                            memory=2048))
+
+    assert waste.retry_rate("spades") == pytest.approx(0.75)
+    assert waste.retry_rate("trim") == 0
+    assert waste.retry_rate("fastqc") is None
+
+    summary = waste.summary(0.5, top=1)
+
+    assert summary["processes"]["spades"] == {
+        "attempts": 4, "failures": 3, "cpuHours": 6.5,
+        "wallSeconds": 7200, "memGbHours": 3, "retryRate": 0.75}
+    assert summary["processes"]["trim"]["attempts"] == 1
+    assert summary["total"]["failures"] == 3
+    assert summary["topProcesses"] == ["spades"]
+    assert summary["topTags"] == [{
+        "process": "spades", "tag": "A", "attempts": 3, "failures": 2,
+        "cpuHours": 6, "wallSeconds": 5400, "memGbHours": 3}]
+    assert summary["alarms"] == ["spades"]
+    assert waste.alarms(0.8) == []
+
+    # Only the tags with failed attempts are stored
+    assert sorted(waste.tags) == [("spades", "A"), ("spades", "B")]
+
+
+def test_inspector_waste(inspector):
+
+    with open("pipeline_stats.txt", "a") as fh:
+        fh.write(trace_line(1, "ab/123456", "integrity_coverage_1_1",
+                            "SampleA", "FAILED"))
+
+    inspector.update_inspection()
+
+    waste = inspector._get_status_json()["waste"]
+
+    # The trace lines have 2 cpus and a realtime of 1m30s
+    assert waste["processes"]["integrity_coverage_1_1"]["cpuHours"] == 0.05
+    assert waste["topTags"][0]["tag"] == "SampleA"
+    assert inspector._overview_snapshot().waste["total"]["failures"] == 1
+
+    metrics = mt.format_metrics(inspector)
+    assert 'flowcraft_process_failed_attempts_total{pipeline="nasty_kare",' \
+           'process="integrity_coverage_1_1"} 1.0' in metrics
@@ -23,7 +23,6 @@ setup(
                                 "generator/templates/*"]},
     data_files=[("", ["LICENSE"])],
     install_requires=[
-        "pympler",
         "python-dateutil",
         "argparse",
         "jinja2",